@@ -1,10 +1,18 @@
-from .connection import RedisConnection, create_connection
+from .connection import (
+    RedisConnection,
+    RedisProtocolConnection,
+    create_connection,
+    )
 from .commands import (
     Redis, create_redis,
     create_redis_pool,
     GeoPoint, GeoMember,
     )
 from .pool import ConnectionsPool, create_pool
+from .resilient import ResilientConnection, create_resilient_connection
+from .replica import ReplicaPool, create_replica_pool
+from .sharding import ShardedPool, create_sharded_pool
+from .cluster import ClusterPool, create_cluster_pool
 from .pubsub import Channel
 from .sentinel import RedisSentinel, create_sentinel
 from .errors import (
@@ -20,6 +28,7 @@ from .errors import (
     WatchVariableError,
     PoolClosedError,
     SlaveNotFoundError,
+    BackpressureError,
     )
 
 
@@ -28,13 +37,22 @@ __version__ = '1.0.0b2'
 __all__ = [
     # Factories
     'create_connection',
+    'create_resilient_connection',
     'create_pool',
+    'create_replica_pool',
+    'create_sharded_pool',
+    'create_cluster_pool',
     'create_redis',
     'create_redis_pool',
     'create_sentinel',
     # Classes
     'RedisConnection',
+    'RedisProtocolConnection',
+    'ResilientConnection',
     'ConnectionsPool',
+    'ReplicaPool',
+    'ShardedPool',
+    'ClusterPool',
     'Redis',
     'GeoPoint',
     'GeoMember',
@@ -53,6 +71,7 @@ __all__ = [
     'MasterNotFoundError',
     'SlaveNotFoundError',
     'ReadOnlyError',
+    'BackpressureError',
 ]
 
 # NOTE: this is deprecated
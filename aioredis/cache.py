@@ -0,0 +1,305 @@
+import asyncio
+
+from collections import OrderedDict
+from functools import partial
+
+from .abc import AbcConnection, AbcPool
+from .connection import create_connection, INVALIDATE_CHANNEL
+from .pool import ConnectionsPool
+from .replica import ReplicaPool
+from .pubsub import Channel
+from .util import create_future, async_task, _converters, _NOTSET
+from .log import logger
+
+__all__ = [
+    'LocalCache',
+    'create_cache',
+    'CACHEABLE_COMMANDS',
+]
+
+# Cacheable read-only commands: command -> number of leading
+# arguments being keys (None means all arguments are keys).
+_COMMANDS = {
+    b'GET': 1,
+    b'GETRANGE': 1,
+    b'STRLEN': 1,
+    b'MGET': None,
+    b'HGET': 1,
+    b'HMGET': 1,
+    b'HGETALL': 1,
+    b'HKEYS': 1,
+    b'HVALS': 1,
+    b'HLEN': 1,
+    b'HEXISTS': 1,
+    b'HSTRLEN': 1,
+    b'SMEMBERS': 1,
+    b'SISMEMBER': 1,
+    b'SCARD': 1,
+    b'LRANGE': 1,
+    b'LINDEX': 1,
+    b'LLEN': 1,
+    b'ZRANGE': 1,
+    b'ZREVRANGE': 1,
+    b'ZSCORE': 1,
+    b'ZRANK': 1,
+    b'ZREVRANK': 1,
+    b'ZCARD': 1,
+    }
+_COMMANDS.update({cmd.decode('utf-8'): n for cmd, n in _COMMANDS.items()})
+
+CACHEABLE_COMMANDS = frozenset(_COMMANDS)
+
+
+class LocalCache:
+    """Bounded LRU cache of read commands replies.
+
+    Entries are evicted when server reports that keys they were read
+    from are changed (see ``CLIENT TRACKING`` command).
+    Instances are created by :meth:`Redis.enable_cache()
+    <aioredis.Redis.enable_cache>`.
+    """
+
+    def __init__(self, maxsize=10000, *, prefixes=(), loop=None):
+        if maxsize < 1:
+            raise ValueError("maxsize must be positive")
+        self._maxsize = maxsize
+        self._prefixes = tuple(_converters[type(p)](p) for p in prefixes)
+        self._loop = loop
+        # (db, command, args, encoding, converter) -> (reply, keys)
+        self._data = OrderedDict()
+        # key -> set of entries read from key
+        self._keys = {}
+        # key -> set of tokens of requests in flight
+        self._pending = {}
+        self._conn = None
+        self._channel = None
+        self._reader_task = None
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __repr__(self):
+        return '<{} size:{} maxsize:{} hits:{} misses:{}>'.format(
+            self.__class__.__name__, len(self._data), self._maxsize,
+            self._hits, self._misses)
+
+    def __len__(self):
+        return len(self._data)
+
+    @property
+    def maxsize(self):
+        """Max number of cached replies."""
+        return self._maxsize
+
+    @property
+    def hits(self):
+        """Number of replies returned from cache."""
+        return self._hits
+
+    @property
+    def misses(self):
+        """Number of cacheable commands sent to server."""
+        return self._misses
+
+    @property
+    def evictions(self):
+        """Number of replies evicted to keep cache size bounded."""
+        return self._evictions
+
+    @property
+    def closed(self):
+        """True if cache is disabled (ie: invalidation connection
+        is closed).
+        """
+        return self._reader_task is None or self._reader_task.done()
+
+    def clear(self):
+        """Drops all cached replies."""
+        self._data.clear()
+        self._keys.clear()
+        self._pending.clear()
+
+    def close(self):
+        """Closes invalidation connection and disables cache."""
+        if self._conn is not None:
+            self._conn.close()
+
+    @asyncio.coroutine
+    def wait_closed(self):
+        """Coroutine waiting until cache is closed."""
+        if self._conn is not None:
+            yield from self._conn.wait_closed()
+        if self._reader_task is not None:
+            yield from asyncio.shield(self._reader_task, loop=self._loop)
+
+    def execute(self, pool_or_conn, command, args, kwargs):
+        """Returns future with cached reply or executes command
+        and caches its reply.
+        """
+        if (self.closed or
+                len(kwargs) > ('encoding' in kwargs) + ('converter' in kwargs)
+                or getattr(pool_or_conn, 'in_transaction', False)):
+            return pool_or_conn.execute(command, *args, **kwargs)
+        encoding = kwargs.get('encoding', _NOTSET)
+        converter = kwargs.get('converter')
+        try:
+            keys = tuple(_converters[type(key)](key)
+                         for key in args[:_COMMANDS[command]])
+            entry = (pool_or_conn.db, command, args, encoding, converter)
+            hash(entry)
+        except (KeyError, TypeError):
+            # let connection report invalid arguments
+            return pool_or_conn.execute(command, *args, **kwargs)
+        if not keys or (self._prefixes and not all(
+                key.startswith(self._prefixes) for key in keys)):
+            return pool_or_conn.execute(command, *args, **kwargs)
+        try:
+            reply, _ = self._data[entry]
+        except KeyError:
+            pass
+        else:
+            self._data.move_to_end(entry)
+            self._hits += 1
+            fut = create_future(loop=self._loop)
+            fut.set_result(_copy(reply))
+            return fut
+        self._misses += 1
+        # pool returns coroutine if there is no free connection
+        fut = async_task(pool_or_conn.execute(command, *args, **kwargs),
+                         loop=self._loop)
+        token = object()
+        for key in keys:
+            self._pending.setdefault(key, set()).add(token)
+        fut.add_done_callback(partial(self._store, entry, keys, token))
+        return fut
+
+    # internal methods
+
+    def _store(self, entry, keys, token, fut):
+        valid = True
+        for key in keys:
+            tokens = self._pending.get(key)
+            if tokens is None or token not in tokens:
+                # key was invalidated while request was in flight
+                valid = False
+                continue
+            tokens.discard(token)
+            if not tokens:
+                del self._pending[key]
+        if not valid or fut.cancelled() or fut.exception() is not None:
+            return
+        if self.closed:
+            return
+        data = self._data
+        if entry in data:
+            data.move_to_end(entry)
+        else:
+            for key in keys:
+                self._keys.setdefault(key, set()).add(entry)
+        data[entry] = (_copy(fut.result()), keys)
+        while len(data) > self._maxsize:
+            old, (_, old_keys) = data.popitem(last=False)
+            self._discard(old, old_keys)
+            self._evictions += 1
+
+    def _discard(self, entry, keys):
+        for key in keys:
+            entries = self._keys.get(key)
+            if entries is not None:
+                entries.discard(entry)
+                if not entries:
+                    del self._keys[key]
+
+    def _invalidate(self, keys):
+        if keys is None:
+            # FLUSHDB / FLUSHALL
+            self.clear()
+            return
+        for key in keys:
+            key = _converters[type(key)](key)
+            self._pending.pop(key, None)
+            for entry in self._keys.pop(key, ()):
+                _, entry_keys = self._data.pop(entry)
+                self._discard(entry, entry_keys)
+
+    @asyncio.coroutine
+    def _start(self, conn):
+        self._conn = conn
+        client_id = yield from conn.execute(b'CLIENT', b'ID')
+        prefixes = []
+        for prefix in self._prefixes:
+            prefixes.extend((b'PREFIX', prefix))
+        yield from conn.execute(b'CLIENT', b'TRACKING', b'on',
+                                b'REDIRECT', client_id, b'BCAST', *prefixes)
+        self._channel = Channel(INVALIDATE_CHANNEL, is_pattern=False,
+                                loop=self._loop)
+        yield from conn.execute_pubsub(b'SUBSCRIBE', self._channel)
+        self._reader_task = async_task(self._read_invalidations(),
+                                       loop=self._loop)
+
+    @asyncio.coroutine
+    def _read_invalidations(self):
+        ch = self._channel
+        try:
+            while ch.is_active:
+                keys = yield from ch.get()
+                if keys is None and not ch.is_active:
+                    break
+                self._invalidate(keys)
+        except Exception:
+            logger.exception("Cache invalidation failed, disabling cache")
+        finally:
+            self.clear()
+            self._conn.close()
+
+
+@asyncio.coroutine
+def create_cache(pool_or_conn, maxsize=10000, *, prefixes=(),
+                 password=None, ssl=None):
+    """Creates LocalCache along with dedicated connection receiving
+    invalidation messages.
+
+    Pool settings are used to open connection; connection address
+    and ``password`` and ``ssl`` arguments are used otherwise.
+    Sharded, cluster and replica pools are not supported
+    (replicas' replies could be cached after invalidation is received
+    from primary).
+
+    This function is a coroutine.
+    """
+    if isinstance(pool_or_conn, ReplicaPool) or (
+            isinstance(pool_or_conn, AbcPool) and
+            not isinstance(pool_or_conn, ConnectionsPool)):
+        raise TypeError(
+            "Caching requires ConnectionsPool or connection, got {!r}"
+            .format(pool_or_conn))
+    if isinstance(pool_or_conn, ConnectionsPool):
+        loop = pool_or_conn._loop
+        conn = yield from pool_or_conn._create_new_connection(
+            pool_or_conn.address)
+    elif isinstance(pool_or_conn, AbcConnection):
+        loop = pool_or_conn._loop
+        conn = yield from create_connection(pool_or_conn.address,
+                                            password=password,
+                                            ssl=ssl, loop=loop)
+    else:
+        raise TypeError(
+            "Caching requires ConnectionsPool or connection, got {!r}"
+            .format(pool_or_conn))
+    cache = LocalCache(maxsize, prefixes=prefixes, loop=loop)
+    try:
+        yield from cache._start(conn)
+    except Exception:
+        conn.close()
+        yield from conn.wait_closed()
+        raise
+    return cache
+
+
+def _copy(reply):
+    # cached replies are shared, do not let callers modify them
+    if isinstance(reply, list):
+        return list(reply)
+    if isinstance(reply, dict):
+        return dict(reply)
+    return reply
@@ -0,0 +1,413 @@
+import asyncio
+import random
+from collections import OrderedDict
+
+from .commands.cluster import parse_cluster_slots
+from .errors import ReplyError, PoolClosedError
+from .log import logger
+from .pool import ConnectionsPool
+from .resilient import _chain_future
+from .sharding import _BaseShardedPool, _key_bytes, _node_name
+from .util import async_task, create_future, _set_result
+
+__all__ = [
+    'ClusterPool',
+    'create_cluster_pool',
+    'key_slot',
+]
+
+SLOTS = 16384
+
+# Max number of MOVED/ASK redirections followed for one command
+MAX_REDIRECTS = 16
+
+# Interval of checking whether retired node pool is no longer in use
+RETIRE_CHECK_INTERVAL = 1
+
+
+def _crc16_table():
+    table = []
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            crc = (crc << 1) ^ 0x1021 if crc & 0x8000 else crc << 1
+        table.append(crc & 0xffff)
+    return table
+
+
+_CRC16_TABLE = _crc16_table()
+
+
+def crc16(data):
+    """CRC16 (XMODEM) checksum of bytes used by redis cluster."""
+    crc = 0
+    for byte in data:
+        crc = ((crc << 8) & 0xff00) ^ _CRC16_TABLE[((crc >> 8) ^ byte) & 0xff]
+    return crc
+
+
+def key_slot(key):
+    """Returns cluster hash slot of key (hashtag aware)."""
+    return crc16(_key_bytes(key)) % SLOTS
+
+
+def _parse_redirect(error):
+    # 'MOVED <slot> <host>:<port>' or 'ASK <slot> <host>:<port>'
+    parts = str(error.args[0]).split() if error.args else ()
+    if len(parts) != 3 or parts[0] not in ('MOVED', 'ASK'):
+        return None
+    host, _, port = parts[2].rpartition(':')
+    return parts[0], int(parts[1]), (host, int(port))
+
+
+@asyncio.coroutine
+def create_cluster_pool(startup_nodes, *, password=None, encoding=None,
+                        minsize=1, maxsize=10, loop=None, **kwargs):
+    """Creates pool routing commands to Redis Cluster nodes.
+
+    Slots map is loaded from first available of ``startup_nodes``;
+    pool of every master node is created with the same arguments
+    (other keyword arguments are passed to
+    :class:`~aioredis.ConnectionsPool`).
+
+    This function is a coroutine.
+    """
+    pool = ClusterPool(startup_nodes, password, encoding,
+                       minsize=minsize, maxsize=maxsize,
+                       loop=loop, **kwargs)
+    try:
+        yield from pool.refresh_slots()
+        yield from asyncio.gather(
+            *[node._fill_free(override_min=False)
+              for node in pool._all_pools()], loop=pool._loop)
+    except Exception:
+        pool.close()
+        yield from pool.wait_closed()
+        raise
+    return pool
+
+
+class _ClusterNodePool(ConnectionsPool):
+    """Connections pool of cluster node following redirections."""
+
+    def __init__(self, cluster, address, *args, **kwargs):
+        super().__init__(address, *args, **kwargs)
+        self._cluster = cluster
+        self._idle_waiter = None
+
+    def release(self, conn):
+        super().release(conn)
+        if self._idle_waiter is not None and not self._used:
+            fut, self._idle_waiter = self._idle_waiter, None
+            _set_result(fut, None)
+
+    @asyncio.coroutine
+    def _wait_idle(self):
+        """Waits until no connection is acquired and replies
+        to all commands sent are received.
+        """
+        while not self.closed:
+            if self._used:
+                if self._idle_waiter is None:
+                    self._idle_waiter = create_future(loop=self._loop)
+                # health checks release connections bypassing release()
+                yield from asyncio.wait([self._idle_waiter],
+                                        timeout=RETIRE_CHECK_INTERVAL,
+                                        loop=self._loop)
+                continue
+            busy = [conn for conn in self._pool
+                    if conn._waiters or conn._stream is not None]
+            if not busy:
+                return
+            yield from asyncio.gather(
+                *[conn._wait_drained() for conn in busy], loop=self._loop)
+
+    def _check_result(self, fut, command, args, kw):
+        if not isinstance(fut, asyncio.Future):
+            # coroutine waiting for free connection
+            return self._cluster._follow_redirects(fut, command, args, kw)
+        # redirections are rare, so reply is checked in done callback
+        # and coroutine following them is started only when needed
+        res = create_future(loop=self._loop)
+
+        def done(fut):
+            if res.done():
+                return
+            if fut.cancelled():
+                res.cancel()
+                return
+            exc = fut.exception()
+            redirect = None
+            if isinstance(exc, ReplyError):
+                redirect = _parse_redirect(exc)
+            if redirect is not None:
+                task = async_task(self._cluster._redirect(
+                    redirect, exc, self._cluster._execute_on,
+                    command, args, kw), loop=self._loop)
+                _chain_future(task, res)
+            elif exc is not None:
+                res.set_exception(exc)
+            else:
+                res.set_result(fut.result())
+        fut.add_done_callback(done)
+        return res
+
+
+class ClusterPool(_BaseShardedPool):
+    """Pool of connections pools of Redis Cluster master nodes.
+
+    Commands are routed by hash slot of their key
+    (see :class:`ShardedPool` for multi-key and keyless commands);
+    MOVED replies update slots map (which is then reloaded in background)
+    and command is retried on node it points to,
+    ASK replies retry command on target node after ASKING.
+    Keyless commands without merge (eg TIME, INFO) are sent
+    to random master node; SCAN must be run on every master's pool.
+    """
+
+    def __init__(self, startup_nodes, password=None, encoding=None,
+                 *, loop=None, **kwargs):
+        super().__init__(None, password, encoding, loop=loop, **kwargs)
+        self._startup_nodes = tuple(startup_nodes)
+        self._slots = [None] * SLOTS
+        self._masters = ()
+        self._refreshing = None
+        # pools of nodes no longer serving slots closed once not in use
+        self._retired = set()
+
+    @property
+    def slots(self):
+        """Tuple of node names by hash slot (None for unknown)."""
+        return tuple(self._slots)
+
+    @property
+    def masters(self):
+        """Tuple of master nodes names (as of last slots map load)."""
+        return self._masters
+
+    def _shard(self, key):
+        return key_slot(key)
+
+    def _shard_pool(self, slot):
+        name = self._slots[slot]
+        if name is None:
+            # any node replies with MOVED to slot's node
+            return self._execute_pool()
+        return self._pools[name]
+
+    def _all_pools(self):
+        return [self._pools[name] for name in self._masters]
+
+    def _execute_pool(self):
+        pools = self._all_pools() or list(self._pools.values())
+        if not pools:
+            raise PoolClosedError("No cluster nodes")
+        return random.choice(pools)
+
+    def _execute_keyless(self, command, args, kw):
+        return self._execute_pool().execute(command, *args, **kw)
+
+    def _node_pool(self, address):
+        name = _node_name(address)
+        pool = self._pools.get(name)
+        if pool is None:
+            if self._closed:
+                raise PoolClosedError("Pool is closed")
+            pool = _ClusterNodePool(self, address, None,
+                                    self._password, self._encoding,
+                                    loop=self._loop, **self._kwargs)
+            self._pools[name] = pool
+        return pool
+
+    @asyncio.coroutine
+    def _follow_redirects(self, coro, command, args, kw):
+        try:
+            return (yield from coro)
+        except ReplyError as err:
+            redirect = _parse_redirect(err)
+            if redirect is None:
+                raise
+            error = err
+        return (yield from self._redirect(
+            redirect, error, self._execute_on, command, args, kw))
+
+    @asyncio.coroutine
+    def _redirect(self, redirect, error, execute, command, args, kw):
+        """Retries command on node redirect points to
+        until it gets reply other than MOVED or ASK.
+        """
+        for _ in range(MAX_REDIRECTS):
+            kind, slot, address = redirect
+            pool = self._node_pool(address)
+            if kind == 'MOVED':
+                self._slots[slot] = _node_name(address)
+                self._schedule_refresh()
+            try:
+                return (yield from execute(
+                    pool, kind == 'ASK', command, args, kw))
+            except ReplyError as err:
+                redirect = _parse_redirect(err)
+                if redirect is None:
+                    raise
+                error = err
+        raise error
+
+    @asyncio.coroutine
+    def _execute_on(self, pool, asking, command, args, kw):
+        conn = yield from pool.acquire(command, args)
+        try:
+            if asking:
+                # ASKING applies to the next command only
+                asking = conn.execute(b'ASKING')
+                fut = conn.execute(command, *args, **kw)
+                _, res = yield from asyncio.gather(
+                    asking, fut, loop=self._loop)
+                return res
+            return (yield from conn.execute(command, *args, **kw))
+        finally:
+            pool.release(conn)
+
+    @asyncio.coroutine
+    def execute_streaming(self, command, *args, **kw):
+        """Executes command streaming its bulk-string reply
+        on node serving command key's slot following MOVED
+        and ASK redirections.
+        """
+        pool = self._key_pool(command, args)
+        try:
+            return (yield from pool.execute_streaming(command, *args, **kw))
+        except ReplyError as err:
+            redirect = _parse_redirect(err)
+            if redirect is None:
+                raise
+            error = err
+        return (yield from self._redirect(
+            redirect, error, self._stream_on, command, args, kw))
+
+    @asyncio.coroutine
+    def _stream_on(self, pool, asking, command, args, kw):
+        if not asking:
+            return (yield from pool.execute_streaming(command, *args, **kw))
+        conn = yield from pool.acquire(command, args)
+        try:
+            yield from conn.execute(b'ASKING')
+            stream = yield from conn.execute_streaming(command, *args, **kw)
+        except BaseException:
+            pool.release(conn)
+            raise
+        if stream is None:
+            pool.release(conn)
+        else:
+            stream.add_done_callback(lambda stream: pool.release(conn))
+        return stream
+
+    @asyncio.coroutine
+    def refresh_slots(self):
+        """Reloads slots map from cluster (CLUSTER SLOTS).
+
+        Concurrent calls share single reload.
+        """
+        if self._closed:
+            raise PoolClosedError("Pool is closed")
+        return (yield from asyncio.shield(self._schedule_refresh(),
+                                          loop=self._loop))
+
+    def _schedule_refresh(self):
+        if self._refreshing is None and not self._closed:
+            self._refreshing = async_task(self._refresh_slots(),
+                                          loop=self._loop)
+            self._refreshing.add_done_callback(self._refreshed)
+        return self._refreshing
+
+    def _refreshed(self, task):
+        self._refreshing = None
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Failed to load cluster slots: %r",
+                           task.exception())
+
+    @asyncio.coroutine
+    def _refresh_slots(self):
+        addresses = OrderedDict()
+        for address in [pool.address for pool in self._pools.values()] + \
+                list(self._startup_nodes):
+            addresses.setdefault(_node_name(address), address)
+        error = PoolClosedError("No cluster nodes")
+        for name, address in addresses.items():
+            created = name not in self._pools
+            pool = self._node_pool(address)
+            try:
+                slots = yield from pool.execute(
+                    b'CLUSTER', b'SLOTS', encoding='utf-8',
+                    converter=parse_cluster_slots)
+            except (OSError, asyncio.TimeoutError, ReplyError) as err:
+                error = err
+                logger.debug("Failed to load cluster slots from %s: %r",
+                             name, err)
+                if created:
+                    yield from self._close_pool(name)
+            else:
+                replied_name, replied_address = name, address
+                replied_created = created
+                break
+        else:
+            raise error
+        masters = OrderedDict()
+        slots_map = [None] * SLOTS
+        for start, end, nodes in slots:
+            host, port, _ = nodes[0]
+            # empty host stands for node replied
+            master = (host or replied_address[0], port)
+            self._node_pool(master)
+            masters[_node_name(master)] = None
+            slots_map[start:end + 1] = [_node_name(master)] * (
+                end - start + 1)
+        self._slots = slots_map
+        self._masters = tuple(masters)
+        if replied_created and replied_name not in masters:
+            # startup node pool (eg 'localhost:port') used to load slots
+            self._retire_pool(replied_name)
+        startup_nodes = {_node_name(address)
+                         for address in self._startup_nodes}
+        for name in list(self._pools):
+            if name not in masters and name not in startup_nodes:
+                self._retire_pool(name)
+
+    def _retire_pool(self, name):
+        """Stops routing commands to node's pool and closes it
+        once commands sent through it are done.
+        """
+        pool = self._pools.pop(name, None)
+        if pool is not None:
+            self._retired.add(pool)
+            async_task(self._close_retired(pool), loop=self._loop)
+
+    @asyncio.coroutine
+    def _close_retired(self, pool):
+        try:
+            yield from pool._wait_idle()
+        finally:
+            self._retired.discard(pool)
+            pool.close()
+            yield from pool.wait_closed()
+
+    @asyncio.coroutine
+    def _close_pool(self, name):
+        pool = self._pools.pop(name, None)
+        if pool is not None:
+            pool.close()
+            yield from pool.wait_closed()
+
+    def close(self):
+        """Closes all nodes pools."""
+        if self._refreshing is not None:
+            self._refreshing.cancel()
+        for pool in self._retired:
+            pool.close()
+        super().close()
+
+    @asyncio.coroutine
+    def wait_closed(self):
+        """Waits until all nodes pools get closed."""
+        for pool in list(self._retired):
+            yield from pool.wait_closed()
+        yield from super().wait_closed()
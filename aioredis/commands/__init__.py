@@ -1,8 +1,10 @@
 import asyncio
 import warnings
 
+from aioredis.cache import create_cache, CACHEABLE_COMMANDS
 from aioredis.connection import create_connection
 from aioredis.pool import create_pool
+from aioredis.resilient import create_resilient_connection
 from aioredis.util import _NOTSET
 from .generic import GenericCommandsMixin
 from .string import StringCommandsMixin
@@ -44,22 +46,65 @@ class Redis(GenericCommandsMixin, StringCommandsMixin,
     """
     def __init__(self, pool_or_conn):
         self._pool_or_conn = pool_or_conn
+        self._cache = None
 
     def __repr__(self):
         return '<Redis {!r}>'.format(self._pool_or_conn)
 
     def execute(self, command, *args, **kwargs):
+        if self._cache is not None and command in CACHEABLE_COMMANDS:
+            return self._cache.execute(self._pool_or_conn,
+                                       command, args, kwargs)
         return self._pool_or_conn.execute(command, *args, **kwargs)
 
+    def execute_streaming(self, command, *args, **kwargs):
+        return self._pool_or_conn.execute_streaming(command, *args, **kwargs)
+
     def close(self):
         """Close client connections."""
+        if self._cache is not None:
+            self._cache.close()
         self._pool_or_conn.close()
 
     @asyncio.coroutine
     def wait_closed(self):
         """Coroutine waiting until underlying connections are closed."""
+        if self._cache is not None:
+            yield from self._cache.wait_closed()
         yield from self._pool_or_conn.wait_closed()
 
+    @asyncio.coroutine
+    def enable_cache(self, maxsize=10000, *, prefixes=(),
+                     password=None, ssl=None):
+        """Enables client-side caching of read commands replies.
+
+        Opens dedicated connection with ``CLIENT TRACKING`` enabled
+        in broadcasting mode; cached replies are evicted when
+        keys are changed.
+
+        This method is a coroutine.
+
+        :param int maxsize: Max number of cached replies.
+        :param prefixes: Only keys with given prefixes are cached.
+        :param password: Password for invalidation connection
+            (pool settings are used for connections pool).
+        :param ssl: SSL context for invalidation connection
+            (pool settings are used for connections pool).
+        """
+        if self._cache is not None and not self._cache.closed:
+            raise RuntimeError("Cache is already enabled")
+        self._cache = yield from create_cache(self._pool_or_conn, maxsize,
+                                              prefixes=prefixes,
+                                              password=password, ssl=ssl)
+        return self._cache
+
+    @property
+    def cache(self):
+        """Local cache (:class:`aioredis.cache.LocalCache`)
+        or None if caching is not enabled.
+        """
+        return self._cache
+
     @property
     def db(self):
         """Currently selected db index."""
@@ -138,19 +183,36 @@ class Redis(GenericCommandsMixin, StringCommandsMixin,
 def create_redis(address, *, db=None, password=None, ssl=None,
                  encoding=None, commands_factory=Redis,
                  parser=None, timeout=None,
-                 connection_cls=None, loop=None):
+                 connection_cls=None, coalesce_writes=False,
+                 protocol=2, max_inflight=None, write_buffer_limit=None,
+                 backpressure='wait', metrics=None, hooks=None,
+                 reconnect=False, tcp_keepalive=None, tcp_user_timeout=None,
+                 loop=None):
     """Creates high-level Redis interface.
 
+    If reconnect is True connection is reopened when it is lost
+    (see :func:`aioredis.create_resilient_connection`).
+
     This function is a coroutine.
     """
-    conn = yield from create_connection(address, db=db,
-                                        password=password,
-                                        ssl=ssl,
-                                        encoding=encoding,
-                                        parser=parser,
-                                        timeout=timeout,
-                                        connection_cls=connection_cls,
-                                        loop=loop)
+    factory = create_resilient_connection if reconnect else create_connection
+    conn = yield from factory(address, db=db,
+                              password=password,
+                              ssl=ssl,
+                              encoding=encoding,
+                              parser=parser,
+                              timeout=timeout,
+                              connection_cls=connection_cls,
+                              coalesce_writes=coalesce_writes,
+                              protocol=protocol,
+                              max_inflight=max_inflight,
+                              write_buffer_limit=write_buffer_limit,
+                              backpressure=backpressure,
+                              metrics=metrics,
+                              hooks=hooks,
+                              tcp_keepalive=tcp_keepalive,
+                              tcp_user_timeout=tcp_user_timeout,
+                              loop=loop)
     return commands_factory(conn)
 
 
@@ -159,7 +221,16 @@ def create_redis_pool(address, *, db=None, password=None, ssl=None,
                       encoding=None, commands_factory=Redis,
                       minsize=1, maxsize=10, parser=None,
                       timeout=None, pool_cls=None,
-                      connection_cls=None, loop=None):
+                      connection_cls=None, coalesce_writes=False,
+                      protocol=2, max_inflight=None,
+                      write_buffer_limit=None, backpressure='wait',
+                      metrics=None, hooks=None, tcp_keepalive=None,
+                      tcp_user_timeout=None, health_check_interval=None,
+                      selector=None, idle_timeout=None, max_lifetime=None,
+                      scale_up_inflight=None, scale_up_latency=None,
+                      create_connection_concurrency=10,
+                      blocking_maxsize=None, blocking_metrics=None,
+                      loop=None):
     """Creates high-level Redis interface.
 
     This function is a coroutine.
@@ -174,5 +245,24 @@ def create_redis_pool(address, *, db=None, password=None, ssl=None,
                                   create_connection_timeout=timeout,
                                   pool_cls=pool_cls,
                                   connection_cls=connection_cls,
+                                  coalesce_writes=coalesce_writes,
+                                  protocol=protocol,
+                                  max_inflight=max_inflight,
+                                  write_buffer_limit=write_buffer_limit,
+                                  backpressure=backpressure,
+                                  metrics=metrics,
+                                  hooks=hooks,
+                                  tcp_keepalive=tcp_keepalive,
+                                  tcp_user_timeout=tcp_user_timeout,
+                                  health_check_interval=health_check_interval,
+                                  selector=selector,
+                                  idle_timeout=idle_timeout,
+                                  max_lifetime=max_lifetime,
+                                  scale_up_inflight=scale_up_inflight,
+                                  scale_up_latency=scale_up_latency,
+                                  create_connection_concurrency=(
+                                      create_connection_concurrency),
+                                  blocking_maxsize=blocking_maxsize,
+                                  blocking_metrics=blocking_metrics,
                                   loop=loop)
     return commands_factory(pool)
@@ -1,4 +1,4 @@
-from aioredis.util import wait_ok
+from aioredis.util import convert_ok
 
 
 class ClusterCommandsMixin:
@@ -12,8 +12,8 @@ class ClusterCommandsMixin:
         slots = (slot,) + slots
         if not all(isinstance(s, int) for s in slots):
             raise TypeError("All parameters must be of type int")
-        fut = self.execute(b'CLUSTER', b'ADDSLOTS', *slots)
-        return wait_ok(fut)
+        return self.execute(b'CLUSTER', b'ADDSLOTS', *slots,
+                            converter=convert_ok)
 
     def cluster_count_failure_reports(self, node_id):
         """Return the number of failure reports active for a given node."""
@@ -32,8 +32,8 @@ class ClusterCommandsMixin:
         slots = (slot,) + slots
         if not all(isinstance(s, int) for s in slots):
             raise TypeError("All parameters must be of type int")
-        fut = self.execute(b'CLUSTER', b'DELSLOTS', *slots)
-        return wait_ok(fut)
+        return self.execute(b'CLUSTER', b'DELSLOTS', *slots,
+                            converter=convert_ok)
 
     def cluster_failover(self):
         """Forces a slave to perform a manual failover of its master."""
@@ -41,8 +41,8 @@ class ClusterCommandsMixin:
 
     def cluster_forget(self, node_id):
         """Remove a node from the nodes table."""
-        fut = self.execute(b'CLUSTER', b'FORGET', node_id)
-        return wait_ok(fut)
+        return self.execute(b'CLUSTER', b'FORGET', node_id,
+                            converter=convert_ok)
 
     def cluster_get_keys_in_slots(self, slot, count, *, encoding):
         """Return local key names in the specified hash slot."""
@@ -59,8 +59,8 @@ class ClusterCommandsMixin:
 
     def cluster_meet(self, ip, port):
         """Force a node cluster to handshake with another node."""
-        fut = self.execute(b'CLUSTER', b'MEET', ip, port)
-        return wait_ok(fut)
+        return self.execute(b'CLUSTER', b'MEET', ip, port,
+                            converter=convert_ok)
 
     def cluster_nodes(self):
         """Get Cluster config for the node."""
@@ -68,33 +68,53 @@ class ClusterCommandsMixin:
 
     def cluster_replicate(self, node_id):
         """Reconfigure a node as a slave of the specified master node."""
-        fut = self.execute(b'CLUSTER', b'REPLICATE', node_id)
-        return wait_ok(fut)
+        return self.execute(b'CLUSTER', b'REPLICATE', node_id,
+                            converter=convert_ok)
 
     def cluster_reset(self, *, hard=False):
         """Reset a Redis Cluster node."""
         reset = hard and b'HARD' or b'SOFT'
-        fut = self.execute(b'CLUSTER', b'RESET', reset)
-        return wait_ok(fut)
+        return self.execute(b'CLUSTER', b'RESET', reset, converter=convert_ok)
 
     def cluster_save_config(self):
         """Force the node to save cluster state on disk."""
-        fut = self.execute(b'CLUSTER', b'SAVECONFIG')
-        return wait_ok(fut)
+        return self.execute(b'CLUSTER', b'SAVECONFIG', converter=convert_ok)
 
     def cluster_set_config_epoch(self, config_epoch):
         """Set the configuration epoch in a new node."""
-        fut = self.execute(b'CLUSTER', b'SET-CONFIG-EPOCH', config_epoch)
-        return wait_ok(fut)
+        return self.execute(b'CLUSTER', b'SET-CONFIG-EPOCH', config_epoch,
+                            converter=convert_ok)
 
-    def cluster_setslot(self, slot, command, node_id):
-        """Bind a hash slot to specified node."""
-        pass    # TODO: Implement
+    def cluster_setslot(self, slot, command, node_id=None):
+        """Bind a hash slot to specified node.
+
+        ``command`` is one of IMPORTING, MIGRATING, NODE
+        (all require ``node_id``) or STABLE.
+        """
+        if not isinstance(slot, int):
+            raise TypeError("Expected slot to be of type int, got {}"
+                            .format(type(slot)))
+        args = (node_id,) if node_id is not None else ()
+        return self.execute(b'CLUSTER', b'SETSLOT', slot, command, *args,
+                            converter=convert_ok)
 
     def cluster_slaves(self, node_id):
         """List slave nodes of the specified master node."""
         pass    # TODO: Implement
 
     def cluster_slots(self):
-        """Get array of Cluster slot to node mappings."""
-        pass    # TODO: Implement
+        """Get array of Cluster slot to node mappings.
+
+        Returns list of ``(start, end, nodes)`` tuples where nodes is
+        list of ``(host, port, node_id)`` tuples, master node first.
+        """
+        return self.execute(b'CLUSTER', b'SLOTS', encoding='utf-8',
+                            converter=parse_cluster_slots)
+
+
+def parse_cluster_slots(slots):
+    # node id is not returned by redis < 4.0
+    return [(start, end, [(node[0], node[1],
+                           node[2] if len(node) > 2 else None)
+                          for node in nodes])
+            for start, end, *nodes in slots]
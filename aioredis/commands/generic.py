@@ -1,4 +1,4 @@
-from aioredis.util import wait_convert, wait_ok, _NOTSET, PY_35
+from aioredis.util import convert_ok, convert_scan, _NOTSET, PY_35
 
 if PY_35:
     from aioredis.util import _ScanIter
@@ -12,8 +12,7 @@ class GenericCommandsMixin:
 
     def delete(self, key, *keys):
         """Delete a key."""
-        fut = self.execute(b'DEL', key, *keys)
-        return wait_convert(fut, int)
+        return self.execute(b'DEL', key, *keys, converter=int)
 
     def dump(self, key):
         """Dump a key."""
@@ -40,8 +39,7 @@ class GenericCommandsMixin:
         if not isinstance(timeout, int):
             raise TypeError(
                 "timeout argument must be int, not {!r}".format(timeout))
-        fut = self.execute(b'EXPIRE', key, timeout)
-        return wait_convert(fut, bool)
+        return self.execute(b'EXPIRE', key, timeout, converter=bool)
 
     def expireat(self, key, timestamp):
         """Set expire timestamp on a key.
@@ -56,8 +54,7 @@ class GenericCommandsMixin:
         if not isinstance(timestamp, int):
             raise TypeError("timestamp argument must be int, not {!r}"
                             .format(timestamp))
-        fut = self.execute(b'EXPIREAT', key, timestamp)
-        return wait_convert(fut, bool)
+        return self.execute(b'EXPIREAT', key, timestamp, converter=bool)
 
     def keys(self, pattern, *, encoding=_NOTSET):
         """Returns all keys matching pattern."""
@@ -84,9 +81,9 @@ class GenericCommandsMixin:
             flags.append(b'COPY')
         if replace:
             flags.append(b'REPLACE')
-        fut = self.execute(b'MIGRATE', host, port,
-                           key, dest_db, timeout, *flags)
-        return wait_ok(fut)
+        return self.execute(b'MIGRATE', host, port,
+                            key, dest_db, timeout, *flags,
+                            converter=convert_ok)
 
     def migrate_keys(self, host, port, keys, dest_db, timeout, *,
                      copy=False, replace=False):
@@ -118,9 +115,9 @@ class GenericCommandsMixin:
             flags.append(b'REPLACE')
         flags.append(b'KEYS')
         flags.extend(keys)
-        fut = self.execute(b'MIGRATE', host, port,
-                           "", dest_db, timeout, *flags)
-        return wait_ok(fut)
+        return self.execute(b'MIGRATE', host, port,
+                            "", dest_db, timeout, *flags,
+                            converter=convert_ok)
 
     def move(self, key, db):
         """Move key from currently selected database to specified destination.
@@ -133,8 +130,7 @@ class GenericCommandsMixin:
         if db < 0:
             raise ValueError("db argument must be not less then 0, {!r}"
                              .format(db))
-        fut = self.execute(b'MOVE', key, db)
-        return wait_convert(fut, bool)
+        return self.execute(b'MOVE', key, db, converter=bool)
 
     def object_refcount(self, key):
         """Returns the number of references of the value associated
@@ -157,8 +153,7 @@ class GenericCommandsMixin:
 
     def persist(self, key):
         """Remove the existing timeout on key."""
-        fut = self.execute(b'PERSIST', key)
-        return wait_convert(fut, bool)
+        return self.execute(b'PERSIST', key, converter=bool)
 
     def pexpire(self, key, timeout):
         """Set a milliseconds timeout on key.
@@ -168,8 +163,7 @@ class GenericCommandsMixin:
         if not isinstance(timeout, int):
             raise TypeError("timeout argument must be int, not {!r}"
                             .format(timeout))
-        fut = self.execute(b'PEXPIRE', key, timeout)
-        return wait_convert(fut, bool)
+        return self.execute(b'PEXPIRE', key, timeout, converter=bool)
 
     def pexpireat(self, key, timestamp):
         """Set expire timestamp on key, timestamp in milliseconds.
@@ -179,8 +173,7 @@ class GenericCommandsMixin:
         if not isinstance(timestamp, int):
             raise TypeError("timestamp argument must be int, not {!r}"
                             .format(timestamp))
-        fut = self.execute(b'PEXPIREAT', key, timestamp)
-        return wait_convert(fut, bool)
+        return self.execute(b'PEXPIREAT', key, timestamp, converter=bool)
 
     def pttl(self, key):
         """Returns time-to-live for a key, in milliseconds.
@@ -206,8 +199,7 @@ class GenericCommandsMixin:
         """
         if key == newkey:
             raise ValueError("key and newkey are the same")
-        fut = self.execute(b'RENAME', key, newkey)
-        return wait_ok(fut)
+        return self.execute(b'RENAME', key, newkey, converter=convert_ok)
 
     def renamenx(self, key, newkey):
         """Renames key to newkey only if newkey does not exist.
@@ -216,8 +208,7 @@ class GenericCommandsMixin:
         """
         if key == newkey:
             raise ValueError("key and newkey are the same")
-        fut = self.execute(b'RENAMENX', key, newkey)
-        return wait_convert(fut, bool)
+        return self.execute(b'RENAMENX', key, newkey, converter=bool)
 
     def restore(self, key, ttl, value):
         """Creates a key associated with a value that is obtained via DUMP."""
@@ -241,8 +232,7 @@ class GenericCommandsMixin:
             args += [b'MATCH', match]
         if count is not None:
             args += [b'COUNT', count]
-        fut = self.execute(b'SCAN', cursor, *args)
-        return wait_convert(fut, lambda o: (int(o[0]), o[1]))
+        return self.execute(b'SCAN', cursor, *args, converter=convert_scan)
 
     if PY_35:
         def iscan(self, *, match=None, count=None):
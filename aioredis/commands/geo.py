@@ -1,6 +1,8 @@
 from collections import namedtuple
 
-from aioredis.util import wait_convert, _NOTSET
+from functools import partial
+
+from aioredis.util import _NOTSET
 
 
 GeoPoint = namedtuple('GeoPoint', ('longitude', 'latitude'))
@@ -37,16 +39,16 @@ class GeoCommandsMixin:
 
         :rtype: list[GeoPoint or None]
         """
-        fut = self.execute(b'GEOPOS', key, member, *members, **kwargs)
-        return wait_convert(fut, make_geopos)
+        kwargs['converter'] = make_geopos
+        return self.execute(b'GEOPOS', key, member, *members, **kwargs)
 
     def geodist(self, key, member1, member2, unit='m'):
         """Returns the distance between two members of a geospatial index.
 
         :rtype: list[float or None]
         """
-        fut = self.execute(b'GEODIST', key, member1, member2, unit)
-        return wait_convert(fut, make_geodist)
+        return self.execute(b'GEODIST', key, member1, member2, unit,
+                            converter=make_geodist)
 
     def georadius(self, key, longitude, latitude, radius, unit='m', *,
                   with_dist=False, with_hash=False, with_coord=False,
@@ -79,16 +81,11 @@ class GeoCommandsMixin:
             radius, unit, with_dist, with_hash, with_coord, count, sort
         )
 
-        fut = self.execute(
+        return self.execute(
             b'GEORADIUS', key, longitude, latitude, radius,
-            unit, *args, encoding=encoding
+            unit, *args, encoding=encoding,
+            converter=_geomember_converter(with_dist, with_hash, with_coord)
         )
-        if with_dist or with_hash or with_coord:
-            return wait_convert(fut, make_geomember,
-                                with_dist=with_dist,
-                                with_hash=with_hash,
-                                with_coord=with_coord)
-        return fut
 
     def georadiusbymember(self, key, member, radius, unit='m', *,
                           with_dist=False, with_hash=False, with_coord=False,
@@ -121,15 +118,10 @@ class GeoCommandsMixin:
             radius, unit, with_dist, with_hash, with_coord, count, sort
         )
 
-        fut = self.execute(
+        return self.execute(
             b'GEORADIUSBYMEMBER', key, member, radius,
-            unit, *args, encoding=encoding)
-        if with_dist or with_hash or with_coord:
-            return wait_convert(fut, make_geomember,
-                                with_dist=with_dist,
-                                with_hash=with_hash,
-                                with_coord=with_coord)
-        return fut
+            unit, *args, encoding=encoding,
+            converter=_geomember_converter(with_dist, with_hash, with_coord))
 
 
 def validate_georadius_options(radius, unit, with_dist, with_hash, with_coord,
@@ -190,3 +182,10 @@ def make_geomember(value, with_dist, with_coord, with_hash):
         res_rows.append(GeoMember(name, dist, hash_, coord))
 
     return res_rows
+
+
+def _geomember_converter(with_dist, with_hash, with_coord):
+    if with_dist or with_hash or with_coord:
+        return partial(make_geomember, with_dist=with_dist,
+                       with_hash=with_hash, with_coord=with_coord)
+    return None
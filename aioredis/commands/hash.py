@@ -1,9 +1,9 @@
 from itertools import chain
 
 from aioredis.util import (
-    wait_ok,
-    wait_convert,
-    wait_make_dict,
+    convert_ok,
+    convert_scan,
+    make_dict,
     _NOTSET,
     PY_35,
     )
@@ -24,8 +24,7 @@ class HashCommandsMixin:
 
     def hexists(self, key, field):
         """Determine if hash field exists."""
-        fut = self.execute(b'HEXISTS', key, field)
-        return wait_convert(fut, bool)
+        return self.execute(b'HEXISTS', key, field, converter=bool)
 
     def hget(self, key, field, *, encoding=_NOTSET):
         """Get the value of a hash field."""
@@ -33,8 +32,8 @@ class HashCommandsMixin:
 
     def hgetall(self, key, *, encoding=_NOTSET):
         """Get all the fields and values in a hash."""
-        fut = self.execute(b'HGETALL', key, encoding=encoding)
-        return wait_make_dict(fut)
+        return self.execute(b'HGETALL', key, encoding=encoding,
+                            converter=make_dict)
 
     def hincrby(self, key, field, increment=1):
         """Increment the integer value of a hash field by the given number."""
@@ -42,8 +41,8 @@ class HashCommandsMixin:
 
     def hincrbyfloat(self, key, field, increment=1.0):
         """Increment the float value of a hash field by the given number."""
-        fut = self.execute(b'HINCRBYFLOAT', key, field, increment)
-        return wait_convert(fut, float)
+        return self.execute(b'HINCRBYFLOAT', key, field, increment,
+                            converter=float)
 
     def hkeys(self, key, *, encoding=_NOTSET):
         """Get all the fields in a hash."""
@@ -61,7 +60,8 @@ class HashCommandsMixin:
         """Set multiple hash fields to multiple values."""
         if len(pairs) % 2 != 0:
             raise TypeError("length of pairs must be even number")
-        return wait_ok(self.execute(b'HMSET', key, field, value, *pairs))
+        return self.execute(b'HMSET', key, field, value, *pairs,
+                            converter=convert_ok)
 
     def hmset_dict(self, key, *args, **kwargs):
         """Set multiple hash fields to multiple values.
@@ -101,8 +101,8 @@ class HashCommandsMixin:
                 raise ValueError("args[0] is empty dict")
             pairs = chain.from_iterable(args[0].items())
         kwargs_pairs = chain.from_iterable(kwargs.items())
-        return wait_ok(self.execute(
-            b'HMSET', key, *chain(pairs, kwargs_pairs)))
+        return self.execute(b'HMSET', key, *chain(pairs, kwargs_pairs),
+                            converter=convert_ok)
 
     def hset(self, key, field, value):
         """Set the string value of a hash field."""
@@ -121,8 +121,7 @@ class HashCommandsMixin:
         args = [key, cursor]
         match is not None and args.extend([b'MATCH', match])
         count is not None and args.extend([b'COUNT', count])
-        fut = self.execute(b'HSCAN', *args)
-        return wait_convert(fut, lambda obj: (int(obj[0]), obj[1]))
+        return self.execute(b'HSCAN', *args, converter=convert_scan)
 
     if PY_35:
         def ihscan(self, key, *, match=None, count=None):
@@ -1,4 +1,4 @@
-from aioredis.util import wait_ok
+from aioredis.util import convert_ok
 
 
 class HyperLogLogCommandsMixin:
@@ -19,5 +19,5 @@ class HyperLogLogCommandsMixin:
 
     def pfmerge(self, destkey, sourcekey, *sourcekeys):
         """Merge N different HyperLogLogs into a single one."""
-        fut = self.execute(b'PFMERGE', destkey, sourcekey, *sourcekeys)
-        return wait_ok(fut)
+        return self.execute(b'PFMERGE', destkey, sourcekey, *sourcekeys,
+                            converter=convert_ok)
@@ -1,4 +1,4 @@
-from aioredis.util import _NOTSET, wait_ok
+from aioredis.util import convert_ok, _NOTSET
 
 
 class ListCommandsMixin:
@@ -125,8 +125,7 @@ class ListCommandsMixin:
             raise TypeError("start argument must be int")
         if not isinstance(stop, int):
             raise TypeError("stop argument must be int")
-        fut = self.execute(b'LTRIM', key, start, stop)
-        return wait_ok(fut)
+        return self.execute(b'LTRIM', key, start, stop, converter=convert_ok)
 
     def rpop(self, key, *, encoding=_NOTSET):
         """Removes and returns the last element of the list stored at key."""
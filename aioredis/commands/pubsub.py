@@ -1,7 +1,7 @@
 import asyncio
 import json
 
-from aioredis.util import wait_make_dict
+from aioredis.util import make_dict
 
 
 class PubSubCommandsMixin:
@@ -72,8 +72,8 @@ class PubSubCommandsMixin:
 
     def pubsub_numsub(self, *channels):
         """Returns the number of subscribers for the specified channels."""
-        return wait_make_dict(self.execute(
-            b'PUBSUB', b'NUMSUB', *channels))
+        return self.execute(b'PUBSUB', b'NUMSUB', *channels,
+                            converter=make_dict)
 
     def pubsub_numpat(self):
         """Returns the number of subscriptions to patterns."""
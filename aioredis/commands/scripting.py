@@ -1,4 +1,4 @@
-from aioredis.util import wait_ok
+from aioredis.util import convert_ok
 
 
 class ScriptingCommandsMixin:
@@ -21,13 +21,11 @@ class ScriptingCommandsMixin:
 
     def script_kill(self):
         """Kill the script currently in execution."""
-        fut = self.execute(b'SCRIPT', b'KILL')
-        return wait_ok(fut)
+        return self.execute(b'SCRIPT', b'KILL', converter=convert_ok)
 
     def script_flush(self):
         """Remove all the scripts from the script cache."""
-        fut = self.execute(b"SCRIPT",  b"FLUSH")
-        return wait_ok(fut)
+        return self.execute(b"SCRIPT",  b"FLUSH", converter=convert_ok)
 
     def script_load(self, script):
         """Load the specified Lua script into the script cache."""
@@ -1,6 +1,6 @@
 from collections import namedtuple
 
-from aioredis.util import wait_ok, wait_convert, wait_make_dict, _NOTSET
+from aioredis.util import convert_ok, make_dict, _NOTSET
 from aioredis.log import logger
 
 
@@ -15,13 +15,11 @@ class ServerCommandsMixin:
 
     def bgrewriteaof(self):
         """Asynchronously rewrite the append-only file."""
-        fut = self.execute(b'BGREWRITEAOF')
-        return wait_ok(fut)
+        return self.execute(b'BGREWRITEAOF', converter=convert_ok)
 
     def bgsave(self):
         """Asynchronously save the dataset to disk."""
-        fut = self.execute(b'BGSAVE')
-        return wait_ok(fut)
+        return self.execute(b'BGSAVE', converter=convert_ok)
 
     def client_kill(self):
         """Kill the connection of a client.
@@ -35,8 +33,8 @@ class ServerCommandsMixin:
 
         Returns list of ClientInfo named tuples.
         """
-        fut = self.execute(b'CLIENT', b'LIST', encoding='utf-8')
-        return wait_convert(fut, to_tuples)
+        return self.execute(b'CLIENT', b'LIST', encoding='utf-8',
+                            converter=to_tuples)
 
     def client_getname(self, encoding=_NOTSET):
         """Get the current connection name."""
@@ -52,13 +50,11 @@ class ServerCommandsMixin:
             raise TypeError("timeout argument must be int")
         if timeout < 0:
             raise ValueError("timeout must be greater equal 0")
-        fut = self.execute(b'CLIENT', b'PAUSE', timeout)
-        return wait_ok(fut)
+        return self.execute(b'CLIENT', b'PAUSE', timeout, converter=convert_ok)
 
     def client_setname(self, name):
         """Set the current connection name."""
-        fut = self.execute(b'CLIENT', b'SETNAME', name)
-        return wait_ok(fut)
+        return self.execute(b'CLIENT', b'SETNAME', name, converter=convert_ok)
 
     def command(self):
         """Get array of Redis commands."""
@@ -88,25 +84,23 @@ class ServerCommandsMixin:
         """
         if not isinstance(parameter, str):
             raise TypeError("parameter must be str")
-        fut = self.execute(b'CONFIG', b'GET', parameter, encoding='utf-8')
-        return wait_make_dict(fut)
+        return self.execute(b'CONFIG', b'GET', parameter, encoding='utf-8',
+                            converter=make_dict)
 
     def config_rewrite(self):
         """Rewrite the configuration file with the in memory configuration."""
-        fut = self.execute(b'CONFIG', b'REWRITE')
-        return wait_ok(fut)
+        return self.execute(b'CONFIG', b'REWRITE', converter=convert_ok)
 
     def config_set(self, parameter, value):
         """Set a configuration parameter to the given value."""
         if not isinstance(parameter, str):
             raise TypeError("parameter must be str")
-        fut = self.execute(b'CONFIG', b'SET', parameter, value)
-        return wait_ok(fut)
+        return self.execute(b'CONFIG', b'SET', parameter, value,
+                            converter=convert_ok)
 
     def config_resetstat(self):
         """Reset the stats returned by INFO."""
-        fut = self.execute(b'CONFIG', b'RESETSTAT')
-        return wait_ok(fut)
+        return self.execute(b'CONFIG', b'RESETSTAT', converter=convert_ok)
 
     def dbsize(self):
         """Return the number of keys in the selected database."""
@@ -114,8 +108,7 @@ class ServerCommandsMixin:
 
     def debug_sleep(self, timeout):
         """Suspend connection for timeout seconds."""
-        fut = self.execute(b'DEBUG', b'SLEEP', timeout)
-        return wait_ok(fut)
+        return self.execute(b'DEBUG', b'SLEEP', timeout, converter=convert_ok)
 
     def debug_object(self, key):
         """Get debugging information about a key."""
@@ -128,13 +121,11 @@ class ServerCommandsMixin:
 
     def flushall(self):
         """Remove all keys from all databases."""
-        fut = self.execute(b'FLUSHALL')
-        return wait_ok(fut)
+        return self.execute(b'FLUSHALL', converter=convert_ok)
 
     def flushdb(self):
         """Remove all keys from the current database."""
-        fut = self.execute('FLUSHDB')
-        return wait_ok(fut)
+        return self.execute('FLUSHDB', converter=convert_ok)
 
     def info(self, section='default'):
         """Get information and statistics about the server.
@@ -147,8 +138,8 @@ class ServerCommandsMixin:
         """
         if not section:
             raise ValueError("invalid section")
-        fut = self.execute(b'INFO', section, encoding='utf-8')
-        return wait_convert(fut, parse_info)
+        return self.execute(b'INFO', section, encoding='utf-8',
+                            converter=parse_info)
 
     def lastsave(self):
         """Get the UNIX time stamp of the last successful save to disk."""
@@ -169,8 +160,7 @@ class ServerCommandsMixin:
         Returns named tuples describing role of the instance.
         For fields information see http://redis.io/commands/role#output-format
         """
-        fut = self.execute(b'ROLE', encoding='utf-8')
-        return wait_convert(fut, parse_role)
+        return self.execute(b'ROLE', encoding='utf-8', converter=parse_role)
 
     def save(self):
         """Synchronously save the dataset to disk."""
@@ -221,8 +211,7 @@ class ServerCommandsMixin:
 
     def slowlog_reset(self):
         """Resets Redis slow queries log."""
-        fut = self.execute(b'SLOWLOG', b'RESET')
-        return wait_ok(fut)
+        return self.execute(b'SLOWLOG', b'RESET', converter=convert_ok)
 
     def sync(self):
         """Redis-server internal command used for replication."""
@@ -230,8 +219,7 @@ class ServerCommandsMixin:
 
     def time(self):
         """Return current server time."""
-        fut = self.execute(b'TIME')
-        return wait_convert(fut, to_time)
+        return self.execute(b'TIME', converter=to_time)
 
 
 def _split(s):
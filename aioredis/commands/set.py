@@ -1,4 +1,4 @@
-from aioredis.util import wait_convert, _NOTSET, PY_35
+from aioredis.util import convert_scan, _NOTSET, PY_35
 
 
 if PY_35:
@@ -74,8 +74,7 @@ class SetCommandsMixin:
         tokens = [key, cursor]
         match is not None and tokens.extend([b'MATCH', match])
         count is not None and tokens.extend([b'COUNT', count])
-        fut = self.execute(b'SSCAN', *tokens)
-        return wait_convert(fut, lambda obj: (int(obj[0]), obj[1]))
+        return self.execute(b'SSCAN', *tokens, converter=convert_scan)
 
     if PY_35:
         def isscan(self, key, *, match=None, count=None):
@@ -1,4 +1,6 @@
-from aioredis.util import wait_convert, PY_35
+from itertools import chain
+
+from aioredis.util import PY_35
 
 if PY_35:
     from aioredis.util import _ScanIterPairs
@@ -62,8 +64,8 @@ class SortedSetCommandsMixin:
         """
         if not isinstance(increment, (int, float)):
             raise TypeError("increment argument must be int or float")
-        fut = self.execute(b'ZINCRBY', key, increment, member)
-        return wait_convert(fut, int_or_float)
+        return self.execute(b'ZINCRBY', key, increment, member,
+                            converter=int_or_float)
 
     def zinterstore(self, destkey, key, *keys,
                     with_weights=False, aggregate=None):
@@ -127,10 +129,9 @@ class SortedSetCommandsMixin:
             args = [b'WITHSCORES']
         else:
             args = []
-        fut = self.execute(b'ZRANGE', key, start, stop, *args)
-        if withscores:
-            return wait_convert(fut, pairs_int_or_float)
-        return fut
+        converter = pairs_int_or_float if withscores else None
+        return self.execute(b'ZRANGE', key, start, stop, *args,
+                            converter=converter)
 
     def zrangebylex(self, key, min=b'-', max=b'+', include_min=True,
                     include_max=True, offset=None, count=None):
@@ -195,10 +196,9 @@ class SortedSetCommandsMixin:
             args = [b'WITHSCORES']
         if offset is not None and count is not None:
             args.extend([b'LIMIT', offset, count])
-        fut = self.execute(b'ZRANGEBYSCORE', key, min, max, *args)
-        if withscores:
-            return wait_convert(fut, pairs_int_or_float)
-        return fut
+        converter = pairs_int_or_float if withscores else None
+        return self.execute(b'ZRANGEBYSCORE', key, min, max, *args,
+                            converter=converter)
 
     def zrank(self, key, member):
         """Determine the index of a member in a sorted set."""
@@ -266,10 +266,9 @@ class SortedSetCommandsMixin:
             args = [b'WITHSCORES']
         else:
             args = []
-        fut = self.execute(b'ZREVRANGE', key, start, stop, *args)
-        if withscores:
-            return wait_convert(fut, pairs_int_or_float)
-        return fut
+        converter = pairs_int_or_float if withscores else None
+        return self.execute(b'ZREVRANGE', key, start, stop, *args,
+                            converter=converter)
 
     def zrevrangebyscore(self, key, max=float('inf'), min=float('-inf'),
                          *, exclude=None, withscores=False,
@@ -302,10 +301,9 @@ class SortedSetCommandsMixin:
             args = [b'WITHSCORES']
         if offset is not None and count is not None:
             args.extend([b'LIMIT', offset, count])
-        fut = self.execute(b'ZREVRANGEBYSCORE', key, max, min, *args)
-        if withscores:
-            return wait_convert(fut, pairs_int_or_float)
-        return fut
+        converter = pairs_int_or_float if withscores else None
+        return self.execute(b'ZREVRANGEBYSCORE', key, max, min, *args,
+                            converter=converter)
 
     def zrevrangebylex(self, key, min=b'-', max=b'+', include_min=True,
                        include_max=True, offset=None, count=None):
@@ -349,8 +347,8 @@ class SortedSetCommandsMixin:
 
     def zscore(self, key, member):
         """Get the score associated with the given member in a sorted set."""
-        fut = self.execute(b'ZSCORE', key, member)
-        return wait_convert(fut, optional_int_or_float)
+        return self.execute(b'ZSCORE', key, member,
+                            converter=optional_int_or_float)
 
     def zunionstore(self, destkey, key, *keys,
                     with_weights=False, aggregate=None):
@@ -385,12 +383,8 @@ class SortedSetCommandsMixin:
             args += [b'MATCH', match]
         if count is not None:
             args += [b'COUNT', count]
-        fut = self.execute(b'ZSCAN', key, cursor, *args)
-
-        def _converter(obj):
-            return (int(obj[0]), pairs_int_or_float(obj[1]))
-
-        return wait_convert(fut, _converter)
+        return self.execute(b'ZSCAN', key, cursor, *args,
+                            converter=_convert_zscan)
 
     if PY_35:
         def izscan(self, key, *, match=None, count=None):
@@ -418,6 +412,9 @@ def _encode_min_max(flag, min, max):
 
 
 def int_or_float(value):
+    if isinstance(value, float):
+        # RESP3 double
+        return int(value) if value.is_integer() else value
     assert isinstance(value, (str, bytes)), 'raw_value must be bytes'
     try:
         return int(value)
@@ -432,6 +429,14 @@ def optional_int_or_float(value):
 
 
 def pairs_int_or_float(value):
-    it = iter(value)
+    if value and isinstance(value[0], list):
+        # RESP3 replies with [member, score] pairs
+        it = iter(chain.from_iterable(value))
+    else:
+        it = iter(value)
     return list(sum(([val, int_or_float(score)] for val, score in zip(it, it)),
                     []))
+
+
+def _convert_zscan(obj):
+    return int(obj[0]), pairs_int_or_float(obj[1])
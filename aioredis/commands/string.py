@@ -1,4 +1,7 @@
-from aioredis.util import wait_convert, wait_ok, _NOTSET
+import asyncio
+
+from aioredis.stream import make_sink
+from aioredis.util import convert_ok, _NOTSET
 
 
 class StringCommandsMixin:
@@ -79,6 +82,45 @@ class StringCommandsMixin:
         """Get the value of a key."""
         return self.execute(b'GET', key, encoding=encoding)
 
+    def get_stream(self, key):
+        """Get the value of a key as a stream of chunks.
+
+        Returns coroutine resolving to
+        :class:`~aioredis.stream.BulkReplyStream` or None if key
+        does not exist. Value is never decoded.
+        """
+        return self.execute_streaming(b'GET', key)
+
+    @asyncio.coroutine
+    def get_into(self, key, target):
+        """Get the value of a key writing it directly into target.
+
+        Target can be a writable buffer (``bytearray``, ``mmap``, etc)
+        large enough to hold the value (written from its start),
+        a file object or a file descriptor.
+        Files are written synchronously (blocking event loop), so they
+        should be on fast local storage.
+
+        Returns number of bytes written or None if key does not exist.
+
+        :raises TypeError: if target is of unsupported type
+        :raises ValueError: if target buffer is too small
+        """
+        sink = make_sink(target)
+        try:
+            stream = yield from self.execute_streaming(
+                b'GET', key, sink=sink.write)
+            if stream is None:
+                return None
+            try:
+                yield from stream.read()
+            except asyncio.CancelledError:
+                stream.close()
+                raise
+            return stream.size
+        finally:
+            sink.close()
+
     def getbit(self, key, offset):
         """Returns the bit value at offset in the string value stored at key.
 
@@ -126,8 +168,7 @@ class StringCommandsMixin:
         """
         if not isinstance(increment, float):
             raise TypeError("increment must be of type int")
-        fut = self.execute(b'INCRBYFLOAT', key, increment)
-        return wait_convert(fut, float)
+        return self.execute(b'INCRBYFLOAT', key, increment, converter=float)
 
     def mget(self, key, *keys, encoding=_NOTSET):
         """Get the values of all the given keys."""
@@ -140,8 +181,7 @@ class StringCommandsMixin:
         """
         if len(pairs) % 2 != 0:
             raise TypeError("length of pairs must be even number")
-        fut = self.execute(b'MSET', key, value, *pairs)
-        return wait_ok(fut)
+        return self.execute(b'MSET', key, value, *pairs, converter=convert_ok)
 
     def msetnx(self, key, value, *pairs):
         """Set multiple keys to multiple values,
@@ -160,8 +200,8 @@ class StringCommandsMixin:
         """
         if not isinstance(milliseconds, int):
             raise TypeError("milliseconds argument must be int")
-        fut = self.execute(b'PSETEX', key, milliseconds, value)
-        return wait_ok(fut)
+        return self.execute(b'PSETEX', key, milliseconds, value,
+                            converter=convert_ok)
 
     def set(self, key, value, *, expire=0, pexpire=0, exist=None):
         """Set the string value of a key.
@@ -183,8 +223,7 @@ class StringCommandsMixin:
             args.append(b'XX')
         elif exist is self.SET_IF_NOT_EXIST:
             args.append(b'NX')
-        fut = self.execute(b'SET', key, value, *args)
-        return wait_ok(fut)
+        return self.execute(b'SET', key, value, *args, converter=convert_ok)
 
     def setbit(self, key, offset, value):
         """Sets or clears the bit at offset in the string value stored at key.
@@ -212,13 +251,12 @@ class StringCommandsMixin:
             return self.psetex(key, int(seconds * 1000), value)
         if not isinstance(seconds, int):
             raise TypeError("milliseconds argument must be int")
-        fut = self.execute(b'SETEX', key, seconds, value)
-        return wait_ok(fut)
+        return self.execute(b'SETEX', key, seconds, value,
+                            converter=convert_ok)
 
     def setnx(self, key, value):
         """Set the value of a key, only if the key does not exist."""
-        fut = self.execute(b'SETNX', key, value)
-        return wait_convert(fut, bool)
+        return self.execute(b'SETNX', key, value, converter=bool)
 
     def setrange(self, key, offset, value):
         """Overwrite part of a string at key starting at the specified offset.
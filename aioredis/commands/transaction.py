@@ -3,7 +3,7 @@ import functools
 
 from ..abc import AbcPool
 from ..errors import RedisError, PipelineError, MultiExecError
-from ..util import wait_ok, async_task, create_future
+from ..util import convert_ok, async_task, create_future
 
 
 class TransactionsCommandsMixin:
@@ -27,14 +27,13 @@ class TransactionsCommandsMixin:
 
     def unwatch(self):
         """Forget about all watched keys."""
-        fut = self._pool_or_conn.execute(b'UNWATCH')
-        return wait_ok(fut)
+        return self._pool_or_conn.execute(b'UNWATCH', converter=convert_ok)
 
     def watch(self, key, *keys):
         """Watch the given keys to determine execution of the MULTI/EXEC block.
         """
-        fut = self._pool_or_conn.execute(b'WATCH', key, *keys)
-        return wait_ok(fut)
+        return self._pool_or_conn.execute(b'WATCH', key, *keys,
+                                          converter=convert_ok)
 
     def multi_exec(self):
         """Returns MULTI/EXEC pipeline wrapper.
@@ -281,7 +280,7 @@ class MultiExec(Pipeline):
     def _resolve_waiters(self, results, return_exceptions):
         errors = []
         for val, fut in zip(results, self._waiters):
-            if isinstance(val, RedisError):
+            if isinstance(val, Exception):
                 fut.set_exception(val)
                 errors.append(val)
             else:
@@ -1,21 +1,25 @@
+import sys
 import types
 import asyncio
 import socket
+import contextlib
 from functools import partial
 from collections import deque
 
 from .util import (
-    encode_command,
-    wait_ok,
+    encode_command_buffers,
+    convert_ok,
     _NOTSET,
     _set_result,
     _set_exception,
+    _set_timeout,
     coerced_keys_dict,
     decode,
     async_task,
     create_future,
+    ZERO_COPY_SIZE,
     )
-from .parser import Reader
+from .parser import Reader, PyReader, PushMessage, Parser
 from .errors import (
     ConnectionClosedError,
     RedisError,
@@ -23,14 +27,17 @@ from .errors import (
     ReplyError,
     WatchVariableError,
     ReadOnlyError,
+    BackpressureError,
     )
 from .pubsub import Channel
+from .stream import BulkReplyStream
 from .abc import AbcChannel
 from .abc import AbcConnection
+from .hooks import _call_hook
 from .log import logger
 
 
-__all__ = ['create_connection', 'RedisConnection']
+__all__ = ['create_connection', 'RedisConnection', 'RedisProtocolConnection']
 
 MAX_CHUNK_SIZE = 65536
 
@@ -41,11 +48,26 @@ _PUBSUB_COMMANDS = (
     'PUNSUBSCRIBE', b'PUNSUBSCRIBE',
     )
 
+_PUBSUB_REPLIES = (
+    b'subscribe', b'psubscribe',
+    b'unsubscribe', b'punsubscribe',
+    )
+_PUBSUB_MESSAGES = (
+    b'message', b'pmessage',
+    )
+
+# CLIENT TRACKING invalidation messages channel;
+# RESP3 'invalidate' push messages are delivered to it as well.
+INVALIDATE_CHANNEL = b'__redis__:invalidate'
+
 
 @asyncio.coroutine
 def create_connection(address, *, db=None, password=None, ssl=None,
                       encoding=None, parser=None, loop=None, timeout=None,
-                      connection_cls=None):
+                      connection_cls=None, coalesce_writes=False,
+                      protocol=2, max_inflight=None, write_buffer_limit=None,
+                      backpressure='wait', metrics=None, hooks=None,
+                      tcp_keepalive=None, tcp_user_timeout=None):
     """Creates redis connection.
 
     Opens connection to Redis server specified by address argument.
@@ -68,8 +90,35 @@ def create_connection(address, *, db=None, password=None, ssl=None,
     By default hiredis.Reader is used (unless it is missing or platform
     is not CPython).
 
+    When coalesce_writes is True commands issued within one event loop
+    iteration are buffered and written to transport at once.
+
+    Protocol argument selects Redis protocol version; when it is 3
+    connection switches to RESP3 with HELLO command (Redis 6.0+ required)
+    and pure-python parser is used unless parser is given.
+
+    Max_inflight limits number of commands waiting for reply and
+    write_buffer_limit limits number of bytes in transport write buffer.
+    Once any limit is reached execute either queues command and returns
+    future sending it when there is capacity (backpressure='wait')
+    or raises BackpressureError (backpressure='raise').
+
+    Metrics argument is an aioredis.metrics.Metrics instance collecting
+    commands latency, bytes sent/received, etc (disabled by default).
+
+    Hooks argument is a list of aioredis.hooks.CommandHook instances
+    called when commands are sent and their replies are received.
+
+    Tcp_keepalive enables TCP keepalive probes sent after given number
+    of idle seconds (as redis-server's tcp-keepalive option does) and
+    tcp_user_timeout sets max number of seconds sent data may remain
+    unacknowledged (Linux only); both options let broken TCP connection
+    be detected without waiting for command timeout.
+
     Return value is RedisConnection instance or a connection_cls if it is
     given.
+    If connection_cls is a RedisProtocolConnection subclass connection is
+    opened with plain asyncio.Protocol instead of StreamReader.
 
     This function is a coroutine.
     """
@@ -77,6 +126,18 @@ def create_connection(address, *, db=None, password=None, ssl=None,
 
     if timeout is not None and timeout <= 0:
         raise ValueError("Timeout has to be None or a number greater than 0")
+    if protocol not in (2, 3):
+        raise ValueError("Protocol version must be 2 or 3")
+    if max_inflight is not None and max_inflight < 1:
+        raise ValueError("max_inflight must be None or positive")
+    if write_buffer_limit is not None and write_buffer_limit < 0:
+        raise ValueError("write_buffer_limit must be None or non-negative")
+    if backpressure not in ('wait', 'raise'):
+        raise ValueError("backpressure must be 'wait' or 'raise'")
+    if tcp_keepalive is not None and tcp_keepalive <= 0:
+        raise ValueError("tcp_keepalive must be None or positive")
+    if tcp_user_timeout is not None and tcp_user_timeout <= 0:
+        raise ValueError("tcp_user_timeout must be None or positive")
 
     if connection_cls:
         assert issubclass(connection_cls, AbcConnection),\
@@ -85,35 +146,67 @@ def create_connection(address, *, db=None, password=None, ssl=None,
     else:
         cls = RedisConnection
 
+    if issubclass(cls, RedisProtocolConnection):
+        open_connection = _open_connection
+        open_unix_connection = _open_unix_connection
+    else:
+        open_connection = asyncio.open_connection
+        open_unix_connection = asyncio.open_unix_connection
+
     if isinstance(address, (list, tuple)):
         host, port = address
         logger.debug("Creating tcp connection to %r", address)
-        reader, writer = yield from asyncio.wait_for(asyncio.open_connection(
+        reader, writer = yield from asyncio.wait_for(open_connection(
             host, port, ssl=ssl, loop=loop), timeout, loop=loop)
         sock = writer.transport.get_extra_info('socket')
         if sock is not None:
             sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if tcp_keepalive is not None:
+                _set_keepalive(sock, tcp_keepalive)
+            if tcp_user_timeout is not None:
+                _set_user_timeout(sock, tcp_user_timeout)
             address = sock.getpeername()
         address = tuple(address[:2])
     else:
         logger.debug("Creating unix connection to %r", address)
         reader, writer = yield from asyncio.wait_for(
-            asyncio.open_unix_connection(address, ssl=ssl, loop=loop),
+            open_unix_connection(address, ssl=ssl, loop=loop),
             timeout, loop=loop)
         sock = writer.transport.get_extra_info('socket')
         if sock is not None:
             address = sock.getpeername()
 
-    conn = cls(reader, writer, encoding=encoding,
-               address=address, parser=parser,
-               loop=loop)
+    # options are passed only when set so that connection_cls
+    # with pre-1.0 signature (reader, writer, *, address, encoding,
+    # parser, loop) keeps working with defaults
+    options = {}
+    for name, value, default in (('coalesce_writes', coalesce_writes, False),
+                                 ('protocol', protocol, 2),
+                                 ('max_inflight', max_inflight, None),
+                                 ('write_buffer_limit', write_buffer_limit,
+                                  None),
+                                 ('backpressure', backpressure, 'wait'),
+                                 ('metrics', metrics, None),
+                                 ('hooks', hooks, None)):
+        if value != default:
+            options[name] = value
+    try:
+        conn = cls(reader, writer, encoding=encoding,
+                   address=address, parser=parser,
+                   loop=loop, **options)
+    except BaseException:
+        writer.transport.close()
+        raise
 
     try:
         if password is not None:
             yield from conn.auth(password)
+        if protocol == 3:
+            yield from conn.execute('HELLO', protocol)
         if db is not None:
             yield from conn.select(db)
-    except Exception:
+    except BaseException:
+        # (also on cancellation) not to leave half-open connection
         conn.close()
         yield from conn.wait_closed()
         raise
@@ -124,11 +217,15 @@ class RedisConnection(AbcConnection):
     """Redis connection."""
 
     def __init__(self, reader, writer, *, address, encoding=None,
-                 parser=None, loop=None):
+                 parser=None, coalesce_writes=False, protocol=2,
+                 max_inflight=None, write_buffer_limit=None,
+                 backpressure='wait', metrics=None, hooks=None,
+                 loop=None):
         if loop is None:
             loop = asyncio.get_event_loop()
         if parser is None:
-            parser = Reader
+            # hiredis.Reader does not support RESP3
+            parser = PyReader if protocol == 3 else Reader
         assert callable(parser), (
             "Parser argument is not callable", parser)
         self._reader = reader
@@ -150,6 +247,46 @@ class RedisConnection(AbcConnection):
         self._pubsub_channels = coerced_keys_dict()
         self._pubsub_patterns = coerced_keys_dict()
         self._encoding = encoding
+        # Replies to commands using connection's encoding are decoded
+        # by parser if it can switch encoding between replies;
+        # RESP3 push messages may come in between so they are not.
+        self._parser_decodes = (encoding is not None and protocol != 3 and
+                                hasattr(self._parser, 'set_encoding'))
+        self._parser_encoding = None
+        self._coalesce_writes = coalesce_writes
+        self._write_buffer = []
+        self._flush_handle = None
+        self._corked = 0
+        self._stream = None
+        self._drain_waiter = None
+        self._reading_paused = None
+        self._resp3 = protocol == 3
+        self._max_inflight = max_inflight
+        self._write_buffer_limit = write_buffer_limit
+        self._backpressure = backpressure
+        self._limited = (max_inflight is not None or
+                         write_buffer_limit is not None)
+        # commands waiting for capacity
+        self._blocked = deque()
+        self._blocked_sender = None
+        self._capacity_waiter = None
+        self._write_buffer_nbytes = 0
+        if write_buffer_limit is not None:
+            writer.transport.set_write_buffer_limits(high=write_buffer_limit)
+        self._metrics = metrics
+        self._hooks = list(hooks or ())
+        if metrics is not None:
+            self._hooks.append(metrics)
+        # (command, [(hook, context), ...]) of commands waiting for reply;
+        # kept in line with waiters while there are hooks registered
+        self._hooked = deque()
+        self._stream_hooked = None
+        # parser of RESP3 push message received before streamed reply
+        self._push_parser = None
+        # loop time data was last received at (used by pool health checks)
+        self._last_read = loop.time()
+        # loop time connection was created at (used by pool max_lifetime)
+        self._created_at = self._last_read
 
     def __repr__(self):
         return '<RedisConnection [db:{}]>'.format(self._db)
@@ -159,6 +296,8 @@ class RedisConnection(AbcConnection):
         """Response reader task."""
         while not self._reader.at_eof():
             try:
+                if self._reading_paused is not None:
+                    yield from self._reading_paused
                 data = yield from self._reader.read(MAX_CHUNK_SIZE)
             except asyncio.CancelledError:
                 break
@@ -170,32 +309,104 @@ class RedisConnection(AbcConnection):
             if data == b'' and self._reader.at_eof():
                 logger.debug("Connection has been closed by server")
                 break
-            self._parser.feed(data)
-            while True:
-                try:
-                    obj = self._parser.gets()
-                except ProtocolError as exc:
-                    # ProtocolError is fatal
-                    # so connection must be closed
-                    if self._in_transaction is not None:
-                        self._transaction_error = exc
-                    self._closing = True
-                    self._do_close(exc)
-                    return
-                else:
-                    if obj is False:
-                        break
-                    if self._in_pubsub:
-                        self._process_pubsub(obj)
-                    else:
-                        self._process_data(obj)
+            if not self._feed_data(data):
+                return
         self._closing = True
         self._do_close(None)
 
+    def _feed_data(self, data):
+        """Feeds data to parser and processes all complete replies.
+
+        Returns False if connection has been closed due to protocol error.
+        """
+        self._last_read = self._loop.time()
+        if self._hooks:
+            self._hook_receive(len(data))
+        if self._stream is not None:
+            try:
+                if self._resp3:
+                    data = self._feed_push(data)
+                if data:
+                    data = self._stream.feed(data)
+            except ProtocolError as exc:
+                self._closing = True
+                self._do_close(exc)
+                return False
+            if not data:
+                return True
+        self._parser.feed(data)
+        while True:
+            if self._parser_decodes:
+                self._update_parser_encoding()
+            try:
+                obj = self._parser.gets()
+            except UnicodeDecodeError as exc:
+                # reply is consumed, fail its waiter
+                self._process_data(exc)
+                continue
+            except ProtocolError as exc:
+                # ProtocolError is fatal
+                # so connection must be closed
+                if self._in_transaction is not None:
+                    self._transaction_error = exc
+                self._closing = True
+                self._do_close(exc)
+                return False
+            else:
+                if obj is False:
+                    if self._drain_waiter is not None:
+                        self._check_drained()
+                    return True
+                if type(obj) is PushMessage:
+                    self._process_push(obj)
+                elif self._in_pubsub and not self._resp3:
+                    self._process_pubsub(obj)
+                else:
+                    self._process_data(obj)
+
+    def _feed_push(self, data):
+        """Processes RESP3 push messages received before streamed reply
+        (ie: invalidation messages) and returns data left.
+        """
+        while data and (self._push_parser is not None or
+                        (data[:1] == b'>' and self._stream._at_start())):
+            parser = self._push_parser
+            if parser is None:
+                parser = self._push_parser = Parser(
+                    ProtocolError, ReplyError, None)
+            parser.feed(data)
+            obj = parser.parse_one()
+            if obj is False:
+                return b''
+            self._push_parser = None
+            data = bytes(parser.buf[parser.pos:])
+            self._process_push(obj)
+        return data
+
+    def _update_parser_encoding(self):
+        encoding = None
+        if self._waiters and not self._in_pubsub:
+            if self._waiters[0][1] == self._encoding:
+                encoding = self._encoding
+        if encoding != self._parser_encoding:
+            self._parser.set_encoding(encoding, 'strict')
+            self._parser_encoding = encoding
+
     def _process_data(self, obj):
         """Processes command results."""
         assert len(self._waiters) > 0, (type(obj), obj)
         waiter, encoding, cb = self._waiters.popleft()
+        if self._hooks:
+            if (waiter.done() and not waiter.cancelled() and
+                    isinstance(waiter.exception(), asyncio.TimeoutError)):
+                # late reply of timed out command
+                self._hook_reply(self._hooked.popleft(), waiter.exception())
+            else:
+                self._hook_reply(self._hooked.popleft(), obj,
+                                 self._reply_size())
+        if self._capacity_waiter is not None:
+            fut, self._capacity_waiter = self._capacity_waiter, None
+            _set_result(fut, None)
         if isinstance(obj, RedisError):
             if isinstance(obj, ReplyError):
                 if obj.args[0].startswith('READONLY'):
@@ -203,14 +414,18 @@ class RedisConnection(AbcConnection):
             _set_exception(waiter, obj)
             if self._in_transaction is not None:
                 self._transaction_error = obj
+        elif isinstance(obj, UnicodeDecodeError):
+            _set_exception(waiter, obj)
         else:
-            if encoding is not None:
+            if encoding is not None and encoding != self._parser_encoding:
                 try:
                     obj = decode(obj, encoding)
                 except Exception as exc:
                     _set_exception(waiter, exc)
                     return
-            if cb is not None:
+            if cb is not None and not (self._in_transaction is not None and
+                                       obj in (b'QUEUED', 'QUEUED')):
+                # queued commands results are converted with EXEC reply
                 try:
                     obj = cb(obj)
                 except Exception as exc:
@@ -220,6 +435,23 @@ class RedisConnection(AbcConnection):
             if self._in_transaction is not None:
                 self._in_transaction.append((encoding, cb))
 
+    def _process_push(self, obj):
+        """Processes RESP3 push messages."""
+        kind = obj[0]
+        if kind in _PUBSUB_REPLIES:
+            # replies to (un)subscribe commands go in order with others
+            if self._in_pubsub:
+                self._process_pubsub(obj)
+            else:
+                self._process_data(obj)
+        elif kind in _PUBSUB_MESSAGES and self._in_pubsub:
+            self._process_pubsub(obj)
+        elif (kind == b'invalidate' and
+                INVALIDATE_CHANNEL in self._pubsub_channels):
+            self._pubsub_channels[INVALIDATE_CHANNEL].put_nowait(obj[1])
+        else:
+            logger.warning("Unknown push message received %r", obj)
+
     def _process_pubsub(self, obj, *, process_waiters=True):
         """Processes pubsub messages."""
         kind, *pattern, chan, data = obj
@@ -247,9 +479,18 @@ class RedisConnection(AbcConnection):
         else:
             logger.warning("Unknown pubsub message received %r", obj)
 
-    def execute(self, command, *args, encoding=_NOTSET):
+    def execute(self, command, *args, encoding=_NOTSET, timeout=None,
+                converter=None):
         """Executes redis command and returns Future waiting for the answer.
 
+        If timeout is given the Future fails with asyncio.TimeoutError
+        when reply is not received in time; the reply is still read
+        (and discarded) when it arrives so connection stays usable.
+
+        If converter is given it is called with (decoded) reply
+        and its result is set to the Future; inside MULTI/EXEC block
+        it is called with command's result of EXEC.
+
         Raises:
         * TypeError if any of args can not be encoded as bytes.
         * ReplyError on redis '-ERR' resonses.
@@ -260,11 +501,11 @@ class RedisConnection(AbcConnection):
             raise ConnectionClosedError("Connection closed or corrupted")
         if command is None:
             raise TypeError("command must not be None")
-        if None in set(args):
+        if None in args:
             raise TypeError("args must not contain None")
         command = command.upper().strip()
         is_pubsub = command in _PUBSUB_COMMANDS
-        if self._in_pubsub and not is_pubsub:
+        if self._in_pubsub and not is_pubsub and not self._resp3:
             raise RedisError("Connection in SUBSCRIBE mode")
         elif is_pubsub:
             logger.warning("Deprecated. Use `execute_pubsub` method directly")
@@ -280,13 +521,86 @@ class RedisConnection(AbcConnection):
             cb = partial(self._end_transaction, discard=True)
         else:
             cb = None
+        if converter is not None:
+            cb = converter if cb is None else _chain(cb, converter)
         if encoding is _NOTSET:
             encoding = self._encoding
+        if timeout is not None and timeout <= 0:
+            raise ValueError("timeout must be positive or None")
+        buffers = encode_command_buffers(command, *args)
         fut = create_future(loop=self._loop)
-        self._writer.write(encode_command(command, *args))
-        self._waiters.append((fut, encoding, cb))
+        if timeout is not None:
+            handle = self._loop.call_later(timeout, _set_timeout, fut)
+            fut.add_done_callback(lambda fut: handle.cancel())
+        if self._limited and (self._blocked or not self._has_capacity()):
+            if self._backpressure == 'raise':
+                raise BackpressureError(
+                    "Too many pending commands or bytes to write")
+            # command is queued right away so commands are sent
+            # in order they were issued
+            self._blocked.append((fut, command, len(args), buffers,
+                                  encoding, cb))
+            if self._blocked_sender is None:
+                self._blocked_sender = async_task(self._send_blocked(),
+                                                  loop=self._loop)
+            return fut
+        self._send(fut, command, len(args), buffers, encoding, cb)
         return fut
 
+    def _send(self, fut, command, nargs, buffers, encoding, cb):
+        self._write(buffers)
+        self._waiters.append((fut, encoding, cb))
+        if self._hooks:
+            self._hook_send(command, nargs, sum(map(len, buffers)))
+
+    @asyncio.coroutine
+    def _send_blocked(self):
+        """Waits for capacity and sends blocked commands in order."""
+        try:
+            while self._blocked and not self.closed:
+                if not self._has_capacity():
+                    yield from self._wait_capacity()
+                    continue
+                fut, *command = self._blocked.popleft()
+                # cancelled or timed out while waiting
+                if not fut.done():
+                    self._send(fut, *command)
+        finally:
+            self._blocked_sender = None
+            while self._blocked:
+                fut, *spam = self._blocked.popleft()
+                _set_exception(fut, ConnectionClosedError(
+                    "Connection closed or corrupted"))
+
+    def _has_capacity(self):
+        if (self._max_inflight is not None and
+                len(self._waiters) >= self._max_inflight):
+            return False
+        limit = self._write_buffer_limit
+        # bytes held back by cork or writes coalescing are counted too
+        return (limit is None or
+                self._writer.transport.get_write_buffer_size() +
+                self._write_buffer_nbytes <= limit)
+
+    @asyncio.coroutine
+    def _wait_capacity(self):
+        if (self._max_inflight is not None and
+                len(self._waiters) >= self._max_inflight):
+            if self._capacity_waiter is None or self._capacity_waiter.done():
+                self._capacity_waiter = create_future(loop=self._loop)
+            yield from self._capacity_waiter
+        elif self._write_buffer_nbytes and self._corked:
+            # wait for cork() block to exit
+            if self._capacity_waiter is None or self._capacity_waiter.done():
+                self._capacity_waiter = create_future(loop=self._loop)
+            yield from self._capacity_waiter
+        else:
+            self.flush()
+            try:
+                yield from self._writer.drain()
+            except ConnectionError:
+                pass
+
     def execute_pubsub(self, command, *channels):
         """Executes redis (p)subscribe/(p)unsubscribe commands.
 
@@ -298,7 +612,7 @@ class RedisConnection(AbcConnection):
             "Pub/Sub command expected", command)
         if self._reader is None or self._reader.at_eof():
             raise ConnectionClosedError("Connection closed or corrupted")
-        if None in set(channels):
+        if None in channels:
             raise TypeError("args must not contain None")
         if not len(channels):
             raise TypeError("No channels/patterns supplied")
@@ -309,37 +623,226 @@ class RedisConnection(AbcConnection):
         if not all(ch.is_pattern == is_pattern for ch in channels):
             raise ValueError("Not all channels {} match command {}"
                              .format(channels, command))
-        cmd = encode_command(command, *(ch.name for ch in channels))
+        cmd = encode_command_buffers(command,
+                                     *(ch.name for ch in channels))
+        nbytes = sum(map(len, cmd)) if self._hooks else 0
         res = []
         for ch in channels:
             fut = create_future(loop=self._loop)
             res.append(fut)
             cb = partial(self._update_pubsub, ch=ch)
             self._waiters.append((fut, None, cb))
-        self._writer.write(cmd)
+            if self._hooks:
+                # whole command size is reported with the first channel
+                self._hook_send(command, len(channels), nbytes)
+                nbytes = 0
+        self._write(cmd)
         return asyncio.gather(*res, loop=self._loop)
 
+    @asyncio.coroutine
+    def execute_streaming(self, command, *args, sink=None):
+        """Executes redis command replying with bulk-string and
+        streams reply body in chunks as it is received.
+
+        Waits for all pending replies, sends command and returns
+        BulkReplyStream once reply header is received
+        (or None for null reply).
+        Commands executed after this one are pipelined as usual
+        and get their replies after whole stream is received.
+
+        If sink callable is given it is called with every received
+        chunk instead of buffering chunks in stream.
+
+        RESP3 push messages received before reply are processed as usual.
+        """
+        if command is None:
+            raise TypeError("command must not be None")
+        if None in args:
+            raise TypeError("args must not contain None")
+        command = command.upper().strip()
+        if command in _PUBSUB_COMMANDS:
+            raise ValueError("Pub/Sub command can not be streamed")
+        while self._waiters or self._stream is not None:
+            if self._in_pubsub or self._in_transaction is not None:
+                break
+            if self._drain_waiter is None:
+                self._drain_waiter = create_future(loop=self._loop)
+            yield from asyncio.shield(self._drain_waiter, loop=self._loop)
+        if self._reader is None or self._reader.at_eof():
+            raise ConnectionClosedError("Connection closed or corrupted")
+        if self._in_pubsub:
+            raise RedisError("Connection in SUBSCRIBE mode")
+        if self._in_transaction is not None:
+            raise RedisError("Can not stream reply in MULTI/EXEC block")
+        stream = BulkReplyStream(self, sink=sink, loop=self._loop)
+        buffers = encode_command_buffers(command, *args)
+        self._write(buffers)
+        self._stream = stream
+        if self._hooks:
+            self._stream_hooked = self._call_send_hooks(
+                command, len(args), sum(map(len, buffers)))
+        try:
+            return (yield from stream._started)
+        except asyncio.CancelledError:
+            stream.close()
+            raise
+
+    def _stream_done(self, stream):
+        if self._stream is stream:
+            self._stream = None
+            if self._stream_hooked is not None:
+                hooked, self._stream_hooked = self._stream_hooked, None
+                exc = stream._exc
+                if exc is None and not stream._started.cancelled():
+                    exc = stream._started.exception()
+                nbytes = None
+                if exc is None and stream.size is not None:
+                    # $<size>\r\n<value>\r\n
+                    nbytes = len(str(stream.size)) + stream.size + 5
+                self._hook_reply(hooked, exc, nbytes)
+            if self._drain_waiter is not None:
+                self._check_drained()
+
+    @asyncio.coroutine
+    def _wait_drained(self):
+        """Waits until replies to all sent commands are received."""
+        while ((self._waiters or self._stream is not None) and
+               not self.closed):
+            if self._drain_waiter is None:
+                self._drain_waiter = create_future(loop=self._loop)
+            yield from asyncio.shield(self._drain_waiter, loop=self._loop)
+
+    def _check_drained(self):
+        if not self._waiters and self._stream is None:
+            fut, self._drain_waiter = self._drain_waiter, None
+            _set_result(fut, None)
+
+    def _pause_reading(self):
+        if self._reading_paused is None:
+            self._reading_paused = create_future(loop=self._loop)
+
+    def _resume_reading(self):
+        if self._reading_paused is not None:
+            fut, self._reading_paused = self._reading_paused, None
+            _set_result(fut, None)
+
+    def _write(self, buffers):
+        """Writes list of buffers to transport or keeps them if connection
+        is corked or writes coalescing is enabled.
+        """
+        if self._corked or self._coalesce_writes:
+            self._write_buffer.extend(buffers)
+            self._write_buffer_nbytes += sum(map(len, buffers))
+            if not self._corked and self._flush_handle is None:
+                self._flush_handle = self._loop.call_soon(self._flush_soon)
+        elif len(buffers) == 1:
+            self._writer.write(buffers[0])
+        else:
+            self._write_lines(buffers)
+
+    def _write_lines(self, buffers):
+        # transport.writelines() joins all buffers into one bytes object,
+        # so large arguments are written with separate write() calls
+        # (transport sends them from the buffer itself and copies
+        #  only the part which can not be sent right away).
+        small = []
+        for buf in buffers:
+            if len(buf) < ZERO_COPY_SIZE:
+                small.append(buf)
+                continue
+            if small:
+                self._writer.write(b''.join(small))
+                small = []
+            self._writer.write(buf)
+        if small:
+            self._writer.write(b''.join(small))
+
+    def _flush_soon(self):
+        self._flush_handle = None
+        if not self._corked:
+            self.flush()
+
+    def flush(self):
+        """Writes all buffered commands to transport."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._write_buffer and self._writer is not None:
+            buf, self._write_buffer = self._write_buffer, []
+            self._write_buffer_nbytes = 0
+            self._write_lines(buf)
+            if self._capacity_waiter is not None:
+                fut, self._capacity_waiter = self._capacity_waiter, None
+                _set_result(fut, None)
+
+    @contextlib.contextmanager
+    def cork(self):
+        """Context manager holding back commands written inside the block
+        and flushing them at once when block exits.
+
+        >>> with conn.cork():
+        ...     fut1 = conn.execute('GET', 'foo')
+        ...     fut2 = conn.execute('GET', 'bar')
+        >>> await asyncio.gather(fut1, fut2)
+        """
+        self._corked += 1
+        try:
+            yield self
+        finally:
+            self._corked -= 1
+            if not self._corked:
+                self.flush()
+
     def close(self):
-        """Close connection."""
+        """Close connection.
+
+        Commands held back by cork or writes coalescing are written
+        before transport is closed; their futures are cancelled
+        as ones of other pending commands.
+        """
         self._do_close(None)
 
     def _do_close(self, exc):
         if self._closed:
             return
+        if exc is None and not self._closing:
+            # commands held back by cork or writes coalescing are sent
+            # (as ones written already) before transport is closed
+            self.flush()
         self._closed = True
         self._closing = False
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._write_buffer.clear()
+        self._write_buffer_nbytes = 0
+        self._push_parser = None
+        self._reading_paused = None
         self._writer.transport.close()
         self._reader_task.cancel()
         self._reader_task = None
         self._writer = None
         self._reader = None
+        if self._hooked:
+            err = exc or ConnectionClosedError("Connection closed")
+            while self._hooked:
+                self._hook_reply(self._hooked.popleft(), err)
         while self._waiters:
             waiter, *spam = self._waiters.popleft()
             logger.debug("Cancelling waiter %r", (waiter, spam))
             if exc is None:
                 waiter.cancel()
             else:
-                waiter.set_exception(exc)
+                _set_exception(waiter, exc)
+        if self._stream is not None:
+            self._stream.set_exception(
+                exc or ConnectionClosedError("Connection closed"))
+        if self._drain_waiter is not None:
+            fut, self._drain_waiter = self._drain_waiter, None
+            _set_result(fut, None)
+        if self._capacity_waiter is not None:
+            fut, self._capacity_waiter = self._capacity_waiter, None
+            _set_result(fut, None)
         while self._pubsub_channels:
             _, ch = self._pubsub_channels.popitem()
             logger.debug("Closing pubsub channel %r", ch)
@@ -378,6 +881,87 @@ class RedisConnection(AbcConnection):
         """Redis server address, either host-port tuple or str."""
         return self._address
 
+    @property
+    def protocol(self):
+        """Redis protocol version (2 or 3)."""
+        return 3 if self._resp3 else 2
+
+    @property
+    def metrics(self):
+        """Metrics instance collecting connection's data or None."""
+        return self._metrics
+
+    @property
+    def hooks(self):
+        """Tuple of registered commands lifecycle hooks."""
+        return tuple(self._hooks)
+
+    def add_hook(self, hook):
+        """Registers commands lifecycle hook
+        (see :class:`aioredis.hooks.CommandHook`).
+        """
+        if not self._hooks:
+            # commands in flight were sent without hooks
+            self._hooked.extend((None, ()) for _ in self._waiters)
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook):
+        """Unregisters commands lifecycle hook.
+
+        Hook is still called for commands sent before it was removed.
+        Raises ValueError if hook is not registered.
+        """
+        self._hooks.remove(hook)
+        if not self._hooks:
+            self._hooked.clear()
+
+    def _call_send_hooks(self, command, nargs, nbytes):
+        now = self._loop.time()
+        return command, [
+            (hook, _call_hook(hook.on_send, self, command, nargs, nbytes, now))
+            for hook in self._hooks]
+
+    def _hook_send(self, command, nargs, nbytes):
+        self._hooked.append(self._call_send_hooks(command, nargs, nbytes))
+
+    def _hook_reply(self, hooked, error, nbytes=None):
+        command, contexts = hooked
+        now = self._loop.time()
+        if isinstance(error, Exception):
+            for hook, ctx in contexts:
+                _call_hook(hook.on_error, self, command, error, ctx, now)
+        else:
+            for hook, ctx in contexts:
+                _call_hook(hook.on_reply, self, command, ctx, now, nbytes)
+
+    def _reply_size(self):
+        # hiredis.Reader does not tell size of parsed reply
+        reply_size = getattr(self._parser, 'reply_size', None)
+        return reply_size() if reply_size is not None else None
+
+    def _hook_receive(self, nbytes):
+        now = self._loop.time()
+        for hook in self._hooks:
+            _call_hook(hook.on_receive, self, nbytes, now)
+
+    @property
+    def inflight(self):
+        """Number of commands waiting for reply."""
+        return len(self._waiters)
+
+    @property
+    def write_buffer_size(self):
+        """Number of bytes buffered and not yet sent."""
+        if self._writer is None:
+            return 0
+        return (self._writer.transport.get_write_buffer_size() +
+                self._write_buffer_nbytes)
+
+    @property
+    def corked(self):
+        """True if writes are held back by :meth:`cork`."""
+        return self._corked > 0
+
     def select(self, db):
         """Change the selected database for the current connection."""
         if not isinstance(db, int):
@@ -385,8 +969,7 @@ class RedisConnection(AbcConnection):
         if db < 0:
             raise ValueError("DB must be greater or equal 0, got {!r}"
                              .format(db))
-        fut = self.execute('SELECT', db)
-        return wait_ok(fut)
+        return self.execute('SELECT', db, converter=convert_ok)
 
     def _set_db(self, ok, args):
         assert ok in {b'OK', 'OK'}, ("Unexpected result of SELECT", ok)
@@ -466,5 +1049,152 @@ class RedisConnection(AbcConnection):
 
     def auth(self, password):
         """Authenticate to server."""
-        fut = self.execute('AUTH', password)
-        return wait_ok(fut)
+        return self.execute('AUTH', password, converter=convert_ok)
+
+
+class RedisProtocolConnection(RedisConnection):
+    """Redis connection processing replies right in asyncio.Protocol
+    callbacks.
+
+    Received data is fed to parser directly from ``data_received``
+    thus skipping StreamReader buffer and reading task wake up.
+    """
+
+    def __init__(self, reader, writer, **kwargs):
+        super().__init__(reader, writer, **kwargs)
+        reader.attach(self)
+
+    def __repr__(self):
+        return '<RedisProtocolConnection [db:{}]>'.format(self._db)
+
+    def _pause_reading(self):
+        if self._writer is not None:
+            self._writer.transport.pause_reading()
+
+    def _resume_reading(self):
+        if self._writer is not None:
+            self._writer.transport.resume_reading()
+
+    @asyncio.coroutine
+    def _read_data(self):
+        """Waits until connection is lost."""
+        try:
+            exc = yield from self._reader.wait_lost()
+        except asyncio.CancelledError:
+            pass
+        else:
+            if exc is not None:
+                logger.error("Connection lost %r", exc)
+            else:
+                logger.debug("Connection has been closed by server")
+        self._closing = True
+        self._do_close(None)
+
+
+class _RedisProtocol(asyncio.streams.FlowControlMixin, asyncio.Protocol):
+    """Protocol passing received data straight to RedisProtocolConnection.
+
+    Also mimics ``StreamReader.at_eof()`` so connection can check
+    whether transport is still readable.
+    """
+
+    def __init__(self, *, loop=None):
+        if loop is None:
+            loop = asyncio.get_event_loop()
+        super().__init__(loop=loop)
+        self._connection = None
+        self._pending = []
+        self._eof = False
+        self._lost_waiter = create_future(loop=loop)
+
+    def attach(self, connection):
+        assert self._connection is None, "Connection is already attached"
+        self._connection = connection
+        pending, self._pending = self._pending, []
+        for data in pending:
+            self.data_received(data)
+
+    def data_received(self, data):
+        conn = self._connection
+        if conn is None:
+            self._pending.append(data)
+        elif not conn._closed:
+            conn._feed_data(data)
+
+    def eof_received(self):
+        self._eof = True
+
+    def connection_lost(self, exc):
+        super().connection_lost(exc)
+        self._eof = True
+        if not self._lost_waiter.done():
+            self._lost_waiter.set_result(exc)
+
+    def at_eof(self):
+        return self._eof
+
+    @asyncio.coroutine
+    def wait_lost(self):
+        """Waits until connection is lost; returns connection error if any.
+        """
+        return (yield from self._lost_waiter)
+
+
+@asyncio.coroutine
+def _open_connection(host=None, port=None, *, loop=None, **kwargs):
+    """Same as asyncio.open_connection but returns _RedisProtocol
+    in place of StreamReader.
+    """
+    if loop is None:
+        loop = asyncio.get_event_loop()
+    protocol = _RedisProtocol(loop=loop)
+    transport, _ = yield from loop.create_connection(
+        lambda: protocol, host, port, **kwargs)
+    writer = asyncio.StreamWriter(transport, protocol, None, loop)
+    return protocol, writer
+
+
+@asyncio.coroutine
+def _open_unix_connection(path=None, *, loop=None, **kwargs):
+    """Same as asyncio.open_unix_connection but returns _RedisProtocol
+    in place of StreamReader.
+    """
+    if loop is None:
+        loop = asyncio.get_event_loop()
+    protocol = _RedisProtocol(loop=loop)
+    transport, _ = yield from loop.create_unix_connection(
+        lambda: protocol, path, **kwargs)
+    writer = asyncio.StreamWriter(transport, protocol, None, loop)
+    return protocol, writer
+
+
+def _set_keepalive(sock, interval):
+    # same probes as redis-server sends (see anetKeepAlive):
+    # first after interval seconds, then every interval / 3 seconds,
+    # connection is closed after 3 unanswered probes.
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    opts = (
+        (getattr(socket, 'TCP_KEEPIDLE', None), interval),
+        (getattr(socket, 'TCP_KEEPINTVL', None), interval / 3),
+        (getattr(socket, 'TCP_KEEPCNT', None), 3),
+        )
+    for opt, value in opts:
+        if opt is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, opt, max(1, int(value)))
+
+
+def _set_user_timeout(sock, timeout):
+    # socket.TCP_USER_TIMEOUT is defined since Python 3.6
+    opt = getattr(socket, 'TCP_USER_TIMEOUT', _TCP_USER_TIMEOUT)
+    if opt is None:
+        logger.warning("TCP_USER_TIMEOUT is not supported on %s",
+                       sys.platform)
+        return
+    sock.setsockopt(socket.IPPROTO_TCP, opt, int(timeout * 1000))
+
+
+_TCP_USER_TIMEOUT = 18 if sys.platform.startswith('linux') else None
+
+
+def _chain(cb, converter):
+    return lambda obj: converter(cb(obj))
@@ -11,6 +11,7 @@ __all__ = [
     'MasterNotFoundError',
     'SlaveNotFoundError',
     'ReadOnlyError',
+    'BackpressureError',
     ]
 
 
@@ -64,3 +65,9 @@ class ConnectionClosedError(RedisError):
 
 class PoolClosedError(RedisError):
     """Raised if pool is closed."""
+
+
+class BackpressureError(RedisError):
+    """Raised if connection has too many commands in flight
+    or too many bytes to write (with ``backpressure='raise'``).
+    """
@@ -0,0 +1,67 @@
+from .log import logger
+
+__all__ = [
+    'CommandHook',
+]
+
+
+class CommandHook:
+    """Base class of commands lifecycle hooks.
+
+    Hooks are registered with connection (or pool) ``hooks`` argument
+    or ``add_hook()`` method and are called for every command sent
+    through the connection; all methods do nothing by default.
+
+    Timestamps are event loop time (``loop.time()``).
+
+    Usage example:
+
+    >>> class SlowLog(CommandHook):
+    ...     def on_send(self, conn, command, nargs, nbytes, timestamp):
+    ...         return timestamp
+    ...     def on_reply(self, conn, command, context, timestamp, nbytes):
+    ...         if timestamp - context > .1:
+    ...             print("slow command", command)
+    >>> redis = await aioredis.create_redis_pool(
+    ...     ('localhost', 6379), hooks=[SlowLog()])
+    """
+
+    def on_send(self, conn, command, nargs, nbytes, timestamp):
+        """Called when command is encoded and written to connection.
+
+        ``nargs`` is number of command arguments and ``nbytes`` is
+        size of encoded command (for pub/sub commands the hook is called
+        once per channel; whole command size is reported with the first
+        channel and 0 with the rest).
+
+        Returned value is passed as ``context`` to :meth:`on_reply` or
+        :meth:`on_error` of the same command.
+        """
+
+    def on_reply(self, conn, command, context, timestamp, nbytes):
+        """Called when command reply is parsed.
+
+        ``nbytes`` is size of reply or None if it is not known
+        (hiredis parser does not tell size of parsed reply).
+        """
+
+    def on_error(self, conn, command, error, context, timestamp):
+        """Called when error reply is received, reply of timed out
+        command is received or connection is closed before reply
+        is received.
+
+        ``error`` is :exc:`~aioredis.ReplyError` instance in the first case,
+        :exc:`asyncio.TimeoutError` in the second
+        and :exc:`~aioredis.ConnectionClosedError` (or error connection
+        is closed with) in the third.
+        """
+
+    def on_receive(self, conn, nbytes, timestamp):
+        """Called when chunk of data is read from connection."""
+
+
+def _call_hook(method, *args):
+    try:
+        return method(*args)
+    except Exception:
+        logger.exception("Hook %r failed", method)
@@ -0,0 +1,228 @@
+import asyncio
+
+from bisect import bisect_left
+
+from .errors import ReplyError, ConnectionClosedError
+from .hooks import CommandHook
+
+__all__ = [
+    'Histogram',
+    'Metrics',
+]
+
+# Default latency buckets upper bounds (seconds)
+LATENCY_BUCKETS = (
+    .0001, .00025, .0005, .001, .0025, .005,
+    .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10,
+    )
+
+# In-flight commands depth buckets upper bounds
+DEPTH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+
+class Histogram:
+    """Fixed-buckets histogram.
+
+    Buckets are given by their upper bounds; values greater than
+    the last bound are counted in implicit ``+Inf`` bucket.
+    """
+
+    __slots__ = ('_bounds', '_counts', 'count', 'sum')
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        bounds = tuple(buckets)
+        if not bounds or list(bounds) != sorted(set(bounds)):
+            raise ValueError("Buckets must be non-empty and sorted")
+        self._bounds = bounds
+        self._counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0
+
+    def __repr__(self):
+        return '<Histogram count:{} sum:{}>'.format(self.count, self.sum)
+
+    @property
+    def buckets(self):
+        """Buckets upper bounds."""
+        return self._bounds
+
+    def observe(self, value):
+        """Records value."""
+        self._counts[bisect_left(self._bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self):
+        """Returns dict with cumulative buckets counts
+        (``{upper bound: count of values <= bound}``),
+        values count and sum.
+        """
+        buckets = {}
+        total = 0
+        for bound, count in zip(self._bounds + (float('inf'),),
+                                self._counts):
+            total += count
+            buckets[bound] = total
+        return {'buckets': buckets, 'count': self.count, 'sum': self.sum}
+
+    def update(self, other):
+        """Adds counts of other histogram with same buckets."""
+        if other._bounds != self._bounds:
+            raise ValueError("Histograms buckets differ")
+        for i, count in enumerate(other._counts):
+            self._counts[i] += count
+        self.count += other.count
+        self.sum += other.sum
+
+    def quantile(self, q, *, since=None):
+        """Returns upper bound of the bucket q-quantile falls in
+        (``inf`` for implicit bucket, None if there are no values).
+
+        If ``since`` is a copy of this histogram taken earlier
+        only values observed after it was taken are considered.
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("Quantile must be between 0 and 1")
+        counts = self._counts
+        if since is not None and since.count <= self.count:
+            if since._bounds != self._bounds:
+                raise ValueError("Histograms buckets differ")
+            counts = [a - b for a, b in zip(counts, since._counts)]
+        total = sum(counts)
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for bound, count in zip(self._bounds, counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+
+class CommandStats:
+    """Latency histogram and errors count of one command."""
+
+    __slots__ = ('latency', 'errors')
+
+    def __init__(self, buckets):
+        self.latency = Histogram(buckets)
+        self.errors = 0
+
+    def snapshot(self):
+        return {'latency': self.latency.snapshot(), 'errors': self.errors}
+
+    def update(self, other):
+        self.latency.update(other.latency)
+        self.errors += other.errors
+
+
+class Metrics(CommandHook):
+    """Connections instrumentation data.
+
+    Single instance can be shared by several connections
+    (ie: all connections of a pool) to collect their totals.
+    Metrics is a commands lifecycle hook, so it can also be registered
+    with ``add_hook()`` method.
+
+    Usage example:
+
+    >>> metrics = Metrics()
+    >>> redis = await aioredis.create_redis_pool(
+    ...     ('localhost', 6379), metrics=metrics)
+    >>> await redis.get('key')
+    >>> metrics.snapshot()['commands']['GET']['latency']['count']
+    1
+    """
+
+    def __init__(self, latency_buckets=LATENCY_BUCKETS,
+                 depth_buckets=DEPTH_BUCKETS):
+        # validate buckets once
+        Histogram(latency_buckets)
+        self._latency_buckets = tuple(latency_buckets)
+        self._depth_buckets = tuple(depth_buckets)
+        self.inflight = 0
+        self.reset()
+
+    def __repr__(self):
+        return '<Metrics commands:{} sent:{} received:{}>'.format(
+            len(self.commands), self.bytes_sent, self.bytes_received)
+
+    def latency(self):
+        """Returns latency histogram of all commands."""
+        hist = Histogram(self._latency_buckets)
+        for stats in self.commands.values():
+            hist.update(stats.latency)
+        return hist
+
+    def reset(self):
+        """Resets all collected data (except in-flight gauge)."""
+        self.commands = {}
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.inflight_depth = Histogram(self._depth_buckets)
+
+    def snapshot(self):
+        """Returns collected data as a dict::
+
+            {'commands': {name: {'latency': {'buckets': {...},
+                                             'count': int,
+                                             'sum': float},
+                                 'errors': int}},
+             'bytes_sent': int,
+             'bytes_received': int,
+             'inflight': int,
+             'inflight_depth': {'buckets': {...}, 'count': int, 'sum': int}}
+        """
+        commands = {}
+        for name, stats in self.commands.items():
+            # commands are recorded as passed to execute (str or bytes)
+            if isinstance(name, bytes):
+                name = name.decode('utf-8')
+            if name in commands:
+                merged = CommandStats(self._latency_buckets)
+                merged.update(commands[name])
+                merged.update(stats)
+                stats = merged
+            commands[name] = stats
+        return {
+            'commands': {name: stats.snapshot()
+                         for name, stats in commands.items()},
+            'bytes_sent': self.bytes_sent,
+            'bytes_received': self.bytes_received,
+            'inflight': self.inflight,
+            'inflight_depth': self.inflight_depth.snapshot(),
+            }
+
+    # hook methods
+
+    def on_send(self, conn, command, nargs, nbytes, timestamp):
+        self.bytes_sent += nbytes
+        self.inflight += 1
+        self.inflight_depth.observe(conn.inflight)
+        return timestamp
+
+    def on_reply(self, conn, command, context, timestamp, nbytes):
+        self.inflight -= 1
+        self._stats(command).latency.observe(timestamp - context)
+
+    def on_error(self, conn, command, error, context, timestamp):
+        self.inflight -= 1
+        if isinstance(error, (ReplyError, asyncio.TimeoutError)):
+            stats = self._stats(command)
+            stats.latency.observe(timestamp - context)
+            stats.errors += 1
+        elif isinstance(error, (ConnectionClosedError, ConnectionError)):
+            # latency of commands dropped on connection close
+            # is not recorded
+            self._stats(command).errors += 1
+
+    def on_receive(self, conn, nbytes, timestamp):
+        self.bytes_received += nbytes
+
+    def _stats(self, command):
+        stats = self.commands.get(command)
+        if stats is None:
+            stats = self.commands[command] = CommandStats(
+                self._latency_buckets)
+        return stats
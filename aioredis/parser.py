@@ -1,21 +1,25 @@
 from .errors import ProtocolError, ReplyError
 
 __all__ = [
-    'Reader', 'PyReader',
+    'Reader', 'PyReader', 'PushMessage',
 ]
 
 
 class PyReader:
     """Pure-Python Redis protocol parser that follows hiredis.Reader
     interface (except setmaxbuf/getmaxbuf).
+
+    Besides RESP2 it understands RESP3 types: maps are returned as dicts,
+    sets as lists, push messages as PushMessage lists;
+    attributes are skipped.
     """
     def __init__(self, protocolError=ProtocolError, replyError=ReplyError,
-                 encoding=None):
+                 encoding=None, errors=None):
         if not callable(protocolError):
             raise TypeError("Expected a callable")
         if not callable(replyError):
             raise TypeError("Expected a callable")
-        self._parser = Parser(protocolError, replyError, encoding)
+        self._parser = Parser(protocolError, replyError, encoding, errors)
 
     def feed(self, data, o=0, l=-1):
         """Feed data to parser."""
@@ -25,7 +29,7 @@ class PyReader:
             raise ValueError("negative input")
         if o + l > len(data):
             raise ValueError("input is larger than buffer size")
-        self._parser.buf.extend(data[o:o+l])
+        self._parser.feed(data[o:o+l])
 
     def gets(self):
         """Get parsed value or False otherwise.
@@ -35,6 +39,22 @@ class PyReader:
         """
         return self._parser.parse_one()
 
+    def set_encoding(self, encoding=None, errors=None):
+        """Set encoding used to decode strings of following replies.
+
+        If errors is None strings which can not be decoded are returned
+        as bytes, otherwise it is passed to bytes.decode() and
+        UnicodeDecodeError is raised once whole reply is parsed.
+        """
+        self._parser.encoding = encoding
+        self._parser.errors = errors
+
+    def reply_size(self):
+        """Number of bytes taken by last parsed reply
+        (not in hiredis.Reader interface).
+        """
+        return self._parser.nbytes
+
     def setmaxbuf(self, size):
         """No-op."""
         pass
@@ -44,117 +64,221 @@ class PyReader:
         return 0
 
 
+# Parser.parse_value() markers
+_NOT_ENOUGH_DATA = object()
+_AGGREGATE = object()
+
+# Do not compact buffer until this many bytes have been consumed
+_COMPACT_SIZE = 64 * 1024
+
+
 class Parser:
-    def __init__(self, protocolError, replyError, encoding):
+    """Index-based Redis protocol parser.
+
+    Data is scanned with a moving offset; consumed bytes are dropped
+    from buffer only when they take more than a half of it.
+    Partially parsed multi-bulk replies are kept in an explicit stack
+    so parsing is resumed right where it stopped.
+    """
+
+    def __init__(self, protocolError, replyError, encoding, errors=None):
         self.buf = bytearray()
         self.pos = 0
         self.protocolError = protocolError
         self.replyError = replyError
         self.encoding = encoding
+        self.errors = errors
         self._err = None
-        self._gen = None
-
-    def waitsome(self, size):
-        # keep yielding false until at least `size` bytes added to buf.
-        while len(self.buf) < self.pos+size:
-            yield False
-
-    def waitany(self):
-        yield from self.waitsome(len(self.buf) + 1)
-
-    def readone(self):
-        if not self.buf[self.pos:1]:
-            yield from self.waitany()
-        val = self.buf[self.pos:1]
-        self.pos += 1
-        return val
-
-    def readline(self, size=None):
-        if size is not None:
-            if len(self.buf) < size + 2 + self.pos:
-                yield from self.waitsome(size + 2)
-            offset = self.pos + size
-            if self.buf[offset:offset+2] != b'\r\n':
-                raise self.error("Expected b'\r\n'")
-        else:
-            offset = self.buf.find(b'\r\n', self.pos)
-            while offset < 0:
-                yield from self.waitany()
-                offset = self.buf.find(b'\r\n', self.pos)
-        val = self.buf[self.pos:offset]
-        self.pos = 0
-        del self.buf[:offset + 2]
-        return val
+        # offset of reply being parsed and size of last parsed one
+        self._start = 0
+        self.nbytes = None
+        # stack of [items, number of missing items,
+        #           first nested error, aggregate type]
+        self._stack = []
 
-    def readint(self):
-        try:
-            return int((yield from self.readline()))
-        except ValueError as exc:
-            raise self.error(exc)
+    def feed(self, data):
+        buf = self.buf
+        pos = self.pos
+        if pos:
+            if pos == len(buf):
+                del buf[:]
+                self.pos = 0
+                self._start -= pos
+            elif pos >= _COMPACT_SIZE and pos * 2 >= len(buf):
+                del buf[:pos]
+                self.pos = 0
+                self._start -= pos
+        buf.extend(data)
 
     def error(self, msg):
         self._err = self.protocolError(msg)
         return self._err
 
-    def parse(self, is_bulk=False):
+    def parse_int(self, start, end):
+        try:
+            return int(self.buf[start:end])
+        except ValueError as exc:
+            raise self.error(exc)
+
+    def decode(self, val):
+        if self.encoding:
+            if self.errors is not None:
+                return val.decode(self.encoding, self.errors)
+            try:
+                return val.decode(self.encoding)
+            except UnicodeDecodeError:
+                pass
+        return bytes(val)
+
+    def parse_value(self):
+        """Parses single value at current position.
+
+        Returns _NOT_ENOUGH_DATA if value is incomplete or _AGGREGATE
+        if aggregate type header has been parsed and pushed to stack.
+        """
+        buf = self.buf
+        pos = self.pos
+        if pos >= len(buf):
+            return _NOT_ENOUGH_DATA
+        ctl = buf[pos]
+        if ctl not in _CONTROL_CHARS:
+            raise self.error("Invalid first byte: {!r}"
+                             .format(bytes(buf[pos:pos+1])))
+        end = buf.find(b'\r\n', pos + 1)
+        if end < 0:
+            return _NOT_ENOUGH_DATA
+        if ctl in _BLOB_TYPES:
+            size = self.parse_int(pos + 1, end)
+            if size < 0:
+                if size != -1:
+                    raise self.error("Invalid bulk length: {}".format(size))
+                self.pos = end + 2
+                return None
+            start = end + 2
+            end = start + size
+            if len(buf) < end + 2:
+                return _NOT_ENOUGH_DATA
+            if buf[end:end+2] != b'\r\n':
+                raise self.error("Expected b'\\r\\n'")
+            self.pos = end + 2
+            if ctl == 36:   # b'$'
+                return self.decode(buf[start:end])
+            if ctl == 61:   # b'=' verbatim string, skip 'txt:' format
+                return self.decode(buf[start+4:end])
+            # b'!' blob error
+            return self.replyError(buf[start:end].decode('utf-8'))
+        self.pos = end + 2
+        if ctl in _AGGREGATE_TYPES:
+            size = self.parse_int(pos + 1, end)
+            if size < 1:
+                if size == -1 and ctl == 42:
+                    return None
+                if size != 0:
+                    raise self.error(
+                        "Invalid multi-bulk length: {}".format(size))
+                if ctl == 124:  # b'|' no attributes
+                    return self.parse_value()
+                return self.make_aggregate(ctl, [])
+            if ctl == 37 or ctl == 124:     # b'%' or b'|'
+                size *= 2
+            self._stack.append([[], size, None, ctl])
+            return _AGGREGATE
+        if ctl == 58:   # b':'
+            return self.parse_int(pos + 1, end)
+        if ctl == 43:   # b'+'
+            return self.decode(buf[pos+1:end])
+        if ctl == 45:   # b'-'
+            return self.replyError(buf[pos+1:end].decode('utf-8'))
+        if ctl == 95:   # b'_'
+            return None
+        if ctl == 44:   # b','
+            try:
+                return float(buf[pos+1:end])
+            except ValueError as exc:
+                raise self.error(exc)
+        if ctl == 40:   # b'('
+            return self.parse_int(pos + 1, end)
+        # b'#'
+        val = buf[pos+1:end]
+        if val == b't':
+            return True
+        if val == b'f':
+            return False
+        raise self.error("Invalid boolean value: {!r}".format(bytes(val)))
+
+    def make_aggregate(self, ctl, items):
+        if ctl == 37:   # b'%'
+            it = iter(items)
+            try:
+                return dict(zip(it, it))
+            except TypeError:
+                # unhashable (aggregate) keys
+                it = iter(items)
+                return {_hashable(key): val for key, val in zip(it, it)}
+        if ctl == 62:   # b'>'
+            return PushMessage(items)
+        # b'*' and b'~'
+        return items
+
+    def parse_one(self):
         if self._err is not None:
             raise self._err
-        ctl = yield from self.readone()
-        if ctl == b'+':
-            val = yield from self.readline()
-            if self.encoding is not None:
-                try:
-                    return val.decode(self.encoding)
-                except UnicodeDecodeError:
-                    pass
-            return bytes(val)
-        elif ctl == b'-':
-            val = yield from self.readline()
-            return self.replyError(val.decode('utf-8'))
-        elif ctl == b':':
-            return (yield from self.readint())
-        elif ctl == b'$':
-            val = yield from self.readint()
-            if val == -1:
-                return None
-            val = yield from self.readline(val)
-            if self.encoding:
-                try:
-                    return val.decode(self.encoding)
-                except UnicodeDecodeError:
-                    pass
-            return bytes(val)
-        elif ctl == b'*':
-            val = yield from self.readint()
-            if val == -1:
-                return None
-            bulk_array = []
+        stack = self._stack
+        if not stack:
+            self._start = self.pos
+        while True:
             error = None
-            for _ in range(val):
-                try:
-                    bulk_array.append((yield from self.parse(is_bulk=True)))
-                except LookupError as err:
-                    if error is None:
-                        error = err
-            if error is not None:
-                raise error
-            return bulk_array
-        else:
-            raise self.error("Invalid first byte: {!r}".format(ctl))
+            try:
+                obj = self.parse_value()
+            except (LookupError, UnicodeDecodeError) as err:
+                # value is consumed, error is raised
+                # when whole reply is parsed
+                if not stack:
+                    raise
+                obj, error = None, err
+            if obj is _NOT_ENOUGH_DATA:
+                return False
+            if obj is _AGGREGATE:
+                continue
+            while stack:
+                frame = stack[-1]
+                if error is not None and frame[2] is None:
+                    frame[2] = error
+                frame[0].append(obj)
+                frame[1] -= 1
+                if frame[1]:
+                    break
+                stack.pop()
+                obj, error, ctl = frame[0], frame[2], frame[3]
+                if ctl == 124:  # b'|' attributes are dropped
+                    break
+                if ctl != 42:
+                    obj = self.make_aggregate(ctl, obj)
+            else:
+                self.nbytes = self.pos - self._start
+                if error is not None:
+                    raise error
+                return obj
 
-    def parse_one(self):
-        if self._gen is None:
-            self._gen = self.parse()
-        try:
-            self._gen.send(None)
-        except StopIteration as exc:
-            self._gen = None
-            return exc.value
-        except Exception:
-            self._gen = None
-            raise
-        else:
-            return False
+
+class PushMessage(list):
+    """RESP3 push message (out of band data, ie: pub/sub messages)."""
+
+    __slots__ = ()
+
+
+def _hashable(obj):
+    if isinstance(obj, list):
+        return tuple(_hashable(o) for o in obj)
+    if isinstance(obj, dict):
+        return tuple((k, _hashable(v)) for k, v in obj.items())
+    return obj
+
+
+# RESP2 and RESP3 type markers
+_CONTROL_CHARS = frozenset(b'+-:$*_#,(=!%~|>')
+_BLOB_TYPES = frozenset(b'$=!')
+_AGGREGATE_TYPES = frozenset(b'*%~|>')
 
 
 try:
@@ -6,7 +6,7 @@ import types
 
 from .connection import create_connection, _PUBSUB_COMMANDS
 from .log import logger
-from .util import async_task, _NOTSET
+from .util import async_task, create_future, _NOTSET
 from .errors import PoolClosedError
 from .abc import AbcPool
 from .locks import Lock
@@ -14,12 +14,58 @@ from .locks import Lock
 
 PY_35 = sys.version_info >= (3, 5)
 
+# Released connection waiting for replies of timed out commands
+# is closed if replies are not received within this many seconds.
+DRAIN_TIMEOUT = 5
+
+# Idle connection is closed if it does not reply to health check PING
+# within this many seconds.
+HEALTH_CHECK_TIMEOUT = 2
+
+# Pool size is adjusted (see idle_timeout, max_lifetime and scale_up_*
+# options) every this many seconds.
+AUTOSCALE_INTERVAL = 1
+
+# Commands blocking connection until data is available
+# (routed to blocking commands sub-pool, see blocking_maxsize).
+_BLOCKING_COMMANDS = frozenset([
+    'BLPOP', b'BLPOP',
+    'BRPOP', b'BRPOP',
+    'BRPOPLPUSH', b'BRPOPLPUSH',
+    'BLMOVE', b'BLMOVE',
+    'BZPOPMIN', b'BZPOPMIN',
+    'BZPOPMAX', b'BZPOPMAX',
+    ])
+# Commands blocking only with BLOCK option
+_BLOCK_OPTION_COMMANDS = frozenset([
+    'XREAD', b'XREAD',
+    'XREADGROUP', b'XREADGROUP',
+    ])
+
+
+def _is_blocking(command, args):
+    command = command.upper()
+    if command in _BLOCKING_COMMANDS:
+        return True
+    if command in _BLOCK_OPTION_COMMANDS:
+        return any(isinstance(arg, (str, bytes)) and
+                   arg.upper() in ('BLOCK', b'BLOCK') for arg in args)
+    return False
+
 
 @asyncio.coroutine
 def create_pool(address, *, db=None, password=None, ssl=None, encoding=None,
                 minsize=1, maxsize=10, commands_factory=_NOTSET,
                 parser=None, loop=None, create_connection_timeout=None,
-                pool_cls=None, connection_cls=None):
+                pool_cls=None, connection_cls=None, coalesce_writes=False,
+                protocol=2, max_inflight=None, write_buffer_limit=None,
+                backpressure='wait', metrics=None, hooks=None,
+                tcp_keepalive=None, tcp_user_timeout=None,
+                health_check_interval=None, selector=None,
+                idle_timeout=None, max_lifetime=None,
+                scale_up_inflight=None, scale_up_latency=None,
+                create_connection_concurrency=10, blocking_maxsize=None,
+                blocking_metrics=None):
     # FIXME: rewrite docstring
     """Creates Redis Pool.
 
@@ -31,6 +77,31 @@ def create_pool(address, *, db=None, password=None, ssl=None, encoding=None,
 
     All arguments are the same as for create_connection.
 
+    Missing connections are created concurrently, at most
+    create_connection_concurrency at a time.
+
+    If blocking_maxsize is set blocking commands (BLPOP, BRPOP, BRPOPLPUSH,
+    BLMOVE, BZPOPMIN, BZPOPMAX and XREAD/XREADGROUP with BLOCK) are sent
+    through separate sub-pool of up to blocking_maxsize connections,
+    each using connection exclusively, so they don't delay other commands;
+    they are recorded by blocking_metrics instead of metrics.
+
+    If health_check_interval is set free connections which received
+    no data for that many seconds are checked with PING in background;
+    connections not replying in time are closed and replaced.
+
+    Selector is a callable picking connection for a command from free ones
+    (see aioredis.selectors); free connections are used in turn by default.
+
+    Pool size is adjusted in background when any of following is set:
+    free connections idle for idle_timeout seconds are closed while
+    pool size exceeds minsize; connections older than max_lifetime seconds
+    are closed when released or idle (one at a time) and replaced;
+    new connection is added (up to maxsize) when average number of
+    commands waiting for reply per connection reaches scale_up_inflight
+    or 99th percentile of commands latency (measured by metrics,
+    which is required) exceeds scale_up_latency seconds.
+
     Returns RedisPool instance or a pool_cls if it is given.
     """
     if commands_factory is not _NOTSET:
@@ -50,6 +121,24 @@ def create_pool(address, *, db=None, password=None, ssl=None, encoding=None,
                ssl=ssl, parser=parser,
                create_connection_timeout=create_connection_timeout,
                connection_cls=connection_cls,
+               coalesce_writes=coalesce_writes,
+               protocol=protocol,
+               max_inflight=max_inflight,
+               write_buffer_limit=write_buffer_limit,
+               backpressure=backpressure,
+               metrics=metrics,
+               hooks=hooks,
+               tcp_keepalive=tcp_keepalive,
+               tcp_user_timeout=tcp_user_timeout,
+               health_check_interval=health_check_interval,
+               selector=selector,
+               idle_timeout=idle_timeout,
+               max_lifetime=max_lifetime,
+               scale_up_inflight=scale_up_inflight,
+               scale_up_latency=scale_up_latency,
+               create_connection_concurrency=create_connection_concurrency,
+               blocking_maxsize=blocking_maxsize,
+               blocking_metrics=blocking_metrics,
                loop=loop)
     try:
         yield from pool._fill_free(override_min=False)
@@ -66,8 +155,15 @@ class ConnectionsPool(AbcPool):
     def __init__(self, address, db=None, password=None, encoding=None,
                  *, minsize, maxsize, ssl=None, parser=None,
                  create_connection_timeout=None,
-                 connection_cls=None,
-                 loop=None):
+                 connection_cls=None, coalesce_writes=False,
+                 protocol=2, max_inflight=None, write_buffer_limit=None,
+                 backpressure='wait', metrics=None, hooks=None,
+                 tcp_keepalive=None, tcp_user_timeout=None,
+                 health_check_interval=None, selector=None,
+                 idle_timeout=None, max_lifetime=None,
+                 scale_up_inflight=None, scale_up_latency=None,
+                 create_connection_concurrency=10, blocking_maxsize=None,
+                 blocking_metrics=None, loop=None):
         assert isinstance(minsize, int) and minsize >= 0, (
             "minsize must be int >= 0", minsize, type(minsize))
         assert maxsize is not None, "Arbitrary pool size is disallowed."
@@ -75,6 +171,22 @@ class ConnectionsPool(AbcPool):
             "maxsize must be int > 0", maxsize, type(maxsize))
         assert minsize <= maxsize, (
             "Invalid pool min/max sizes", minsize, maxsize)
+        assert (isinstance(create_connection_concurrency, int) and
+                create_connection_concurrency > 0), (
+            "create_connection_concurrency must be int > 0",
+            create_connection_concurrency)
+        assert selector is None or callable(selector), (
+            "selector must be callable", selector)
+        if health_check_interval is not None and health_check_interval <= 0:
+            raise ValueError("health_check_interval must be None or positive")
+        for name, value in [('idle_timeout', idle_timeout),
+                            ('max_lifetime', max_lifetime),
+                            ('scale_up_inflight', scale_up_inflight),
+                            ('scale_up_latency', scale_up_latency)]:
+            if value is not None and value <= 0:
+                raise ValueError("{} must be None or positive".format(name))
+        if scale_up_latency is not None and metrics is None:
+            raise ValueError("scale_up_latency requires metrics")
         if loop is None:
             loop = asyncio.get_event_loop()
         self._address = address
@@ -85,15 +197,62 @@ class ConnectionsPool(AbcPool):
         self._parser_class = parser
         self._minsize = minsize
         self._create_connection_timeout = create_connection_timeout
+        self._create_connection_concurrency = create_connection_concurrency
         self._loop = loop
         self._pool = collections.deque(maxlen=maxsize)
         self._used = set()
         self._acquiring = 0
         self._cond = asyncio.Condition(lock=Lock(loop=loop), loop=loop)
+        # futures of acquire() calls waiting for free connection (FIFO);
+        # released connection is passed directly to the oldest one.
+        self._waiters = collections.deque()
         self._close_state = asyncio.Event(loop=loop)
         self._close_waiter = None
         self._pubsub_conn = None
         self._connection_cls = connection_cls
+        self._coalesce_writes = coalesce_writes
+        self._protocol = protocol
+        self._max_inflight = max_inflight
+        self._write_buffer_limit = write_buffer_limit
+        self._backpressure = backpressure
+        self._metrics = metrics
+        self._hooks = list(hooks or ())
+        self._tcp_keepalive = tcp_keepalive
+        self._tcp_user_timeout = tcp_user_timeout
+        self._health_check_interval = health_check_interval
+        self._selector = selector
+        self._health_checker = None
+        if health_check_interval is not None:
+            self._health_checker = async_task(self._health_check(),
+                                              loop=loop)
+        self._idle_timeout = idle_timeout
+        self._max_lifetime = max_lifetime
+        self._scale_up_inflight = scale_up_inflight
+        self._scale_up_latency = scale_up_latency
+        self._autoscaler = None
+        if any(opt is not None for opt in (idle_timeout, max_lifetime,
+                                           scale_up_inflight,
+                                           scale_up_latency)):
+            self._autoscaler = async_task(self._autoscale(), loop=loop)
+        self._blocking_pool = None
+        if blocking_maxsize is not None:
+            self._blocking_pool = ConnectionsPool(
+                address, db, password, encoding,
+                minsize=0, maxsize=blocking_maxsize,
+                ssl=ssl, parser=parser,
+                create_connection_timeout=create_connection_timeout,
+                connection_cls=connection_cls,
+                coalesce_writes=coalesce_writes,
+                protocol=protocol,
+                metrics=blocking_metrics,
+                hooks=hooks,
+                tcp_keepalive=tcp_keepalive,
+                tcp_user_timeout=tcp_user_timeout,
+                health_check_interval=health_check_interval,
+                idle_timeout=idle_timeout,
+                max_lifetime=max_lifetime,
+                create_connection_concurrency=create_connection_concurrency,
+                loop=loop)
 
     def __repr__(self):
         return '<{} [db:{}, size:[{}:{}], free:{}]>'.format(
@@ -120,6 +279,63 @@ class ConnectionsPool(AbcPool):
         """Current number of free connections."""
         return len(self._pool)
 
+    @property
+    def metrics(self):
+        """Metrics instance shared by pool's connections or None."""
+        return self._metrics
+
+    @property
+    def blocking_pool(self):
+        """Sub-pool blocking commands are sent through or None."""
+        return self._blocking_pool
+
+    @property
+    def hooks(self):
+        """Tuple of commands lifecycle hooks registered with
+        pool's connections.
+        """
+        return tuple(self._hooks)
+
+    def add_hook(self, hook):
+        """Registers commands lifecycle hook with all pool's
+        connections (current and future ones).
+        """
+        self._hooks.append(hook)
+        for conn in self._connections():
+            conn.add_hook(hook)
+        if self._blocking_pool is not None:
+            self._blocking_pool.add_hook(hook)
+
+    def remove_hook(self, hook):
+        """Unregisters commands lifecycle hook from all pool's
+        connections.
+
+        Raises ValueError if hook is not registered.
+        """
+        self._hooks.remove(hook)
+        for conn in self._connections():
+            if hook in conn.hooks:
+                conn.remove_hook(hook)
+        if self._blocking_pool is not None:
+            self._blocking_pool.remove_hook(hook)
+
+    @property
+    def inflight(self):
+        """Number of commands waiting for reply in all connections."""
+        return sum(conn.inflight for conn in self._connections())
+
+    @property
+    def write_buffer_size(self):
+        """Number of bytes not yet sent by all connections."""
+        return sum(conn.write_buffer_size for conn in self._connections())
+
+    def _connections(self):
+        conns = set(self._pool)
+        conns.update(self._used)
+        if self._pubsub_conn is not None:
+            conns.add(self._pubsub_conn)
+        return conns
+
     @property
     def address(self):
         return self._address
@@ -158,11 +374,25 @@ class ConnectionsPool(AbcPool):
             yield from asyncio.gather(*waiters, loop=self._loop)
             # TODO: close _pubsub_conn connection
             logger.debug("Closed %d connection(s)", len(waiters))
+        if self._blocking_pool is not None:
+            yield from self._blocking_pool.wait_closed()
 
     def close(self):
         """Close all free and in-progress connections and mark pool as closed.
         """
         if not self._close_state.is_set():
+            if self._health_checker is not None:
+                self._health_checker.cancel()
+                self._health_checker = None
+            if self._autoscaler is not None:
+                self._autoscaler.cancel()
+                self._autoscaler = None
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if not waiter.done():
+                    waiter.set_exception(PoolClosedError("Pool is closed"))
+            if self._blocking_pool is not None:
+                self._blocking_pool.close()
             self._close_waiter = async_task(self._do_close(), loop=self._loop)
             self._close_state.set()
 
@@ -196,7 +426,13 @@ class ConnectionsPool(AbcPool):
         that connection.
         If no connection is found, returns coroutine waiting for
         free connection to execute command.
+
+        Blocking commands are executed in blocking commands sub-pool
+        if it is enabled (see blocking_maxsize).
         """
+        if self._blocking_pool is not None and _is_blocking(command, args):
+            coro = self._execute_blocking(command, args, kw)
+            return self._check_result(coro, command, args, kw)
         conn, address = self.get_connection(command, args)
         if conn is not None:
             fut = conn.execute(command, *args, **kw)
@@ -212,6 +448,8 @@ class ConnectionsPool(AbcPool):
         and uses it until explicitly closed or disconnected
         (unsubscribing from all channels/patterns will leave connection
          locked for pub/sub use).
+        With RESP3 (protocol=3) pub/sub connection is not locked
+        and is shared with other commands.
 
         There is no auto-reconnect for this PUB/SUB connection.
 
@@ -224,33 +462,73 @@ class ConnectionsPool(AbcPool):
         else:
             return self._wait_execute_pubsub(address, command, channels, {})
 
+    @asyncio.coroutine
+    def execute_streaming(self, command, *args, **kw):
+        """Executes redis command streaming its bulk-string reply
+        (see :meth:`RedisConnection.execute_streaming`).
+
+        Acquires connection for exclusive use and releases it
+        when whole reply is received or stream is closed.
+        """
+        conn = yield from self.acquire(command, args)
+        try:
+            stream = yield from conn.execute_streaming(command, *args, **kw)
+        except BaseException:
+            self.release(conn)
+            raise
+        if stream is None:
+            self.release(conn)
+        else:
+            stream.add_done_callback(lambda stream: self.release(conn))
+        return stream
+
     def get_connection(self, command, args=()):
         """Get free connection from pool.
 
         Returns connection.
         """
-        # TODO: find a better way to determine if connection is free
-        #       and not havily used.
         command = command.upper().strip()
         is_pubsub = command in _PUBSUB_COMMANDS
         if is_pubsub and self._pubsub_conn:
             if not self._pubsub_conn.closed:
                 return self._pubsub_conn, self._pubsub_conn.address
             self._pubsub_conn = None
+        if self._selector is not None and not is_pubsub:
+            return self._select_connection()
+        saturated = None
         for i in range(self.freesize):
             conn = self._pool[0]
             self._pool.rotate(1)
             if conn.closed:  # or conn._waiters: (eg: busy connection)
                 continue
-            if conn.in_pubsub:
+            if conn.in_pubsub and self._protocol != 3:
                 continue
             if is_pubsub:
                 self._pubsub_conn = conn
-                self._pool.remove(conn)
-                self._used.add(conn)
+                # RESP3 connection can serve other commands
+                if self._protocol != 3:
+                    self._pool.remove(conn)
+                    self._used.add(conn)
+            elif conn._limited and (conn._blocked or
+                                    not conn._has_capacity()):
+                # look for connection which is not saturated
+                if saturated is None:
+                    saturated = conn
+                continue
             return conn, conn.address
+        if saturated is not None:
+            return saturated, saturated.address
         return None, self._address  # figure out
 
+    def _select_connection(self):
+        resp3 = self._protocol == 3
+        conns = [conn for conn in self._pool
+                 if not conn.closed and (resp3 or not conn.in_pubsub)]
+        if not conns:
+            return None, self._address
+        conn = self._selector(conns)
+        return conn, conn.address
+
     def _check_result(self, fut, *data):
         """Hook to check result or catch exception (like MovedError).
 
@@ -267,6 +545,23 @@ class ConnectionsPool(AbcPool):
         finally:
             self.release(conn)
 
+    @asyncio.coroutine
+    def _execute_blocking(self, command, args, kw):
+        """Executes blocking command in exclusively acquired
+        connection of blocking commands sub-pool.
+        """
+        pool = self._blocking_pool
+        conn = yield from pool.acquire(command, args)
+        try:
+            return (yield from conn.execute(command, *args, **kw))
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            # reply may be received any time later;
+            # don't keep connection busy waiting for it.
+            conn.close()
+            raise
+        finally:
+            pool.release(conn)
+
     @asyncio.coroutine
     def _wait_execute_pubsub(self, address, command, args, kw):
         if self.closed:
@@ -294,6 +589,8 @@ class ConnectionsPool(AbcPool):
                 res = res and (yield from self._pool[i].select(db))
             else:
                 self._db = db
+        if self._blocking_pool is not None:
+            res = (yield from self._blocking_pool.select(db)) and res
         return res
 
     @asyncio.coroutine
@@ -302,6 +599,8 @@ class ConnectionsPool(AbcPool):
         with (yield from self._cond):
             for i in range(self.freesize):
                 yield from self._pool[i].auth(password)
+        if self._blocking_pool is not None:
+            yield from self._blocking_pool.auth(password)
 
     @property
     def in_pubsub(self):
@@ -329,19 +628,61 @@ class ConnectionsPool(AbcPool):
         """
         if self.closed:
             raise PoolClosedError("Pool is closed")
-        with (yield from self._cond):
-            if self.closed:
-                raise PoolClosedError("Pool is closed")
-            while True:
+        # fast path: free connection, nobody waiting for it
+        # and no select()/auth()/filling in progress
+        self._drop_closed()
+        if (self._pool and not self._waiters and
+                not self._cond.locked() and self.size >= self.minsize):
+            return self._use(self._pool.popleft())
+        retry = False
+        while True:
+            with (yield from self._cond):
+                if self.closed:
+                    raise PoolClosedError("Pool is closed")
                 yield from self._fill_free(override_min=True)
                 if self.freesize:
-                    conn = self._pool.popleft()
-                    assert not conn.closed, conn
-                    assert conn not in self._used, (conn, self._used)
-                    self._used.add(conn)
-                    return conn
+                    return self._use(self._pool.popleft())
+                waiter = create_future(loop=self._loop)
+                if retry:
+                    # keep place in queue
+                    self._waiters.appendleft(waiter)
                 else:
-                    yield from self._cond.wait()
+                    self._waiters.append(waiter)
+            try:
+                conn = yield from waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                elif not waiter.cancelled() and waiter.exception() is None:
+                    # woken up at the same time; pass it on
+                    if waiter.result() is None:
+                        self._wakeup_waiter()
+                    else:
+                        self.release(waiter.result())
+                raise
+            if conn is not None:
+                return conn
+            # connection was closed or added; try to get (or create) one
+            retry = True
+
+    def _use(self, conn):
+        assert not conn.closed, conn
+        assert conn not in self._used, (conn, self._used)
+        self._used.add(conn)
+        return conn
+
+    def _wakeup_waiter(self, conn=None):
+        """Passes connection (already marked as used) to the oldest
+        acquire() waiter or wakes it up to retry if conn is None.
+
+        Returns False if there is no waiter.
+        """
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(conn)
+                return True
+        return False
 
     def release(self, conn):
         """Returns used connection back into pool.
@@ -358,15 +699,28 @@ class ConnectionsPool(AbcPool):
                 logger.warning(
                     "Connection %r is in transaction, closing it.", conn)
                 conn.close()
-            elif conn.in_pubsub:
+            elif conn.in_pubsub and self._protocol != 3:
                 logger.warning(
                     "Connection %r is in subscribe mode, closing it.", conn)
                 conn.close()
-            elif conn._waiters:
+            elif conn._stream is None and conn._waiters and all(
+                    fut.done() for fut, _, _ in conn._waiters):
+                # only replies of timed out (or cancelled) commands
+                # are pending; wait for them before reusing connection.
+                self._used.add(conn)
+                async_task(self._drain_and_release(conn), loop=self._loop)
+                return
+            elif conn._waiters or conn._stream is not None:
                 logger.warning(
                     "Connection %r has pending commands, closing it.", conn)
                 conn.close()
+            elif self._expired(conn):
+                conn.close()
             elif conn.db == self.db:
+                self._used.add(conn)
+                if self._wakeup_waiter(conn):
+                    return
+                self._used.remove(conn)
                 if self.maxsize and self.freesize < self.maxsize:
                     self._pool.append(conn)
                 else:
@@ -374,8 +728,139 @@ class ConnectionsPool(AbcPool):
                     conn.close()
             else:
                 conn.close()
-        # FIXME: check event loop is not closed
-        async_task(self._wakeup(), loop=self._loop)
+        self._wakeup_waiter()
+
+    @asyncio.coroutine
+    def _drain_and_release(self, conn):
+        try:
+            yield from asyncio.wait_for(conn._wait_drained(),
+                                        DRAIN_TIMEOUT, loop=self._loop)
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Connection %r has pending commands, closing it.", conn)
+            conn.close()
+        self.release(conn)
+
+    @asyncio.coroutine
+    def _health_check(self):
+        """Periodically checks idle free connections."""
+        while not self.closed:
+            yield from asyncio.sleep(self._health_check_interval,
+                                     loop=self._loop)
+            try:
+                yield from self._check_idle()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Pool health check failed")
+
+    @asyncio.coroutine
+    def _check_idle(self):
+        """PINGs free connections idle for health_check_interval seconds,
+        closes ones not replying and replaces them with new ones.
+        """
+        deadline = self._loop.time() - self._health_check_interval
+        idle = [conn for conn in self._pool if self._is_idle(conn, deadline)]
+        for conn in idle:
+            # connection could be acquired or closed while previous
+            # one was checked
+            if conn not in self._pool or not self._is_idle(conn, deadline):
+                continue
+            # checked connection is taken from free ones (but still counted)
+            # so it is not handed out while PING is pending;
+            # connections are checked one at a time to keep others available
+            self._pool.remove(conn)
+            self._used.add(conn)
+            try:
+                yield from self._ping(conn)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                if not conn.closed:
+                    logger.warning("Connection %r failed health check: %r",
+                                   conn, exc)
+                    conn.close()
+            finally:
+                # not self.release: subclasses treat it as used by client
+                ConnectionsPool.release(self, conn)
+        self._drop_closed()
+        if self.size < self.minsize and not self.closed:
+            with (yield from self._cond):
+                yield from self._fill_free(override_min=False)
+
+    @staticmethod
+    def _is_idle(conn, deadline):
+        return (not conn.closed and conn._last_read <= deadline and
+                not conn._waiters and conn._stream is None and
+                not conn.in_pubsub)
+
+    @asyncio.coroutine
+    def _autoscale(self):
+        """Periodically adjusts pool size."""
+        latency = prev = None
+        while not self.closed:
+            yield from asyncio.sleep(AUTOSCALE_INTERVAL, loop=self._loop)
+            if self._scale_up_latency is not None:
+                prev, latency = latency, self._metrics.latency()
+            try:
+                yield from self._scale(latency, prev)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Pool autoscaling failed")
+
+    @asyncio.coroutine
+    def _scale(self, latency=None, prev_latency=None):
+        """Retires expired and idle free connections and adds new one
+        if pool is overloaded.
+        """
+        now = self._loop.time()
+        idle = [conn for conn in self._pool
+                if not conn.closed and not conn._waiters and
+                conn._stream is None and not conn.in_pubsub]
+        expired = [conn for conn in idle if self._expired(conn)]
+        if expired:
+            # retire one connection at a time not to close all
+            # connections created at once simultaneously
+            conn = min(expired, key=lambda conn: conn._created_at)
+            logger.debug("Closing connection %r: max lifetime reached", conn)
+            conn.close()
+            idle.remove(conn)
+        if self._idle_timeout is not None:
+            size = self.size - (1 if expired else 0)
+            for conn in sorted(idle, key=lambda conn: conn._last_read):
+                if size <= self.minsize:
+                    break
+                if now - conn._last_read >= self._idle_timeout:
+                    logger.debug("Closing idle connection %r", conn)
+                    conn.close()
+                    size -= 1
+        self._drop_closed()
+        grow = False
+        if self._scale_up_inflight is not None:
+            conns = [conn for conn in self._connections() if not conn.closed]
+            if conns:
+                avg = sum(conn.inflight for conn in conns) / len(conns)
+                grow = avg >= self._scale_up_inflight
+        if not grow and latency is not None:
+            p99 = latency.quantile(.99, since=prev_latency)
+            grow = p99 is not None and p99 > self._scale_up_latency
+        if self.closed:
+            return
+        with (yield from self._cond):
+            yield from self._fill_free(override_min=False)
+            if grow and self.size < self.maxsize:
+                logger.debug("Adding connection to overloaded pool %r", self)
+                yield from self._add_connections(1)
+                self._wakeup_waiter()
+
+    def _expired(self, conn):
+        return (self._max_lifetime is not None and
+                self._loop.time() - conn._created_at >= self._max_lifetime)
+
+    @asyncio.coroutine
+    def _ping(self, conn):
+        yield from conn.execute('PING', timeout=HEALTH_CHECK_TIMEOUT)
 
     def _drop_closed(self):
         for i in range(self.freesize):
@@ -389,28 +874,57 @@ class ConnectionsPool(AbcPool):
     def _fill_free(self, *, override_min):
         # drop closed connections first
         self._drop_closed()
-        address = self._address
         while self.size < self.minsize:
-            self._acquiring += 1
-            try:
-                conn = yield from self._create_new_connection(address)
-                self._pool.append(conn)
-            finally:
-                self._acquiring -= 1
-                # connection may be closed at yield point
-                self._drop_closed()
+            yield from self._add_connections(self.minsize - self.size)
         if self.freesize:
             return
         if override_min:
             while not self._pool and self.size < self.maxsize:
-                self._acquiring += 1
-                try:
-                    conn = yield from self._create_new_connection(address)
-                    self._pool.append(conn)
-                finally:
-                    self._acquiring -= 1
-                    # connection may be closed at yield point
-                    self._drop_closed()
+                yield from self._add_connections(1)
+
+    @asyncio.coroutine
+    def _add_connections(self, count):
+        """Creates count connections concurrently (at most
+        create_connection_concurrency at a time) and adds them to free pool.
+
+        If some connections can not be created the rest are still added
+        and the first error is raised; if cancelled, connections being
+        created are cancelled and already created ones are closed.
+        """
+        address = self._address
+        sem = asyncio.Semaphore(self._create_connection_concurrency,
+                                loop=self._loop)
+
+        @asyncio.coroutine
+        def create():
+            with (yield from sem):
+                return (yield from self._create_new_connection(address))
+
+        tasks = [async_task(create(), loop=self._loop)
+                 for _ in range(count)]
+        self._acquiring += count
+        try:
+            yield from asyncio.wait(tasks, loop=self._loop)
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            yield from asyncio.wait(tasks, loop=self._loop)
+            for task in tasks:
+                if not task.cancelled() and task.exception() is None:
+                    task.result().close()
+            raise
+        finally:
+            self._acquiring -= count
+        error = None
+        for task in tasks:
+            if task.exception() is None:
+                self._pool.append(task.result())
+            elif error is None:
+                error = task.exception()
+        # connection may be closed at yield point
+        self._drop_closed()
+        if error is not None:
+            raise error
 
     def _create_new_connection(self, address):
         return create_connection(address,
@@ -421,15 +935,17 @@ class ConnectionsPool(AbcPool):
                                  parser=self._parser_class,
                                  timeout=self._create_connection_timeout,
                                  connection_cls=self._connection_cls,
+                                 coalesce_writes=self._coalesce_writes,
+                                 protocol=self._protocol,
+                                 max_inflight=self._max_inflight,
+                                 write_buffer_limit=self._write_buffer_limit,
+                                 backpressure=self._backpressure,
+                                 metrics=self._metrics,
+                                 hooks=self._hooks,
+                                 tcp_keepalive=self._tcp_keepalive,
+                                 tcp_user_timeout=self._tcp_user_timeout,
                                  loop=self._loop)
 
-    @asyncio.coroutine
-    def _wakeup(self, closing_conn=None):
-        with (yield from self._cond):
-            self._cond.notify()
-        if closing_conn is not None:
-            yield from closing_conn.wait_closed()
-
     def __enter__(self):
         raise RuntimeError(
             "'yield from' should be used as a context manager expression")
@@ -0,0 +1,203 @@
+import asyncio
+
+from .pool import (
+    ConnectionsPool,
+    PY_35,
+    _ConnectionContextManager,
+    )
+from .resilient import IDEMPOTENT_COMMANDS
+
+__all__ = [
+    'ReplicaPool',
+    'create_replica_pool',
+    'READONLY_COMMANDS',
+]
+
+# Read-only commands sent to replicas
+# (in addition to IDEMPOTENT_COMMANDS)
+_COMMANDS = (
+    b'SORT_RO', b'EVAL_RO', b'EVALSHA_RO', b'XRANGE', b'XREVRANGE', b'XLEN',
+    b'XPENDING', b'XINFO', b'HRANDFIELD', b'SMISMEMBER', b'ZMSCORE',
+    b'ZRANDMEMBER', b'LPOS', b'GEORADIUS_RO', b'GEORADIUSBYMEMBER_RO',
+    b'GEOSEARCH', b'OBJECT',
+    )
+READONLY_COMMANDS = IDEMPOTENT_COMMANDS | frozenset(
+    _COMMANDS + tuple(cmd.decode('utf-8') for cmd in _COMMANDS))
+
+
+@asyncio.coroutine
+def create_replica_pool(address, replicas, *, db=None, password=None,
+                        encoding=None, minsize=1, maxsize=10,
+                        read_your_writes_window=None, loop=None, **kwargs):
+    """Creates pool sending read-only commands to replicas
+    and other commands to primary.
+
+    Replica pools are created with the same arguments as primary one
+    (other keyword arguments are passed to
+    :class:`~aioredis.ConnectionsPool`).
+
+    This function is a coroutine.
+    """
+    pool = ReplicaPool(address, replicas, db, password, encoding,
+                       minsize=minsize, maxsize=maxsize,
+                       read_your_writes_window=read_your_writes_window,
+                       loop=loop, **kwargs)
+    try:
+        yield from asyncio.gather(
+            pool._fill_free(override_min=False),
+            *[replica._fill_free(override_min=False)
+              for replica in pool.replicas], loop=pool._loop)
+    except Exception:
+        pool.close()
+        yield from pool.wait_closed()
+        raise
+    return pool
+
+
+class ReplicaPool(ConnectionsPool):
+    """Connections pool of primary server routing read-only commands
+    (see READONLY_COMMANDS) to pools of its replicas in turn.
+
+    Commands can be routed explicitly with ``replica`` argument of
+    :meth:`execute` (True - to replica, False - to primary).
+    Within ``read_your_writes_window`` seconds after write command is sent
+    to primary (or connection acquired from it with ``with`` statement
+    is released) all commands are sent to primary so changes just made are
+    visible to following reads despite replication lag.
+    Transactions and pipelines use primary connections.
+    """
+
+    def __init__(self, address, replicas, db=None, password=None,
+                 encoding=None, *, read_your_writes_window=None,
+                 loop=None, **kwargs):
+        if read_your_writes_window is not None and \
+                read_your_writes_window <= 0:
+            raise ValueError(
+                "read_your_writes_window must be None or positive")
+        super().__init__(address, db, password, encoding,
+                         loop=loop, **kwargs)
+        self._replicas = tuple(
+            ConnectionsPool(replica, db, password, encoding,
+                            loop=self._loop, **kwargs)
+            for replica in replicas)
+        self._next_replica = 0
+        self._read_your_writes_window = read_your_writes_window
+        self._last_write = None
+
+    def __repr__(self):
+        return '<{} [db:{}, size:[{}:{}], free:{}, replicas:{}]>'.format(
+            self.__class__.__name__, self.db,
+            self.minsize, self.maxsize, self.freesize, len(self._replicas))
+
+    @property
+    def replicas(self):
+        """Tuple of replicas connections pools."""
+        return self._replicas
+
+    def execute(self, command, *args, replica=None, **kw):
+        """Executes redis command in replica's or primary's connection.
+
+        Read-only commands are sent to replica unless ``replica``
+        is False or write was sent within read-your-writes window;
+        other commands are sent to primary unless ``replica`` is True.
+        """
+        pool = self._route(command, replica)
+        if pool is not self:
+            return pool.execute(command, *args, **kw)
+        if command not in READONLY_COMMANDS and \
+                command.upper() not in READONLY_COMMANDS:
+            self._mark_write()
+        return super().execute(command, *args, **kw)
+
+    def _route(self, command, replica):
+        if not self._replicas or replica is False:
+            return self
+        if replica is None:
+            if command not in READONLY_COMMANDS and \
+                    command.upper() not in READONLY_COMMANDS:
+                return self
+            if (self._last_write is not None and
+                    self._loop.time() - self._last_write <
+                    self._read_your_writes_window):
+                return self
+        pool = self._replicas[self._next_replica % len(self._replicas)]
+        self._next_replica += 1
+        return pool
+
+    def _mark_write(self):
+        if self._read_your_writes_window is not None:
+            self._last_write = self._loop.time()
+
+    def __iter__(self):
+        conn = yield from self.acquire()
+        return _PrimaryConnectionContextManager(self, conn)
+
+    if PY_35:
+        def __await__(self):
+            conn = yield from self.acquire()
+            return _PrimaryConnectionContextManager(self, conn)
+
+        def get(self):
+            return _AsyncPrimaryConnectionContextManager(self)
+
+    def close(self):
+        """Closes primary and replicas pools."""
+        if not self.closed:
+            for pool in self._replicas:
+                pool.close()
+        super().close()
+
+    @asyncio.coroutine
+    def wait_closed(self):
+        """Waits until primary and replicas pools get closed."""
+        yield from super().wait_closed()
+        for pool in self._replicas:
+            yield from pool.wait_closed()
+
+    @asyncio.coroutine
+    def select(self, db):
+        """Changes db index for primary and replicas pools."""
+        res = yield from super().select(db)
+        for pool in self._replicas:
+            res = (yield from pool.select(db)) and res
+        return res
+
+    @asyncio.coroutine
+    def auth(self, password):
+        yield from super().auth(password)
+        for pool in self._replicas:
+            yield from pool.auth(password)
+
+    def add_hook(self, hook):
+        super().add_hook(hook)
+        for pool in self._replicas:
+            pool.add_hook(hook)
+
+    def remove_hook(self, hook):
+        super().remove_hook(hook)
+        for pool in self._replicas:
+            pool.remove_hook(hook)
+
+
+class _PrimaryConnectionContextManager(_ConnectionContextManager):
+    # commands sent through acquired connection are not known
+
+    __slots__ = ()
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self._pool._mark_write()
+        super().__exit__(exc_type, exc_value, tb)
+
+
+if PY_35:
+    from .pool import _AsyncConnectionContextManager
+
+    class _AsyncPrimaryConnectionContextManager(
+            _AsyncConnectionContextManager):
+
+        __slots__ = ()
+
+        @asyncio.coroutine
+        def __aexit__(self, exc_type, exc_value, tb):
+            self._pool._mark_write()
+            yield from super().__aexit__(exc_type, exc_value, tb)
@@ -0,0 +1,486 @@
+import asyncio
+import types
+from collections import deque
+from functools import partial
+
+from .abc import AbcChannel, AbcConnection
+from .connection import create_connection
+from .errors import ConnectionClosedError, ProtocolError
+from .pubsub import Channel
+from .util import (
+    coerced_keys_dict,
+    async_task,
+    create_future,
+    _set_result,
+    _set_exception,
+    )
+from .log import logger
+
+__all__ = [
+    'ResilientConnection',
+    'create_resilient_connection',
+    'IDEMPOTENT_COMMANDS',
+]
+
+# Read-only commands safe to be sent again when connection is lost
+# before their replies are received.
+_COMMANDS = (
+    b'PING', b'ECHO', b'EXISTS', b'TYPE', b'TTL', b'PTTL', b'DUMP',
+    b'KEYS', b'SCAN', b'RANDOMKEY', b'DBSIZE', b'INFO', b'TIME',
+    b'GET', b'MGET', b'GETRANGE', b'STRLEN', b'GETBIT', b'BITCOUNT',
+    b'BITPOS', b'HGET', b'HMGET', b'HGETALL', b'HKEYS', b'HVALS', b'HLEN',
+    b'HEXISTS', b'HSTRLEN', b'HSCAN', b'SMEMBERS', b'SISMEMBER', b'SCARD',
+    b'SRANDMEMBER', b'SDIFF', b'SINTER', b'SUNION', b'SSCAN', b'LRANGE',
+    b'LINDEX', b'LLEN', b'ZRANGE', b'ZREVRANGE', b'ZRANGEBYSCORE',
+    b'ZREVRANGEBYSCORE', b'ZRANGEBYLEX', b'ZREVRANGEBYLEX', b'ZSCORE',
+    b'ZRANK', b'ZREVRANK', b'ZCARD', b'ZCOUNT', b'ZLEXCOUNT', b'ZSCAN',
+    b'PFCOUNT', b'GEOPOS', b'GEODIST', b'GEOHASH',
+    )
+IDEMPOTENT_COMMANDS = frozenset(
+    _COMMANDS + tuple(cmd.decode('utf-8') for cmd in _COMMANDS))
+
+
+@asyncio.coroutine
+def create_resilient_connection(address, *, db=None, password=None,
+                                min_backoff=.1, max_backoff=10.,
+                                max_attempts=None, retry_idempotent=False,
+                                loop=None, **kwargs):
+    """Creates redis connection reconnecting when it is lost.
+
+    First connection is opened at once (and errors are raised as with
+    :func:`~aioredis.create_connection`); when it is lost new one is
+    opened with exponential backoff delays between ``min_backoff`` and
+    ``max_backoff`` seconds, giving up after ``max_attempts`` failed
+    attempts (never by default).
+
+    Password and selected db are replayed to every new connection and
+    channels/patterns are resubscribed reusing the same ``Channel``
+    objects (messages published while disconnected are lost).
+    Commands issued while reconnecting are sent once connection is
+    restored.
+
+    If ``retry_idempotent`` is True read-only commands
+    (see ``IDEMPOTENT_COMMANDS``) which did not receive reply because
+    connection was lost are sent once again over new connection.
+
+    Other keyword arguments are passed to
+    :func:`~aioredis.create_connection`.
+
+    This function is a coroutine.
+    """
+    if min_backoff <= 0 or max_backoff < min_backoff:
+        raise ValueError("Backoff must be positive and "
+                         "min_backoff must not exceed max_backoff")
+    if max_attempts is not None and max_attempts < 1:
+        raise ValueError("max_attempts must be None or positive")
+    connect = partial(create_connection, address, loop=loop, **kwargs)
+    conn = yield from connect(db=db, password=password)
+    return ResilientConnection(conn, connect, password=password,
+                               min_backoff=min_backoff,
+                               max_backoff=max_backoff,
+                               max_attempts=max_attempts,
+                               retry_idempotent=retry_idempotent,
+                               loop=loop)
+
+
+class ResilientConnection(AbcConnection):
+    """Redis connection wrapper reopening lost connection.
+
+    Instances are created with :func:`create_resilient_connection`.
+    """
+
+    def __init__(self, conn, connect, *, password=None,
+                 min_backoff=.1, max_backoff=10., max_attempts=None,
+                 retry_idempotent=False, loop=None):
+        if loop is None:
+            loop = asyncio.get_event_loop()
+        self._connect = connect
+        self._address = conn.address
+        self._db = conn.db
+        self._encoding = conn.encoding
+        self._password = password
+        self._min_backoff = min_backoff
+        self._max_backoff = max_backoff
+        self._max_attempts = max_attempts
+        self._retry_idempotent = retry_idempotent
+        self._loop = loop
+        self._conn = None
+        self._closing = False
+        self._close_waiter = create_future(loop=loop)
+        self._reconnect_task = None
+        # (future, method name, command, args, kwargs) of commands
+        # waiting for connection to be restored
+        self._queued = deque()
+        self._pubsub_channels = coerced_keys_dict()
+        self._pubsub_patterns = coerced_keys_dict()
+        self._set_connection(conn)
+
+    def __repr__(self):
+        return '<ResilientConnection [db:{}]>'.format(self.db)
+
+    def execute(self, command, *args, **kwargs):
+        """Executes redis command and returns Future waiting for the answer.
+
+        If connection is being restored the command is sent
+        once new connection is opened.
+        """
+        if command is None:
+            raise TypeError("command must not be None")
+        command = command.upper().strip()
+        conn = self._get_connection()
+        if conn is None:
+            fut = create_future(loop=self._loop)
+            self._queued.append((fut, 'execute', command, args, kwargs))
+            return fut
+        if command in ('AUTH', b'AUTH') and len(args) == 1:
+            fut = _ensure_future(conn.execute(command, *args, **kwargs),
+                                 self._loop)
+            fut.add_done_callback(partial(self._set_password, args[0]))
+            return fut
+        if self._retry_idempotent and command in IDEMPOTENT_COMMANDS:
+            res = create_future(loop=self._loop)
+            fut = _ensure_future(conn.execute(command, *args, **kwargs),
+                                 self._loop)
+            fut.add_done_callback(
+                partial(self._retry_lost, res, command, args, kwargs))
+            return res
+        return conn.execute(command, *args, **kwargs)
+
+    def execute_pubsub(self, command, *channels):
+        """Executes redis (p)subscribe/(p)unsubscribe commands.
+
+        Subscribed channels are kept when connection is lost
+        and resubscribed when it is restored.
+        """
+        command = command.upper().strip()
+        if None in channels:
+            raise TypeError("args must not contain None")
+        if command in ('SUBSCRIBE', b'SUBSCRIBE',
+                       'PSUBSCRIBE', b'PSUBSCRIBE'):
+            is_pattern = len(command) == 10
+            subscriptions = (self._pubsub_patterns if is_pattern
+                             else self._pubsub_channels)
+            channels = [
+                ch if isinstance(ch, AbcChannel)
+                else Channel(ch, is_pattern=is_pattern, loop=self._loop)
+                for ch in channels]
+            for ch in channels:
+                if (ch.is_pattern == is_pattern and
+                        ch.name not in subscriptions):
+                    subscriptions[ch.name] = ch
+        conn = self._get_connection()
+        if conn is None:
+            fut = create_future(loop=self._loop)
+            self._queued.append((fut, 'execute_pubsub', command,
+                                 channels, {}))
+            return fut
+        return self._execute_pubsub(conn, command, channels)
+
+    def _execute_pubsub(self, conn, command, channels):
+        channels = [_ChannelProxy(ch, conn, self)
+                    if isinstance(ch, AbcChannel) else ch
+                    for ch in channels]
+        return conn.execute_pubsub(command, *channels)
+
+    @asyncio.coroutine
+    def execute_streaming(self, command, *args, **kwargs):
+        """Executes command streaming its reply
+        (see :meth:`RedisConnection.execute_streaming()
+        <aioredis.RedisConnection.execute_streaming>`).
+
+        Waits for connection to be restored if it is lost.
+        """
+        conn = self._get_connection()
+        if conn is None:
+            fut = create_future(loop=self._loop)
+            self._queued.append((fut, 'execute_streaming', command,
+                                 args, kwargs))
+            return (yield from fut)
+        return (yield from conn.execute_streaming(command, *args, **kwargs))
+
+    def close(self):
+        """Close connection and stop reconnecting."""
+        self._do_close(None)
+
+    def _do_close(self, exc):
+        if self._closing:
+            return
+        self._closing = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            conn.close()
+        if exc is None:
+            exc = ConnectionClosedError("Connection closed")
+        while self._queued:
+            fut, *spam = self._queued.popleft()
+            _set_exception(fut, exc)
+        while self._pubsub_channels:
+            _, ch = self._pubsub_channels.popitem()
+            ch.close()
+        while self._pubsub_patterns:
+            _, ch = self._pubsub_patterns.popitem()
+            ch.close()
+        if conn is not None:
+            waiter = async_task(conn.wait_closed(), loop=self._loop)
+            waiter.add_done_callback(
+                lambda fut: _set_result(self._close_waiter, None))
+        else:
+            _set_result(self._close_waiter, None)
+
+    @property
+    def closed(self):
+        """True if connection is closed."""
+        return self._closing
+
+    @asyncio.coroutine
+    def wait_closed(self):
+        """Coroutine waiting until connection is closed."""
+        yield from asyncio.shield(self._close_waiter, loop=self._loop)
+
+    @property
+    def connected(self):
+        """True unless connection is being restored."""
+        return self._get_connection() is not None
+
+    @property
+    def db(self):
+        """Currently selected db index."""
+        if self._conn is not None:
+            return self._conn.db
+        return self._db
+
+    @property
+    def encoding(self):
+        """Current set codec or None."""
+        return self._encoding
+
+    @property
+    def address(self):
+        """Redis server address, either host-port tuple or str."""
+        return self._address
+
+    @property
+    def in_transaction(self):
+        """Set to True when MULTI command was issued."""
+        return self._conn is not None and self._conn.in_transaction
+
+    @property
+    def in_pubsub(self):
+        """Number of subscribed channels and patterns
+        (including ones to be resubscribed).
+        """
+        if self._conn is not None and self._conn.in_pubsub:
+            return self._conn.in_pubsub
+        return len(self._pubsub_channels) + len(self._pubsub_patterns)
+
+    @property
+    def pubsub_channels(self):
+        """Returns read-only channels dict."""
+        return types.MappingProxyType(self._pubsub_channels)
+
+    @property
+    def pubsub_patterns(self):
+        """Returns read-only patterns dict."""
+        return types.MappingProxyType(self._pubsub_patterns)
+
+    def select(self, db):
+        """Change the selected database; it is selected again
+        when connection is restored.
+        """
+        conn = self._get_connection()
+        if conn is None:
+            fut = create_future(loop=self._loop)
+            self._queued.append((fut, 'select', db, (), {}))
+            return fut
+        return conn.select(db)
+
+    def auth(self, password):
+        """Authenticate to server; password is sent again
+        when connection is restored.
+        """
+        return self.execute('AUTH', password)
+
+    def _set_password(self, password, fut):
+        if not fut.cancelled() and fut.exception() is None:
+            self._password = password
+
+    def _get_connection(self):
+        if self._closing:
+            raise ConnectionClosedError("Connection closed")
+        conn = self._conn
+        if conn is not None and conn.closed:
+            self._connection_lost(conn)
+            return None
+        return conn
+
+    def _set_connection(self, conn):
+        self._conn = conn
+        self._address = conn.address
+        watcher = async_task(conn.wait_closed(), loop=self._loop)
+        watcher.add_done_callback(
+            lambda fut: self._connection_lost(conn))
+        while self._queued and self._conn is conn:
+            fut, method, command, args, kwargs = self._queued.popleft()
+            if fut.done():
+                continue
+            try:
+                if method == 'execute_pubsub':
+                    res = self._execute_pubsub(conn, command, args)
+                elif method == 'select':
+                    res = conn.select(command)
+                else:
+                    res = getattr(conn, method)(command, *args, **kwargs)
+            except Exception as exc:
+                _set_exception(fut, exc)
+            else:
+                _chain_future(_ensure_future(res, self._loop), fut)
+
+    def _connection_lost(self, conn):
+        if conn is not self._conn or self._closing:
+            return
+        self._conn = None
+        self._db = conn.db
+        logger.warning("Connection to %r lost, reconnecting", self._address)
+        self._reconnect_task = async_task(self._reconnect(), loop=self._loop)
+
+    @asyncio.coroutine
+    def _reconnect(self):
+        delay = self._min_backoff
+        attempts = 0
+        while True:
+            yield from asyncio.sleep(delay, loop=self._loop)
+            attempts += 1
+            try:
+                conn = yield from self._connect(
+                    db=self._db or None, password=self._password)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                if (self._max_attempts is not None and
+                        attempts >= self._max_attempts):
+                    logger.error("Failed to reconnect to %r: %r",
+                                 self._address, exc)
+                    self._reconnect_task = None
+                    self._do_close(ConnectionClosedError(
+                        "Failed to reconnect: {!r}".format(exc)))
+                    return
+                logger.debug("Reconnect attempt to %r failed: %r",
+                             self._address, exc)
+                delay = min(delay * 2, self._max_backoff)
+                continue
+            try:
+                yield from self._resubscribe(conn)
+            except asyncio.CancelledError:
+                conn.close()
+                raise
+            except Exception as exc:
+                logger.debug("Failed to resubscribe: %r", exc)
+                conn.close()
+                delay = min(delay * 2, self._max_backoff)
+                continue
+            break
+        self._reconnect_task = None
+        logger.info("Reconnected to %r", conn.address)
+        self._set_connection(conn)
+
+    @asyncio.coroutine
+    def _resubscribe(self, conn):
+        if self._pubsub_channels:
+            yield from self._execute_pubsub(
+                conn, 'SUBSCRIBE', list(self._pubsub_channels.values()))
+        if self._pubsub_patterns:
+            yield from self._execute_pubsub(
+                conn, 'PSUBSCRIBE', list(self._pubsub_patterns.values()))
+
+    def _retry_lost(self, res, command, args, kwargs, fut):
+        if res.done():
+            return
+        if fut.cancelled():
+            lost = True
+        else:
+            exc = fut.exception()
+            if exc is None:
+                res.set_result(fut.result())
+                return
+            lost = isinstance(exc, (ConnectionClosedError, ProtocolError))
+            if not lost:
+                res.set_exception(exc)
+                return
+        if self._closing:
+            res.set_exception(ConnectionClosedError("Connection closed"))
+            return
+        logger.debug("Retrying %r after connection was lost", command)
+        conn = self._get_connection()
+        if conn is None:
+            self._queued.append((res, 'execute', command, args, kwargs))
+        else:
+            try:
+                retry = conn.execute(command, *args, **kwargs)
+            except Exception as exc:
+                res.set_exception(exc)
+            else:
+                _chain_future(_ensure_future(retry, self._loop), res)
+
+
+class _ChannelProxy(AbcChannel):
+    """Channel passed to underlying connection;
+    messages are put to wrapped channel which is kept open
+    when connection is lost.
+    """
+
+    def __init__(self, channel, conn, owner):
+        self._channel = channel
+        self._conn = conn
+        self._owner = owner
+
+    @property
+    def name(self):
+        return self._channel.name
+
+    @property
+    def is_pattern(self):
+        return self._channel.is_pattern
+
+    @property
+    def is_active(self):
+        return self._channel.is_active
+
+    @asyncio.coroutine
+    def get(self, *args, **kwargs):
+        return (yield from self._channel.get(*args, **kwargs))
+
+    def put_nowait(self, data):
+        self._channel.put_nowait(data)
+
+    def close(self):
+        if self._conn.closed:
+            # connection is lost; channel is resubscribed
+            return
+        ch = self._channel
+        subscriptions = (self._owner._pubsub_patterns if ch.is_pattern
+                         else self._owner._pubsub_channels)
+        if subscriptions.get(ch.name) is ch:
+            del subscriptions[ch.name]
+        ch.close()
+
+
+def _ensure_future(res, loop):
+    if isinstance(res, asyncio.Future):
+        return res
+    return async_task(res, loop=loop)
+
+
+def _chain_future(src, dst):
+    def done(src):
+        if dst.done():
+            return
+        if src.cancelled():
+            dst.cancel()
+        elif src.exception() is not None:
+            dst.set_exception(src.exception())
+        else:
+            dst.set_result(src.result())
+    src.add_done_callback(done)
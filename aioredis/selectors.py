@@ -0,0 +1,43 @@
+"""Connection selection strategies for :class:`~aioredis.ConnectionsPool`.
+
+Selector is a callable receiving non-empty list of free connections
+(in pool order) and returning the one command should be sent through;
+it is passed to pool as ``selector`` argument.
+By default (``selector=None``) pool picks free connections in turn.
+"""
+import random
+
+__all__ = [
+    'connection_load',
+    'least_loaded',
+    'power_of_two',
+]
+
+
+def connection_load(conn):
+    """Returns sortable load estimate of connection.
+
+    Connections which reached ``max_inflight`` or ``write_buffer_limit``
+    go last, others are compared by number of commands waiting for reply
+    (including streamed one) and then by number of bytes not yet sent.
+    Note that blocking command (eg BLPOP) counts as any other one
+    (use pool's blocking_maxsize to keep them off shared connections).
+    """
+    saturated = conn._limited and (bool(conn._blocked) or
+                                   not conn._has_capacity())
+    pending = len(conn._waiters) + (conn._stream is not None)
+    return saturated, pending, conn.write_buffer_size
+
+
+def least_loaded(conns):
+    """Picks connection with least outstanding commands."""
+    return min(conns, key=connection_load)
+
+
+def power_of_two(conns):
+    """Picks less loaded of two random connections
+    ("power of two choices").
+    """
+    if len(conns) < 3:
+        return min(conns, key=connection_load)
+    return min(random.sample(conns, 2), key=connection_load)
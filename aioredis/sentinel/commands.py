@@ -1,6 +1,6 @@
 import asyncio
 
-from ..util import wait_ok, wait_convert
+from ..util import convert_ok
 from ..commands import Redis
 from .pool import create_sentinel_pool
 
@@ -8,7 +8,8 @@ from .pool import create_sentinel_pool
 @asyncio.coroutine
 def create_sentinel(sentinels, *, db=None, password=None,
                     encoding=None, minsize=1, maxsize=10,
-                    ssl=None, timeout=0.2, loop=None):
+                    ssl=None, timeout=0.2, metrics=None, hooks=None,
+                    loop=None):
     """Creates Redis Sentinel client.
 
     `sentinels` is a list of sentinel nodes.
@@ -25,6 +26,8 @@ def create_sentinel(sentinels, *, db=None, password=None,
                                            maxsize=maxsize,
                                            ssl=ssl,
                                            timeout=timeout,
+                                           metrics=metrics,
+                                           hooks=hooks,
                                            loop=loop)
     return RedisSentinel(pool)
 
@@ -74,49 +77,46 @@ class RedisSentinel:
 
     def master(self, name):
         """Returns a dictionary containing the specified masters state."""
-        fut = self.execute(b'MASTER', name, encoding='utf-8')
-        return wait_convert(fut, parse_sentinel_master)
+        return self.execute(b'MASTER', name, encoding='utf-8',
+                            converter=parse_sentinel_master)
 
     def master_address(self, name):
         """Returns a (host, port) pair for the given ``name``."""
-        fut = self.execute(b'get-master-addr-by-name', name, encoding='utf-8')
-        return wait_convert(fut, parse_address)
+        return self.execute(b'get-master-addr-by-name', name,
+                            encoding='utf-8', converter=parse_address)
 
     def masters(self):
         """Returns a list of dictionaries containing each master's state."""
-        fut = self.execute(b'MASTERS', encoding='utf-8')
         # TODO: process masters: we can adjust internal state
-        return wait_convert(fut, parse_sentinel_masters)
+        return self.execute(b'MASTERS', encoding='utf-8',
+                            converter=parse_sentinel_masters)
 
     def slaves(self, name):
         """Returns a list of slaves for ``name``."""
-        fut = self.execute(b'SLAVES', name, encoding='utf-8')
-        return wait_convert(fut, parse_sentinel_slaves_and_sentinels)
+        return self.execute(b'SLAVES', name, encoding='utf-8',
+                            converter=parse_sentinel_slaves_and_sentinels)
 
     def sentinels(self, name):
         """Returns a list of sentinels for ``name``."""
-        fut = self.execute(b'SENTINELS', name, encoding='utf-8')
-        return wait_convert(fut, parse_sentinel_slaves_and_sentinels)
+        return self.execute(b'SENTINELS', name, encoding='utf-8',
+                            converter=parse_sentinel_slaves_and_sentinels)
 
     def monitor(self, name, ip, port, quorum):
         """Add a new master to Sentinel to be monitored."""
-        fut = self.execute(b'MONITOR', name, ip, port, quorum)
-        return wait_ok(fut)
+        return self.execute(b'MONITOR', name, ip, port, quorum,
+                            converter=convert_ok)
 
     def remove(self, name):
         """Remove a master from Sentinel's monitoring."""
-        fut = self.execute(b'REMOVE', name)
-        return wait_ok(fut)
+        return self.execute(b'REMOVE', name, converter=convert_ok)
 
     def set(self, name, option, value):
         """Set Sentinel monitoring parameters for a given master."""
-        fut = self.execute(b"SET", name, option, value)
-        return wait_ok(fut)
+        return self.execute(b"SET", name, option, value, converter=convert_ok)
 
     def failover(self, name):
         """Force a failover of a named master."""
-        fut = self.execute(b'FAILOVER', name)
-        return wait_ok(fut)
+        return self.execute(b'FAILOVER', name, converter=convert_ok)
 
     def check_quorum(self, name):
         """
@@ -20,7 +20,8 @@ _logger = sentinel_logger.getChild('monitor')
 @asyncio.coroutine
 def create_sentinel_pool(sentinels, *, db=None, password=None,
                          encoding=None, minsize=1, maxsize=10,
-                         ssl=None, parser=None, timeout=0.2, loop=None):
+                         ssl=None, parser=None, timeout=0.2, metrics=None,
+                         hooks=None, loop=None):
     """Create SentinelPool."""
     # FIXME: revise default timeout value
     assert isinstance(sentinels, (list, tuple)), sentinels
@@ -35,6 +36,8 @@ def create_sentinel_pool(sentinels, *, db=None, password=None,
                         minsize=minsize,
                         maxsize=maxsize,
                         timeout=timeout,
+                        metrics=metrics,
+                        hooks=hooks,
                         loop=loop)
     yield from pool.discover()
     return pool
@@ -49,7 +52,7 @@ class SentinelPool:
 
     def __init__(self, sentinels, *, db=None, password=None, ssl=None,
                  encoding=None, parser=None, minsize, maxsize, timeout,
-                 loop=None):
+                 metrics=None, hooks=None, loop=None):
         if loop is None:
             loop = asyncio.get_event_loop()
         # TODO: add connection/discover timeouts;
@@ -70,6 +73,8 @@ class SentinelPool:
         self._redis_encoding = encoding
         self._redis_minsize = minsize
         self._redis_maxsize = maxsize
+        self._metrics = metrics
+        self._hooks = list(hooks or ())
         self._close_state = asyncio.Event(loop=loop)
         self._close_waiter = None
         self._monitor = monitor = Receiver(loop=loop)
@@ -107,6 +112,11 @@ class SentinelPool:
         """
         return self._timeout
 
+    @property
+    def metrics(self):
+        """Metrics instance shared by services' connections or None."""
+        return self._metrics
+
     def master_for(self, service):
         """Returns wrapper to master's pool for requested service."""
         # TODO: make it coroutine and connect minsize connections
@@ -120,6 +130,8 @@ class SentinelPool:
                 maxsize=self._redis_maxsize,
                 ssl=self._redis_ssl,
                 parser=self._parser_class,
+                metrics=self._metrics,
+                hooks=self._hooks,
                 loop=self._loop)
         return self._masters[service]
 
@@ -136,6 +148,8 @@ class SentinelPool:
                 maxsize=self._redis_maxsize,
                 ssl=self._redis_ssl,
                 parser=self._parser_class,
+                metrics=self._metrics,
+                hooks=self._hooks,
                 loop=self._loop)
         return self._slaves[service]
 
@@ -380,11 +394,13 @@ class ManagedPool(ConnectionsPool):
 
     def __init__(self, sentinel, service, is_master,
                  db=None, password=None, encoding=None, parser=None,
-                 *, minsize, maxsize, ssl=None, loop=None):
+                 *, minsize, maxsize, ssl=None, metrics=None, hooks=None,
+                 loop=None):
         super().__init__(_NON_DISCOVERED,
                          db=db, password=password, encoding=encoding,
                          minsize=minsize, maxsize=maxsize, ssl=ssl,
-                         parser=parser, loop=loop)
+                         parser=parser, metrics=metrics, hooks=hooks,
+                         loop=loop)
         assert self._address is _NON_DISCOVERED
         self._sentinel = sentinel
         self._service = service
@@ -0,0 +1,566 @@
+import abc
+import asyncio
+import hashlib
+import types
+from bisect import bisect
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from .abc import AbcPool
+from .errors import PoolClosedError
+from .pool import ConnectionsPool
+
+__all__ = [
+    'HashRing',
+    'ShardedPool',
+    'create_sharded_pool',
+]
+
+
+def _hash(data, offset=0):
+    digest = hashlib.md5(data).digest()
+    return int.from_bytes(digest[offset:offset + 4], 'little')
+
+
+def _key_bytes(key):
+    if isinstance(key, bytes):
+        data = key
+    elif isinstance(key, str):
+        data = key.encode('utf-8')
+    elif isinstance(key, (bytearray, memoryview)):
+        data = bytes(key)
+    else:
+        data = str(key).encode('utf-8')
+    # only part in first non-empty {...} is hashed (like in redis cluster)
+    start = data.find(b'{')
+    if start != -1:
+        end = data.find(b'}', start + 1)
+        if end > start + 1:
+            return data[start + 1:end]
+    return data
+
+
+class HashRing:
+    """Ketama consistent hashing ring.
+
+    Every node is placed on the ring at ``points`` positions
+    (md5 of ``'<node>-<n>'``, 4 positions per digest), key belongs
+    to the node of the first position following key's hash,
+    so adding or removing one of N nodes remaps about 1/N of keys.
+    Keys with hashtag (``{...}``) are hashed by hashtag only.
+    """
+
+    def __init__(self, nodes=(), *, points=160):
+        assert points > 0 and points % 4 == 0, (
+            "points must be positive multiple of 4", points)
+        self._points = points
+        self._nodes = []
+        self._ring = []
+        self._ring_nodes = []
+        for node in nodes:
+            self.add(node)
+
+    @property
+    def nodes(self):
+        """Tuple of ring nodes."""
+        return tuple(self._nodes)
+
+    def add(self, node):
+        """Adds node (str) to ring."""
+        if node in self._nodes:
+            raise ValueError("Node {!r} is already in ring".format(node))
+        self._nodes.append(node)
+        self._build()
+
+    def remove(self, node):
+        """Removes node from ring."""
+        self._nodes.remove(node)
+        self._build()
+
+    def get(self, key):
+        """Returns node key belongs to."""
+        if not self._ring:
+            raise ValueError("Ring is empty")
+        idx = bisect(self._ring, _hash(_key_bytes(key)))
+        return self._ring_nodes[idx % len(self._ring)]
+
+    def _build(self):
+        points = []
+        for node in self._nodes:
+            for i in range(self._points // 4):
+                data = '{}-{}'.format(node, i).encode('utf-8')
+                for offset in (0, 4, 8, 12):
+                    points.append((_hash(data, offset), node))
+        points.sort()
+        self._ring = [point for point, _ in points]
+        self._ring_nodes = [node for _, node in points]
+
+
+class _PubSubView(Mapping):
+    """Read-only view of channels (or patterns) of all nodes pools."""
+
+    def __init__(self, pools, attr):
+        self._pools = pools
+        self._attr = attr
+
+    def _mappings(self):
+        return [getattr(pool, self._attr) for pool in self._pools.values()]
+
+    def __getitem__(self, key):
+        for mapping in self._mappings():
+            if key in mapping:
+                return mapping[key]
+        raise KeyError(key)
+
+    def __iter__(self):
+        for mapping in self._mappings():
+            yield from mapping
+
+    def __len__(self):
+        return sum(len(mapping) for mapping in self._mappings())
+
+
+def _node_name(address):
+    if isinstance(address, (list, tuple)):
+        return '{}:{}'.format(*address)
+    return address
+
+
+def _merge_ordered(positions, results, total):
+    merged = [None] * total
+    for node_positions, node_results in zip(positions, results):
+        for pos, res in zip(node_positions, node_results):
+            merged[pos] = res
+    return merged
+
+
+def _merge_sum(positions, results, total):
+    return sum(results)
+
+
+def _merge_first(positions, results, total):
+    return results[0]
+
+
+def _merge_concat(positions, results, total):
+    return [item for res in results for item in res]
+
+
+def _merge_script(positions, results, total):
+    # SCRIPT EXISTS: script exists if it is loaded on all nodes
+    if isinstance(results[0], list):
+        return [int(all(flags)) for flags in zip(*results)]
+    return results[0]
+
+
+def _commands(spec):
+    return {name: value
+            for cmd, value in spec.items()
+            for name in (cmd, cmd.encode('utf-8'))}
+
+
+# Multi-key commands split by node: (number of args per key, merge)
+_MULTI_KEY_COMMANDS = _commands({
+    'MGET': (1, _merge_ordered),
+    'DEL': (1, _merge_sum),
+    'UNLINK': (1, _merge_sum),
+    'EXISTS': (1, _merge_sum),
+    'TOUCH': (1, _merge_sum),
+    'MSET': (2, _merge_first),
+    })
+
+# Keyless commands sent to all nodes: merge
+_ALL_NODES_COMMANDS = _commands({
+    'PING': _merge_first,
+    'FLUSHDB': _merge_first,
+    'FLUSHALL': _merge_first,
+    'DBSIZE': _merge_sum,
+    'KEYS': _merge_concat,
+    'SCRIPT': _merge_script,
+    })
+
+
+def _token(arg):
+    if isinstance(arg, bytes):
+        return arg.decode('utf-8', 'replace').upper()
+    if isinstance(arg, str):
+        return arg.upper()
+    return None
+
+
+def _no_key(args):
+    return None
+
+
+def _node_specific(args):
+    raise ValueError("SCAN cursor is specific to node;"
+                     " scan every node's pool instead")
+
+
+def _eval_key(args):
+    if len(args) > 2 and int(args[1]):
+        return args[2]
+    return None
+
+
+def _second_arg_key(args):
+    return args[1] if len(args) > 1 else None
+
+
+def _subcommand_key(*subcommands):
+    def key(args):
+        if len(args) > 1 and _token(args[0]) in subcommands:
+            return args[1]
+        return None
+    return key
+
+
+def _streams_key(args):
+    for i, arg in enumerate(args[:-1]):
+        if _token(arg) == 'STREAMS':
+            return args[i + 1]
+    return None
+
+
+# Functions returning key of command routed by (None if it has no key)
+# for commands which first argument is not a key;
+# other commands are routed by their first argument.
+_KEY_SPECS = _commands(dict({
+    'EVAL': _eval_key,
+    'EVALSHA': _eval_key,
+    'BITOP': _second_arg_key,
+    'OBJECT': _second_arg_key,
+    'MEMORY': _subcommand_key('USAGE'),
+    'DEBUG': _subcommand_key('OBJECT'),
+    'XINFO': _subcommand_key('STREAM', 'GROUPS', 'CONSUMERS'),
+    'XGROUP': _subcommand_key('CREATE', 'SETID', 'DESTROY',
+                              'CREATECONSUMER', 'DELCONSUMER'),
+    'XREAD': _streams_key,
+    'XREADGROUP': _streams_key,
+    'SCAN': _node_specific,
+    }, **dict.fromkeys([
+        'CLUSTER', 'INFO', 'TIME', 'CONFIG', 'CLIENT', 'COMMAND', 'ECHO',
+        'ROLE', 'LASTSAVE', 'SLOWLOG', 'READONLY', 'READWRITE',
+        'RANDOMKEY',
+        ], _no_key)))
+
+
+@asyncio.coroutine
+def create_sharded_pool(addresses, *, db=None, password=None,
+                        encoding=None, minsize=1, maxsize=10, points=160,
+                        loop=None, **kwargs):
+    """Creates pool sharding keys across independent redis servers.
+
+    Pool of every node is created with the same arguments
+    (other keyword arguments are passed to
+    :class:`~aioredis.ConnectionsPool`).
+
+    This function is a coroutine.
+    """
+    pool = ShardedPool(addresses, db, password, encoding,
+                       minsize=minsize, maxsize=maxsize, points=points,
+                       loop=loop, **kwargs)
+    try:
+        yield from asyncio.gather(
+            *[node._fill_free(override_min=False)
+              for node in pool.pools.values()], loop=pool._loop)
+    except Exception:
+        pool.close()
+        yield from pool.wait_closed()
+        raise
+    return pool
+
+
+class _BaseShardedPool(AbcPool):
+    """Base of pools routing commands to nodes connections pools by key.
+
+    Subclasses map key to shard (``_shard``) and shard to node pool
+    (``_shard_pool``).
+    """
+
+    def __init__(self, db=None, password=None, encoding=None,
+                 *, loop=None, **kwargs):
+        if loop is None:
+            loop = asyncio.get_event_loop()
+        self._loop = loop
+        self._db = db
+        self._password = password
+        self._encoding = encoding
+        self._kwargs = kwargs
+        self._pools = OrderedDict()
+        self._acquired = {}
+        self._closed = False
+
+    def __repr__(self):
+        return '<{} [db:{}, nodes:{}]>'.format(
+            self.__class__.__name__, self.db, len(self._pools))
+
+    @property
+    def pools(self):
+        """Nodes connections pools by node name
+        (``'host:port'`` or unix socket path).
+        """
+        return types.MappingProxyType(self._pools)
+
+    def get_pool(self, key):
+        """Returns connections pool of node key belongs to."""
+        return self._shard_pool(self._shard(key))
+
+    @abc.abstractmethod
+    def _shard(self, key):
+        """Returns shard of key."""
+
+    @abc.abstractmethod
+    def _shard_pool(self, shard):
+        """Returns node connections pool of shard."""
+
+    def _all_pools(self):
+        # pools keyless commands (eg DBSIZE) are sent to
+        return list(self._pools.values())
+
+    def _execute_keyless(self, command, args, kw):
+        raise ValueError(
+            "Can not pick node for {!r} command without key".format(command))
+
+    def execute(self, command, *args, **kw):
+        """Executes redis command in pool of key's node(s)."""
+        spec = _MULTI_KEY_COMMANDS.get(command)
+        if spec is None:
+            spec = _MULTI_KEY_COMMANDS.get(command.upper())
+        if spec is not None:
+            step, merge = spec
+            groups = self._split(args, step)
+            if len(groups) == 1:
+                shard, = groups
+                return self._shard_pool(shard).execute(command, *args, **kw)
+            # converter is applied to merged result
+            converter = kw.pop('converter', None)
+            return self._gather(
+                [self._shard_pool(shard).execute(command, *shard_args, **kw)
+                 for shard, (_, shard_args) in groups.items()],
+                merge, [positions for positions, _ in groups.values()],
+                len(args) // step, converter)
+        merge = _ALL_NODES_COMMANDS.get(command)
+        if merge is None:
+            merge = _ALL_NODES_COMMANDS.get(command.upper())
+        if merge is not None:
+            converter = kw.pop('converter', None)
+            return self._gather(
+                [pool.execute(command, *args, **kw)
+                 for pool in self._all_pools()],
+                merge, None, 0, converter)
+        key = self._key(command, args)
+        if key is None:
+            return self._execute_keyless(command, args, kw)
+        return self.get_pool(key).execute(command, *args, **kw)
+
+    def _key(self, command, args):
+        # None for commands without key
+        spec = _KEY_SPECS.get(command)
+        if spec is None:
+            spec = _KEY_SPECS.get(command.upper())
+        if spec is not None:
+            return spec(args)
+        return args[0] if args else None
+
+    def _split(self, args, step):
+        if not args:
+            raise ValueError("Keys expected")
+        groups = OrderedDict()
+        for i in range(0, len(args), step):
+            positions, shard_args = groups.setdefault(
+                self._shard(args[i]), ([], []))
+            positions.append(i // step)
+            shard_args.extend(args[i:i + step])
+        return groups
+
+    @asyncio.coroutine
+    def _gather(self, futures, merge, positions, total, converter):
+        results = yield from asyncio.gather(*futures, loop=self._loop)
+        res = merge(positions, results, total)
+        if converter is not None:
+            res = converter(res)
+        return res
+
+    def execute_pubsub(self, command, *channels):
+        """Executes Redis (p)subscribe/(p)unsubscribe commands
+        in pools of channels' nodes.
+
+        Raises TypeError if no channels/patterns are given.
+        """
+        if not channels:
+            raise TypeError("No channels/patterns supplied")
+        groups = self._split(channels, 1)
+        return self._gather(
+            [self._shard_pool(shard).execute_pubsub(command, *shard_channels)
+             for shard, (_, shard_channels) in groups.items()],
+            _merge_ordered, [positions for positions, _ in groups.values()],
+            len(channels), None)
+
+    @asyncio.coroutine
+    def execute_streaming(self, command, *args, **kw):
+        pool = self._key_pool(command, args)
+        return (yield from pool.execute_streaming(command, *args, **kw))
+
+    def get_connection(self, command, args=()):
+        """Gets free connection from pool of key's node."""
+        return self._key_pool(command, args).get_connection(command, args)
+
+    def _key_pool(self, command, args):
+        key = self._key(command, args)
+        if key is None:
+            raise ValueError(
+                "Can not pick node for {!r} command without key"
+                .format(command))
+        return self.get_pool(key)
+
+    @asyncio.coroutine
+    def acquire(self, command=None, args=()):
+        """Acquires connection from pool of command key's node.
+
+        Raises ValueError if command has no key
+        (use ``get_pool(key)`` to run transactions and pipelines).
+        """
+        if command is None:
+            raise ValueError("Command key is required to pick node;"
+                             " use get_pool(key) instead")
+        pool = self._key_pool(command, args)
+        conn = yield from pool.acquire(command, args)
+        self._acquired[conn] = pool
+        return conn
+
+    def release(self, conn):
+        """Returns used connection back into its node's pool."""
+        self._acquired.pop(conn).release(conn)
+
+    def close(self):
+        """Closes all nodes pools."""
+        self._closed = True
+        for pool in self._pools.values():
+            pool.close()
+
+    @asyncio.coroutine
+    def wait_closed(self):
+        """Waits until all nodes pools get closed."""
+        for pool in list(self._pools.values()):
+            yield from pool.wait_closed()
+
+    @property
+    def closed(self):
+        """True if pool is closed."""
+        return self._closed
+
+    @property
+    def address(self):
+        """None (see ``pools``)."""
+        return None
+
+    @property
+    def db(self):
+        """Currently selected db index."""
+        return self._db or 0
+
+    @property
+    def encoding(self):
+        """Current set codec or None."""
+        return self._encoding
+
+    @property
+    def in_transaction(self):
+        return False
+
+    @property
+    def in_pubsub(self):
+        return sum(pool.in_pubsub for pool in self._pools.values())
+
+    @property
+    def pubsub_channels(self):
+        return _PubSubView(self._pools, 'pubsub_channels')
+
+    @property
+    def pubsub_patterns(self):
+        return _PubSubView(self._pools, 'pubsub_patterns')
+
+    @asyncio.coroutine
+    def select(self, db):
+        """Changes db index for all nodes pools."""
+        res = True
+        for pool in self._pools.values():
+            res = (yield from pool.select(db)) and res
+        self._db = db
+        return res
+
+    @asyncio.coroutine
+    def auth(self, password):
+        self._password = password
+        for pool in self._pools.values():
+            yield from pool.auth(password)
+
+    def __iter__(self):
+        # transactions and pipelines can not pick node (see acquire)
+        return self.acquire()
+
+
+class ShardedPool(_BaseShardedPool):
+    """Pool of connections pools of independent redis servers.
+
+    Keys are distributed over nodes with :class:`HashRing`;
+    single-key commands are sent to pool of key's node,
+    multi-key MGET/MSET/DEL/UNLINK/EXISTS/TOUCH are split by nodes
+    and results merged, PING/FLUSHDB/FLUSHALL/DBSIZE/KEYS/SCRIPT are
+    sent to all nodes.
+    Other multi-key commands (eg SINTER, RPOPLPUSH) are sent to node
+    of their first key so their keys must share hashtag.
+    SCAN must be run on every node's pool (see ``pools``).
+    Channels (and patterns) are mapped to nodes as keys.
+    """
+
+    def __init__(self, addresses, db=None, password=None, encoding=None,
+                 *, points=160, loop=None, **kwargs):
+        super().__init__(db, password, encoding, loop=loop, **kwargs)
+        self._ring = HashRing(points=points)
+        for address in addresses:
+            self._add_pool(address)
+
+    @property
+    def ring(self):
+        """:class:`HashRing` of nodes names."""
+        return self._ring
+
+    def _shard(self, key):
+        return self._ring.get(key)
+
+    def _shard_pool(self, name):
+        return self._pools[name]
+
+    def _add_pool(self, address):
+        name = _node_name(address)
+        self._ring.add(name)
+        pool = ConnectionsPool(address, self._db, self._password,
+                               self._encoding, loop=self._loop,
+                               **self._kwargs)
+        self._pools[name] = pool
+        return pool
+
+    @asyncio.coroutine
+    def add_node(self, address):
+        """Adds node; about 1/N of keys are remapped to it
+        (keys are not migrated).
+        """
+        if self._closed:
+            raise PoolClosedError("Pool is closed")
+        pool = self._add_pool(address)
+        try:
+            yield from pool._fill_free(override_min=False)
+        except Exception:
+            yield from self.remove_node(address)
+            raise
+
+    @asyncio.coroutine
+    def remove_node(self, address):
+        """Removes node and closes its connections pool."""
+        name = _node_name(address)
+        self._ring.remove(name)
+        pool = self._pools.pop(name)
+        pool.close()
+        yield from pool.wait_closed()
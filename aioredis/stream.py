@@ -0,0 +1,332 @@
+import asyncio
+import os
+import sys
+
+from collections import deque
+
+from .util import (
+    create_future,
+    correct_aiter,
+    _set_result,
+    _set_exception,
+    )
+from .errors import (
+    ProtocolError,
+    ReplyError,
+    ReadOnlyError,
+    )
+
+__all__ = [
+    'BulkReplyStream',
+]
+
+PY_35 = sys.version_info >= (3, 5)
+
+# Connection stops reading from socket when this many bytes
+# are received but not yet read from stream.
+STREAM_BUFFER_LIMIT = 1024 * 1024
+
+# Max length of '$<size>\r\n' header.
+_MAX_HEADER_SIZE = 64
+
+
+class BulkReplyStream:
+    """Bulk-string reply body streamed in chunks as it is received.
+
+    Instances are created by
+    :meth:`RedisConnection.execute_streaming() <aioredis.RedisConnection>`
+    which returns stream once reply header is received.
+
+    Usage example:
+
+    >>> stream = await conn.execute_streaming('GET', 'key')
+    >>> async for chunk in stream:
+    ...     response.write(chunk)
+
+    If sink callable is given chunks are passed to it as they are
+    received instead of being buffered; ``read()`` then just waits
+    for the end of reply (and raises error raised by sink if any).
+    """
+
+    def __init__(self, connection, *, sink=None, loop):
+        self._conn = connection
+        self._sink = sink
+        self._loop = loop
+        self._header = bytearray()
+        self._crlf = bytearray()
+        self._size = None
+        self._remaining = None
+        self._chunks = deque()
+        self._buffered = 0
+        self._paused = False
+        self._discard = False
+        self._eof = False
+        self._exc = None
+        self._waiter = None
+        self._callbacks = []
+        self._started = create_future(loop=loop)
+
+    def __repr__(self):
+        return '<{} size:{} buffered:{} eof:{}>'.format(
+            self.__class__.__name__, self._size, self._buffered, self._eof)
+
+    @property
+    def size(self):
+        """Size of reply body in bytes."""
+        return self._size
+
+    def at_eof(self):
+        """True if whole reply is received and read."""
+        return self._eof and not self._chunks
+
+    @asyncio.coroutine
+    def read(self):
+        """Returns next chunk of reply body or empty bytes
+        when whole body is read.
+
+        :raises aioredis.ConnectionClosedError: If connection was closed
+            before whole reply body was received.
+        """
+        while not self._chunks:
+            if self._exc is not None:
+                raise self._exc
+            if self._eof:
+                return b''
+            assert self._waiter is None, "read() is already waiting for data"
+            self._waiter = create_future(loop=self._loop)
+            try:
+                yield from self._waiter
+            finally:
+                self._waiter = None
+        chunk = self._chunks.popleft()
+        self._buffered -= len(chunk)
+        if self._paused and self._buffered <= STREAM_BUFFER_LIMIT // 2:
+            self._resume()
+        return chunk
+
+    if PY_35:
+        @correct_aiter
+        def __aiter__(self):
+            return self
+
+        @asyncio.coroutine
+        def __anext__(self):
+            chunk = yield from self.read()
+            if not chunk:
+                raise StopAsyncIteration    # noqa
+            return chunk
+
+    def close(self):
+        """Discards rest of reply body.
+
+        Connection must receive whole reply before processing
+        any other commands, so the rest of body is read and dropped.
+        """
+        self._discard = True
+        self._chunks.clear()
+        self._buffered = 0
+        if self._paused:
+            self._resume()
+        self._wakeup()
+
+    def add_done_callback(self, callback):
+        """Adds callback to be called with stream as its only argument
+        when whole reply is received (or connection is closed).
+        """
+        if self._eof:
+            self._loop.call_soon(callback, self)
+        else:
+            self._callbacks.append(callback)
+
+    # internal methods
+
+    def feed(self, data):
+        """Feeds received data to stream.
+
+        Internal method, called by connection.
+        Returns data left after the end of reply.
+        Raises ProtocolError if reply is not a bulk-string.
+        """
+        if self._size is None:
+            data = self._feed_header(data)
+            if self._size is None:
+                return data
+        if self._remaining:
+            if len(data) <= self._remaining:
+                chunk, data = data, b''
+            else:
+                chunk, data = (data[:self._remaining],
+                               data[self._remaining:])
+            self._remaining -= len(chunk)
+            if chunk:
+                self._put(chunk)
+        if not self._remaining and data:
+            need = 2 - len(self._crlf)
+            self._crlf.extend(data[:need])
+            data = data[need:]
+            if len(self._crlf) == 2:
+                if self._crlf != b'\r\n':
+                    raise ProtocolError("Expected b'\\r\\n'")
+                self._finish()
+        return data
+
+    def _feed_header(self, data):
+        header = self._header
+        header.extend(data)
+        end = header.find(b'\r\n')
+        if end < 0:
+            if len(header) > _MAX_HEADER_SIZE:
+                raise ProtocolError("Bulk-string header is too long")
+            return b''
+        line, data = header[:end], bytes(header[end+2:])
+        header.clear()
+        ctl = line[:1]
+        if ctl == b'-':
+            msg = line[1:].decode('utf-8')
+            if msg.startswith('READONLY'):
+                exc = ReadOnlyError(msg)
+            else:
+                exc = ReplyError(msg)
+            _set_exception(self._started, exc)
+            self._finish()
+            return data
+        if ctl == b'_':
+            # RESP3 null
+            _set_result(self._started, None)
+            self._finish()
+            return data
+        if ctl != b'$':
+            raise ProtocolError(
+                "Expected bulk-string reply, got {!r}".format(bytes(line)))
+        try:
+            size = int(line[1:])
+        except ValueError as exc:
+            raise ProtocolError(exc)
+        if size < 0:
+            if size != -1:
+                raise ProtocolError("Invalid bulk length: {}".format(size))
+            _set_result(self._started, None)
+            self._finish()
+            return data
+        self._size = self._remaining = size
+        _set_result(self._started, self)
+        return data
+
+    def _put(self, chunk):
+        if self._discard:
+            return
+        if self._sink is not None:
+            try:
+                self._sink(chunk)
+            except Exception as exc:
+                # drop the rest of reply
+                self._exc = exc
+                self._discard = True
+                self._wakeup()
+            return
+        self._chunks.append(chunk)
+        self._buffered += len(chunk)
+        if not self._paused and self._buffered >= STREAM_BUFFER_LIMIT:
+            self._paused = True
+            self._conn._pause_reading()
+        self._wakeup()
+
+    def _resume(self):
+        self._paused = False
+        self._conn._resume_reading()
+
+    def _wakeup(self):
+        if self._waiter is not None:
+            fut, self._waiter = self._waiter, None
+            _set_result(fut, None)
+
+    def _at_start(self):
+        # no byte of reply has been received yet
+        return self._size is None and not self._header and not self._eof
+
+    def _finish(self):
+        self._eof = True
+        if self._paused:
+            self._resume()
+        self._wakeup()
+        self._conn._stream_done(self)
+        callbacks, self._callbacks = self._callbacks, []
+        for cb in callbacks:
+            self._loop.call_soon(cb, self)
+
+    def set_exception(self, exc):
+        """Marks stream as broken.
+
+        Internal method, called when connection is closed.
+        """
+        if self._eof:
+            return
+        if self._started.done():
+            self._exc = exc
+        else:
+            _set_exception(self._started, exc)
+        self._paused = False
+        self._finish()
+
+
+class BufferSink:
+    """Writes chunks one after another into writable buffer
+    (bytearray, mmap, memoryview, etc).
+    """
+
+    def __init__(self, buffer):
+        view = memoryview(buffer)
+        if view.readonly:
+            view.release()
+            raise TypeError("Buffer is read-only")
+        self._view = view.cast('B')
+        view.release()
+        self._pos = 0
+
+    def write(self, chunk):
+        end = self._pos + len(chunk)
+        if end > self._view.nbytes:
+            raise ValueError("Buffer is too small for value")
+        self._view[self._pos:end] = chunk
+        self._pos = end
+
+    def close(self):
+        self._view.release()
+
+
+class FileSink:
+    """Writes chunks to file object or file descriptor.
+
+    Chunks are written synchronously as they are received, blocking
+    event loop until write completes; it is meant for local storage
+    fast enough to keep up with network (use :meth:`Redis.get_stream`
+    and write chunks in executor otherwise).
+    """
+
+    def __init__(self, file):
+        if isinstance(file, int):
+            self._fd = file
+        elif callable(getattr(file, 'write', None)):
+            self._fd = None
+            self.write = file.write
+        else:
+            raise TypeError("Expected file object or file descriptor,"
+                            " got {!r}".format(file))
+
+    def write(self, chunk):
+        view = memoryview(chunk)
+        while view:
+            view = view[os.write(self._fd, view):]
+
+    def close(self):
+        pass
+
+
+def make_sink(target):
+    """Returns sink writing chunks into target writable buffer
+    or else file object or file descriptor.
+    """
+    try:
+        return BufferSink(target)
+    except TypeError:
+        return FileSink(target)
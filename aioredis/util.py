@@ -23,36 +23,110 @@ def correct_aiter(func):
 _converters = {
     bytes: lambda val: val,
     bytearray: lambda val: val,
+    # non-contiguous views can not be cast (nor written), so they are copied
+    memoryview: lambda val: val.cast('B') if val.c_contiguous else bytes(val),
     str: lambda val: val.encode('utf-8'),
     int: lambda val: str(val).encode('utf-8'),
     float: lambda val: str(val).encode('utf-8'),
     }
 
+# Arguments of this size or larger are not copied by encode_command_buffers
+ZERO_COPY_SIZE = 16 * 1024
 
-def _bytes_len(sized):
-    return str(len(sized)).encode('utf-8')
+# Pre-built array/bulk-string headers for small lengths
+_HEADERS_SIZE = 1024
+_ARRAY_HEADERS = tuple(('*{}\r\n'.format(i)).encode('utf-8')
+                       for i in range(_HEADERS_SIZE))
+_BULK_HEADERS = tuple(('${}\r\n'.format(i)).encode('utf-8')
+                      for i in range(_HEADERS_SIZE))
+
+# Cache of encoded '$len\r\nCOMMAND\r\n' bulk-strings keyed by command
+# (array header is taken from _ARRAY_HEADERS)
+_command_prefixes = {}
+_COMMAND_PREFIXES_SIZE = 1024
+
+
+def _array_header(size):
+    if size < _HEADERS_SIZE:
+        return _ARRAY_HEADERS[size]
+    return b'*' + str(size).encode('utf-8') + b'\r\n'
+
+
+def _bulk_header(size):
+    if size < _HEADERS_SIZE:
+        return _BULK_HEADERS[size]
+    return b'$' + str(size).encode('utf-8') + b'\r\n'
+
+
+def _convert(arg):
+    conv = _converters.get(type(arg))
+    if conv is None:
+        raise TypeError("Argument {!r} expected to be of bytes, bytearray,"
+                        " memoryview, str, int or float type".format(arg))
+    return conv(arg)
+
+
+def _command_prefix(args):
+    """Returns encoded array header followed by command bulk-string."""
+    command = args[0]
+    cacheable = type(command) is str or type(command) is bytes
+    if cacheable:
+        bulk = _command_prefixes.get(command)
+        if bulk is not None:
+            return _array_header(len(args)) + bulk
+    bcommand = _convert(command)
+    bulk = b''.join((_bulk_header(len(bcommand)), bcommand, b'\r\n'))
+    if cacheable and len(_command_prefixes) < _COMMAND_PREFIXES_SIZE:
+        _command_prefixes[command] = bulk
+    return _array_header(len(args)) + bulk
 
 
 def encode_command(*args):
     """Encodes arguments into redis bulk-strings array.
 
-    Raises TypeError if any of args not of bytes, str, int or float type.
+    Raises TypeError if any of args not of bytes, bytearray, memoryview,
+    str, int or float type.
     """
-    buf = bytearray()
+    if not args:
+        return bytearray(_ARRAY_HEADERS[0])
+    buf = bytearray(_command_prefix(args))
+    for arg in args[1:]:
+        barg = _convert(arg)
+        buf.extend(_bulk_header(len(barg)))
+        buf.extend(barg)
+        buf.extend(b'\r\n')
+    return buf
+
 
-    def add(data):
-        return buf.extend(data + b'\r\n')
+def encode_command_buffers(*args):
+    """Encodes arguments into list of buffers making up
+    redis bulk-strings array.
 
-    add(b'*' + _bytes_len(args))
-    for arg in args:
-        if type(arg) in _converters:
-            barg = _converters[type(arg)](arg)
-            add(b'$' + _bytes_len(barg))
-            add(barg)
+    Arguments of ZERO_COPY_SIZE bytes or larger are put into list as is
+    (not copied), everything in between is merged into bytearrays.
+    Large buffers are meant to be written with separate
+    ``transport.write()`` calls (``transport.writelines()`` joins them).
+
+    Raises TypeError if any of args not of bytes, bytearray, memoryview,
+    str, int or float type.
+    """
+    if not args:
+        return [_ARRAY_HEADERS[0]]
+    buffers = []
+    buf = bytearray(_command_prefix(args))
+    for arg in args[1:]:
+        barg = _convert(arg)
+        size = len(barg)
+        buf.extend(_bulk_header(size))
+        if size >= ZERO_COPY_SIZE:
+            buffers.append(buf)
+            buffers.append(barg)
+            buf = bytearray()
         else:
-            raise TypeError("Argument {!r} expected to be of bytes,"
-                            " str, int or float type".format(arg))
-    return buf
+            buf.extend(barg)
+        buf.extend(b'\r\n')
+    buffers.append(buf)
+    return buffers
 
 
 def decode(obj, encoding):
@@ -60,15 +134,39 @@ def decode(obj, encoding):
         return obj.decode(encoding)
     elif isinstance(obj, list):
         return [decode(o, encoding) for o in obj]
+    elif isinstance(obj, dict):
+        return {decode(k, encoding): decode(v, encoding)
+                for k, v in obj.items()}
     return obj
 
 
+# Reply converters.
+# Passed to execute() as ``converter`` argument they are called
+# by connection right before reply future is resolved
+# (and with results of EXEC for commands queued in MULTI/EXEC block).
+
+def convert_ok(obj):
+    return obj in (b'OK', 'OK')
+
+
+def make_dict(obj):
+    if isinstance(obj, dict):
+        # RESP3 map
+        return obj
+    it = iter(obj)
+    return dict(zip(it, it))
+
+
+def convert_scan(obj):
+    return int(obj[0]), obj[1]
+
+
 @asyncio.coroutine
 def wait_ok(fut):
     res = yield from fut
     if res in (b'QUEUED', 'QUEUED'):
         return res
-    return res in (b'OK', 'OK')
+    return convert_ok(res)
 
 
 @asyncio.coroutine
@@ -84,8 +182,7 @@ def wait_make_dict(fut):
     res = yield from fut
     if res in (b'QUEUED', 'QUEUED'):
         return res
-    it = iter(res)
-    return dict(zip(it, it))
+    return make_dict(res)
 
 
 class coerced_keys_dict(dict):
@@ -143,7 +240,7 @@ if PY_35:
 def _set_result(fut, result, *info):
     if fut.done():
         logger.debug("Waiter future is already done %r %r", fut, info)
-        assert fut.cancelled(), (
+        assert _is_abandoned(fut), (
             "waiting future is in wrong state", fut, result, info)
     else:
         fut.set_result(result)
@@ -152,12 +249,23 @@ def _set_result(fut, result, *info):
 def _set_exception(fut, exception):
     if fut.done():
         logger.debug("Waiter future is already done %r", fut)
-        assert fut.cancelled(), (
+        assert _is_abandoned(fut), (
             "waiting future is in wrong state", fut, exception)
     else:
         fut.set_exception(exception)
 
 
+def _set_timeout(fut):
+    if not fut.done():
+        fut.set_exception(asyncio.TimeoutError())
+
+
+def _is_abandoned(fut):
+    """True if waiter future is cancelled or timed out."""
+    return (fut.cancelled() or
+            isinstance(fut.exception(), asyncio.TimeoutError))
+
+
 if hasattr(asyncio, 'ensure_future'):
     async_task = asyncio.ensure_future
 else:
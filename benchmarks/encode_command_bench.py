@@ -0,0 +1,34 @@
+"""encode_command() micro-benchmark.
+
+Measures encoding time of typical commands (see also
+tests/encode_command_test.py).
+
+Usage: python benchmarks/encode_command_bench.py [number]
+"""
+import sys
+import timeit
+
+from aioredis.util import encode_command, encode_command_buffers
+
+
+CASES = [
+    ('GET', (b'GET', b'key:1')),
+    ('SET', ('SET', 'key:1', b'x' * 100)),
+    ('SET EX', ('SET', 'key:1', b'x' * 100, 'EX', 10)),
+    ('HGET', ('HGET', 'hash:1', 'field')),
+    ('EVALSHA', ('EVALSHA', 'e0e1f9fabfc9d4800c877a703b823ac0578ff831',
+                 2, 'key:1', 'key:2', 'arg')),
+    ('MGET x100', ('MGET',) + tuple('key:{}'.format(i) for i in range(100))),
+]
+
+
+def main(number=100000):
+    for name, args in CASES:
+        for func in (encode_command, encode_command_buffers):
+            elapsed = timeit.timeit(lambda: func(*args), number=number)
+            print("{:<10} {:<24} {:6.3f}us per call".format(
+                name, func.__name__, elapsed / number * 10**6))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:2]))
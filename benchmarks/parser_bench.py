@@ -0,0 +1,41 @@
+"""Pure-Python parser benchmark.
+
+Feeds large multi-bulk replies to PyReader in fixed size chunks
+and reports parsing time per element; parsing time must grow
+linearly with reply size.
+
+Usage: python benchmarks/parser_bench.py [chunk_size]
+"""
+import sys
+import time
+
+from aioredis.parser import PyReader
+
+
+def make_reply(count, value=b'x' * 16):
+    bulk = '${}\r\n'.format(len(value)).encode('utf-8') + value + b'\r\n'
+    return '*{}\r\n'.format(count).encode('utf-8') + bulk * count
+
+
+def bench(count, chunk_size):
+    data = make_reply(count)
+    reader = PyReader()
+    started = time.perf_counter()
+    for i in range(0, len(data), chunk_size):
+        reader.feed(data[i:i + chunk_size])
+        res = reader.gets()
+    elapsed = time.perf_counter() - started
+    assert len(res) == count, "Reply not parsed"
+    return elapsed
+
+
+def main(chunk_size=4096):
+    print("chunk size: {} bytes".format(chunk_size))
+    for count in (10**3, 10**4, 10**5, 10**6):
+        elapsed = bench(count, chunk_size)
+        print("{:>8} elements: {:8.3f}s total, {:6.3f}us per element"
+              .format(count, elapsed, elapsed / count * 10**6))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:2]))
@@ -0,0 +1,67 @@
+"""Pool acquire/release micro-benchmark.
+
+Measures cost of acquiring and releasing pool connection (no commands
+are sent) when free connection is available and when concurrent
+clients wait for connections of a small pool.
+
+Requires running redis-server.
+
+Usage: python benchmarks/pool_acquire_bench.py [port] [number]
+"""
+import asyncio
+import sys
+import time
+
+import aioredis
+
+
+CLIENTS = 50
+
+
+@asyncio.coroutine
+def uncontended(pool, number):
+    for _ in range(number):
+        conn = yield from pool.acquire()
+        pool.release(conn)
+
+
+@asyncio.coroutine
+def contended(pool, number, loop):
+    @asyncio.coroutine
+    def client():
+        for _ in range(number // CLIENTS):
+            with (yield from pool):
+                # hold connection over a loop iteration
+                yield from asyncio.sleep(0, loop=loop)
+    yield from asyncio.gather(*[client() for _ in range(CLIENTS)], loop=loop)
+
+
+@asyncio.coroutine
+def bench(address, number, loop):
+    results = []
+    for name, maxsize, coro in [
+            ('uncontended', 10, lambda pool: uncontended(pool, number)),
+            ('contended', 4, lambda pool: contended(pool, number, loop)),
+            ]:
+        pool = yield from aioredis.create_pool(
+            address, minsize=maxsize, maxsize=maxsize, loop=loop)
+        started = time.perf_counter()
+        yield from coro(pool)
+        elapsed = time.perf_counter() - started
+        pool.close()
+        yield from pool.wait_closed()
+        results.append((name, elapsed))
+    return results
+
+
+def main(port=6379, number=100000):
+    loop = asyncio.get_event_loop()
+    results = loop.run_until_complete(
+        bench(('localhost', port), number, loop))
+    for name, elapsed in results:
+        print("{:<12} {:6.3f}us per acquire+release".format(
+            name, elapsed / number * 10**6))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:3]))
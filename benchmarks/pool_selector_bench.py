@@ -0,0 +1,77 @@
+"""Pool connection selectors benchmark.
+
+Runs concurrent GET commands through pool while some connections
+are busy receiving large replies and reports GET latency percentiles
+for every selection strategy (see aioredis.selectors).
+
+Requires running redis-server.
+
+Usage: python benchmarks/pool_selector_bench.py [port]
+"""
+import asyncio
+import sys
+import time
+
+import aioredis
+from aioredis.selectors import least_loaded, power_of_two
+
+
+SELECTORS = [
+    ('round-robin', None),
+    ('least-loaded', least_loaded),
+    ('power-of-two', power_of_two),
+]
+
+POOL_SIZE = 8
+CLIENTS = 50
+REQUESTS = 200
+BIG_VALUE = b'x' * 8 * 1024 * 1024
+
+
+@asyncio.coroutine
+def client(pool, latencies, loop):
+    for _ in range(REQUESTS):
+        started = time.perf_counter()
+        yield from pool.execute('GET', 'bench:small')
+        latencies.append(time.perf_counter() - started)
+
+
+@asyncio.coroutine
+def heavy(pool, done):
+    while not done.is_set():
+        yield from pool.execute('GET', 'bench:big')
+
+
+@asyncio.coroutine
+def bench(address, selector, loop):
+    pool = yield from aioredis.create_pool(
+        address, minsize=POOL_SIZE, maxsize=POOL_SIZE,
+        selector=selector, loop=loop)
+    yield from pool.execute('SET', 'bench:small', 'value')
+    yield from pool.execute('SET', 'bench:big', BIG_VALUE)
+    latencies = []
+    done = asyncio.Event(loop=loop)
+    heavy_tasks = [asyncio.ensure_future(heavy(pool, done), loop=loop)
+                   for _ in range(2)]
+    yield from asyncio.gather(
+        *[client(pool, latencies, loop) for _ in range(CLIENTS)], loop=loop)
+    done.set()
+    yield from asyncio.gather(*heavy_tasks, loop=loop)
+    pool.close()
+    yield from pool.wait_closed()
+    latencies.sort()
+    return latencies
+
+
+def main(port=6379):
+    loop = asyncio.get_event_loop()
+    for name, selector in SELECTORS:
+        latencies = loop.run_until_complete(
+            bench(('localhost', port), selector, loop))
+        print("{:<14} p50 {:7.2f}ms  p99 {:7.2f}ms  max {:7.2f}ms".format(
+            name, *(latencies[int(len(latencies) * q)] * 1000
+                    for q in (.5, .99)), latencies[-1] * 1000))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:2]))
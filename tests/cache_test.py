@@ -0,0 +1,231 @@
+import asyncio
+import pytest
+
+from aioredis import Redis, create_sharded_pool, create_replica_pool
+from aioredis.cache import LocalCache
+
+
+@asyncio.coroutine
+def wait_for_size(cache, size, loop):
+    for _ in range(100):
+        if len(cache) == size:
+            return
+        yield from asyncio.sleep(.01, loop=loop)
+    assert len(cache) == size
+
+
+@pytest.redis_version(6, 0, 0, reason="CLIENT TRACKING is available "
+                                      "since redis>=6.0.0")
+@pytest.mark.run_loop
+def test_cache_hits(redis, loop):
+    cache = yield from redis.enable_cache()
+    assert isinstance(cache, LocalCache)
+    assert redis.cache is cache
+    assert not cache.closed
+
+    yield from redis.set('key', 'value')
+    assert (yield from redis.get('key')) == b'value'
+    assert (yield from redis.get('key')) == b'value'
+    assert (yield from redis.get('key', encoding='utf-8')) == 'value'
+    assert cache.hits == 1
+    assert cache.misses == 2
+    assert len(cache) == 2
+
+    with pytest.raises(RuntimeError):
+        yield from redis.enable_cache()
+
+
+@pytest.redis_version(6, 0, 0, reason="CLIENT TRACKING is available "
+                                      "since redis>=6.0.0")
+@pytest.mark.run_loop
+def test_cache_invalidation(redis, create_redis, server, loop):
+    other = yield from create_redis(server.tcp_address, loop=loop)
+    cache = yield from redis.enable_cache()
+
+    yield from other.hmset('hash', 'foo', 1, 'bar', 2)
+    yield from other.sadd('set', 'a')
+    assert (yield from redis.hgetall('hash')) == {b'foo': b'1', b'bar': b'2'}
+    assert (yield from redis.hget('hash', 'foo')) == b'1'
+    assert (yield from redis.smembers('set')) == [b'a']
+    assert len(cache) == 3
+
+    yield from other.hset('hash', 'foo', 3)
+    yield from wait_for_size(cache, 1, loop)
+    assert (yield from redis.hget('hash', 'foo')) == b'3'
+    assert (yield from redis.smembers('set')) == [b'a']
+    assert cache.hits == 1
+
+    yield from other.flushdb()
+    yield from wait_for_size(cache, 0, loop)
+    assert (yield from redis.smembers('set')) == []
+
+
+@pytest.redis_version(6, 0, 0, reason="CLIENT TRACKING is available "
+                                      "since redis>=6.0.0")
+@pytest.mark.run_loop
+def test_cache_lru(redis, loop):
+    cache = yield from redis.enable_cache(maxsize=2)
+    assert cache.maxsize == 2
+
+    yield from redis.get('a')
+    yield from redis.get('b')
+    yield from redis.get('a')
+    yield from redis.get('c')
+    assert len(cache) == 2
+    assert cache.evictions == 1
+    yield from redis.get('a')
+    assert cache.hits == 2
+    yield from redis.get('b')
+    assert cache.misses == 4
+
+    with pytest.raises(ValueError):
+        LocalCache(0)
+
+
+@pytest.redis_version(6, 0, 0, reason="CLIENT TRACKING is available "
+                                      "since redis>=6.0.0")
+@pytest.mark.run_loop
+def test_cache_in_flight_invalidation(redis, loop):
+    cache = yield from redis.enable_cache()
+
+    yield from redis.set('key', 'value')
+    fut = redis.get('key')
+    cache._invalidate([b'key'])
+    assert (yield from fut) == b'value'
+    assert len(cache) == 0
+
+    fut = redis.mget('key', 'other')
+    cache._invalidate(None)
+    assert (yield from fut) == [b'value', None]
+    assert len(cache) == 0
+
+    yield from redis.mget('key', 'other')
+    assert len(cache) == 1
+    cache._invalidate([b'other'])
+    assert len(cache) == 0
+
+
+@pytest.redis_version(6, 0, 0, reason="CLIENT TRACKING is available "
+                                      "since redis>=6.0.0")
+@pytest.mark.run_loop
+def test_cache_prefixes(redis, loop):
+    cache = yield from redis.enable_cache(prefixes=['cached:'])
+
+    yield from redis.get('cached:key')
+    yield from redis.get('key')
+    yield from redis.mget('cached:key', 'key')
+    assert len(cache) == 1
+    assert cache.misses == 1
+
+
+@pytest.redis_version(6, 0, 0, reason="CLIENT TRACKING is available "
+                                      "since redis>=6.0.0")
+@pytest.mark.run_loop
+def test_cache_replies_copied(redis, loop):
+    yield from redis.enable_cache()
+
+    yield from redis.rpush('list', 'a', 'b')
+    val = yield from redis.lrange('list', 0, -1)
+    val.append(b'c')
+    val = yield from redis.lrange('list', 0, -1)
+    assert val == [b'a', b'b']
+    val.append(b'c')
+    assert (yield from redis.lrange('list', 0, -1)) == [b'a', b'b']
+
+
+@pytest.redis_version(6, 0, 0, reason="CLIENT TRACKING is available "
+                                      "since redis>=6.0.0")
+@pytest.mark.run_loop
+def test_cache_converted_replies(redis, loop):
+    cache = yield from redis.enable_cache()
+
+    yield from redis.hmset('hash', 'foo', 'bar')
+    fut = redis.hgetall('hash')
+    assert isinstance(fut, asyncio.Future)
+    assert (yield from fut) == {b'foo': b'bar'}
+    val = yield from redis.hgetall('hash')
+    assert val == {b'foo': b'bar'}
+    assert cache.hits == 1
+    val[b'baz'] = b'1'
+    assert (yield from redis.hgetall('hash')) == {b'foo': b'bar'}
+    # same command with other converter is cached separately
+    assert (yield from redis.execute('HGETALL', 'hash')) == [b'foo', b'bar']
+    assert cache.hits == 2
+    assert cache.misses == 2
+
+
+@pytest.redis_version(6, 0, 0, reason="CLIENT TRACKING is available "
+                                      "since redis>=6.0.0")
+@pytest.mark.run_loop
+def test_cache_close(redis, loop):
+    cache = yield from redis.enable_cache()
+
+    yield from redis.get('key')
+    assert len(cache) == 1
+    cache.close()
+    yield from cache.wait_closed()
+    assert cache.closed
+    assert len(cache) == 0
+
+    assert (yield from redis.get('key')) is None
+    assert len(cache) == 0
+    assert cache.misses == 1
+
+    # cache can be enabled again
+    cache = yield from redis.enable_cache()
+    assert not cache.closed
+
+
+@pytest.redis_version(6, 0, 0, reason="CLIENT TRACKING is available "
+                                      "since redis>=6.0.0")
+@pytest.mark.run_loop
+def test_cache_resp3(create_redis, server, loop):
+    redis = yield from create_redis(server.tcp_address,
+                                    protocol=3, loop=loop)
+    other = yield from create_redis(server.tcp_address, loop=loop)
+    cache = yield from redis.enable_cache()
+
+    yield from other.set('resp3:key', 'value')
+    assert (yield from redis.get('resp3:key')) == b'value'
+    assert len(cache) == 1
+    yield from other.set('resp3:key', 'new')
+    yield from wait_for_size(cache, 0, loop)
+    assert (yield from redis.get('resp3:key')) == b'new'
+
+
+@pytest.redis_version(6, 0, 0, reason="CLIENT TRACKING is available "
+                                      "since redis>=6.0.0")
+@pytest.mark.run_loop
+def test_cache_busy_pool(create_pool, server, loop):
+    pool = yield from create_pool(server.tcp_address, maxsize=1, loop=loop)
+    redis = Redis(pool)
+    cache = yield from redis.enable_cache()
+
+    with (yield from pool):
+        fut = redis.get('key')
+    assert (yield from fut) is None
+    assert len(cache) == 1
+
+    redis.close()
+    yield from redis.wait_closed()
+
+
+@pytest.mark.run_loop
+def test_cache_sharded_pool(_closable, server, loop):
+    pool = yield from create_sharded_pool([server.tcp_address], loop=loop)
+    _closable(pool)
+    redis = Redis(pool)
+    with pytest.raises(TypeError):
+        yield from redis.enable_cache()
+    assert redis.cache is None
+
+
+@pytest.mark.run_loop
+def test_cache_replica_pool(_closable, server, loop):
+    pool = yield from create_replica_pool(
+        server.tcp_address, [server.tcp_address], loop=loop)
+    _closable(pool)
+    redis = Redis(pool)
+    with pytest.raises(TypeError):
+        yield from redis.enable_cache()
+    assert redis.cache is None
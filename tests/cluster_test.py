@@ -0,0 +1,235 @@
+import asyncio
+import pytest
+
+from unittest.mock import patch
+
+import aioredis
+from aioredis import ClusterPool, create_cluster_pool
+from aioredis.cluster import crc16, key_slot
+from aioredis.commands.cluster import parse_cluster_slots
+
+
+def test_key_slot():
+    assert crc16(b'123456789') == 0x31c3
+    assert key_slot('123456789') == 12739
+    assert key_slot(b'123456789') == 12739
+    assert key_slot('{user1000}.following') == key_slot('{user1000}.followers')
+    assert key_slot('{user1000}.following') == key_slot('user1000')
+    # empty hashtag -- whole key is hashed
+    assert key_slot('foo{}{bar}') != key_slot('bar')
+    assert key_slot('foo{{bar}}zap') == key_slot('{bar')
+
+
+@pytest.fixture
+def create_cluster(_closable, loop):
+
+    @asyncio.coroutine
+    def f(*args, **kw):
+        kw.setdefault('loop', loop)
+        pool = yield from create_cluster_pool(*args, **kw)
+        _closable(pool)
+        return pool
+    return f
+
+
+@asyncio.coroutine
+def node_connections(cluster, pool, create_connection, loop):
+    # connections to cluster nodes by pool's node name
+    conns = {}
+    for srv in cluster.nodes:
+        conn = yield from create_connection(srv.tcp_address, loop=loop)
+        for name in pool.masters:
+            if name.endswith(':{}'.format(srv.tcp_address.port)):
+                conns[name] = conn
+    return conns
+
+
+@asyncio.coroutine
+def read_stream(stream):
+    chunks = []
+    while True:
+        chunk = yield from stream.read()
+        if not chunk:
+            return b''.join(chunks)
+        chunks.append(chunk)
+
+
+@asyncio.coroutine
+def node_ids(redis):
+    return {'{}:{}'.format(host, port): node_id
+            for _, _, nodes in (yield from redis.cluster_slots())
+            for host, port, node_id in nodes}
+
+
+@pytest.redis_version(4, 0, 0, reason="CLUSTER SLOTS returns node ids "
+                                      "since redis v4.0")
+@pytest.mark.run_loop
+def test_routing(create_cluster, create_connection, loop, cluster):
+    pool = yield from create_cluster([cluster.nodes[0].tcp_address])
+    assert isinstance(pool, ClusterPool)
+    assert len(pool.masters) == 3
+    assert None not in pool.slots
+    conns = yield from node_connections(cluster, pool, create_connection,
+                                        loop)
+    assert len(conns) == 3
+    for name, conn in conns.items():
+        assert (yield from conn.execute(
+            'cluster', 'keyslot', 'key:cluster')) == key_slot('key:cluster')
+
+    redis = aioredis.Redis(pool)
+    keys = ['key:cluster:{}'.format(i) for i in range(30)]
+    for key in keys:
+        yield from redis.set(key, key)
+    # every key is stored on node serving its slot
+    for key in keys:
+        conn = conns[pool.slots[key_slot(key)]]
+        assert (yield from conn.execute('exists', key)) == 1
+    dbsizes = []
+    for conn in conns.values():
+        dbsizes.append((yield from conn.execute('dbsize')))
+    assert all(dbsizes) and sum(dbsizes) == 30
+    assert (yield from redis.dbsize()) == 30
+    res = yield from redis.mget(keys[5], 'key:cluster:none', *keys[:5],
+                                encoding='utf-8')
+    assert res == [keys[5], None] + keys[:5]
+
+    # SCAN is run on every master node
+    with pytest.raises(ValueError):
+        yield from redis.scan()
+    found = []
+    for name in pool.masters:
+        node = aioredis.Redis(pool.pools[name])
+        cursor = b'0'
+        while cursor:
+            cursor, res = yield from node.scan(cursor, match='key:cluster:*')
+            found.extend(res)
+    assert sorted(found) == sorted(key.encode('utf-8') for key in keys)
+    assert (yield from redis.delete(*keys)) == 30
+
+    # keyless commands are sent to any node
+    assert (yield from redis.time()) > 0
+    assert len((yield from node_ids(redis))) == 3
+
+
+@pytest.redis_version(4, 0, 0, reason="CLUSTER SLOTS returns node ids "
+                                      "since redis v4.0")
+@pytest.mark.run_loop
+def test_moved(create_cluster, create_connection, loop, cluster):
+    pool = yield from create_cluster([cluster.nodes[0].tcp_address])
+    redis = aioredis.Redis(pool)
+    ids = yield from node_ids(redis)
+    conns = yield from node_connections(cluster, pool, create_connection,
+                                        loop)
+    key = 'key:cluster:moved'
+    slot = key_slot(key)
+    source = pool.slots[slot]
+    target = next(name for name in pool.masters if name != source)
+    yield from redis.delete(key)
+
+    @asyncio.coroutine
+    def set_node(name):
+        for conn in conns.values():
+            yield from conn.execute('cluster', 'setslot', slot,
+                                    'node', ids[name])
+
+    # move empty slot to other node; pool has stale map
+    yield from set_node(target)
+    try:
+        assert pool.slots[slot] == source
+        assert (yield from redis.set(key, 'value')) is True
+        assert pool.slots[slot] == target
+        assert (yield from conns[target].execute('get', key)) == b'value'
+        yield from pool.refresh_slots()
+        assert pool.slots[slot] == target
+        assert (yield from redis.get(key)) == b'value'
+
+        # streamed reply follows MOVED too
+        pool._slots[slot] = source
+        stream = yield from pool.execute_streaming('get', key)
+        assert (yield from read_stream(stream)) == b'value'
+        assert pool.slots[slot] == target
+        assert (yield from redis.delete(key)) == 1
+    finally:
+        yield from conns[target].execute('del', key)
+        yield from set_node(source)
+
+
+@pytest.redis_version(4, 0, 0, reason="CLUSTER SLOTS returns node ids "
+                                      "since redis v4.0")
+@pytest.mark.run_loop
+def test_ask(create_cluster, create_connection, loop, cluster):
+    pool = yield from create_cluster([cluster.nodes[0].tcp_address])
+    redis = aioredis.Redis(pool)
+    ids = yield from node_ids(redis)
+    conns = yield from node_connections(cluster, pool, create_connection,
+                                        loop)
+    key = 'key:cluster:ask'
+    slot = key_slot(key)
+    source = pool.slots[slot]
+    target = next(name for name in pool.masters if name != source)
+    yield from redis.delete(key)
+
+    # slot is being migrated; missing keys are looked up on target
+    yield from conns[target].execute('cluster', 'setslot', slot,
+                                     'importing', ids[source])
+    yield from conns[source].execute('cluster', 'setslot', slot,
+                                     'migrating', ids[target])
+    try:
+        assert (yield from redis.set(key, 'value')) is True
+        # key was created on target
+        with pytest.raises(aioredis.ReplyError) as exc_info:
+            yield from conns[source].execute('get', key)
+        assert exc_info.value.args[0].startswith('ASK ')
+        with pytest.raises(aioredis.ReplyError) as exc_info:
+            yield from conns[target].execute('get', key)
+        assert exc_info.value.args[0].startswith('MOVED ')
+        assert (yield from redis.get(key)) == b'value'
+        assert pool.slots[slot] == source
+        stream = yield from pool.execute_streaming('get', key)
+        assert (yield from read_stream(stream)) == b'value'
+        assert (yield from redis.delete(key)) == 1
+    finally:
+        for conn in (conns[source], conns[target]):
+            yield from conn.execute('cluster', 'setslot', slot, 'stable')
+
+
+@pytest.redis_version(3, 0, 0, reason="Redis Cluster is available "
+                                      "since redis v3.0")
+@pytest.mark.run_loop
+def test_refresh_slots(create_cluster, cluster):
+    pool = yield from create_cluster([cluster.nodes[0].tcp_address])
+    redis = aioredis.Redis(pool)
+    slots = pool.slots
+    masters = pool.masters
+
+    def drop_last(reply):
+        # last slots range is not served by any node
+        return sorted(parse_cluster_slots(reply))[:-1]
+
+    start, end, nodes = sorted(
+        (yield from redis.cluster_slots()))[-1]
+    dropped = '{}:{}'.format(*nodes[0][:2])
+    dropped_pool = pool.pools[dropped]
+    key = next('key:cluster:{}'.format(i) for i in range(1000)
+               if start <= key_slot('key:cluster:{}'.format(i)) <= end)
+    yield from redis.delete(key)
+    blpop = dropped_pool.execute('blpop', key, .2)
+    with patch('aioredis.cluster.parse_cluster_slots', drop_last):
+        yield from pool.refresh_slots()
+    assert pool.slots[start:end + 1] == (None,) * (end - start + 1)
+    assert dropped not in pool.masters
+    assert dropped not in pool.pools
+    # dropped node's pool is closed once pending command is done
+    assert not dropped_pool.closed
+    assert (yield from blpop) is None
+    yield from dropped_pool.wait_closed()
+    assert dropped_pool.closed
+
+    # commands for unknown slots are redirected
+    yield from redis.set(key, 'value')
+    assert pool.slots[key_slot(key)] == dropped
+    assert (yield from redis.delete(key)) == 1
+
+    yield from pool.refresh_slots()
+    assert pool.slots == slots
+    assert sorted(pool.masters) == sorted(masters)
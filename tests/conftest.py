@@ -25,6 +25,8 @@ RedisServer = namedtuple('RedisServer', 'name tcp_address unixsocket version')
 SentinelServer = namedtuple('SentinelServer',
                             'name tcp_address unixsocket version masters')
 
+RedisCluster = namedtuple('RedisCluster', 'name nodes')
+
 # Public fixtures
 
 
@@ -179,6 +181,12 @@ def sentinel(start_sentinel, request, start_server):
     return start_sentinel('main', masterA, master_no_fail)
 
 
+@pytest.fixture(scope='session')
+def cluster(start_cluster):
+    """Starts redis cluster of 3 masters."""
+    return start_cluster('main')
+
+
 # Internal stuff #
 
 
@@ -256,12 +264,13 @@ def start_server(_proc, request, unused_port, server_bin):
             yield True
         raise RuntimeError("Redis startup timeout expired")
 
-    def maker(name, config_lines=None, *, slaveof=None):
+    def maker(name, config_lines=None, *, slaveof=None, port=None):
         assert slaveof is None or isinstance(slaveof, RedisServer), slaveof
         if name in servers:
             return servers[name]
 
-        port = unused_port()
+        if port is None:
+            port = unused_port()
         tcp_address = TCPAddress('localhost', port)
         if sys.platform == 'win32':
             unixsocket = None
@@ -423,6 +432,79 @@ def start_sentinel(_proc, request, unused_port, server_bin):
     return maker
 
 
+@pytest.fixture(scope='session')
+def start_cluster(start_server, unused_port):
+    """Starts Redis Cluster of master nodes.
+
+    Hash slots are split evenly between nodes.
+    """
+    clusters = {}
+
+    def timeout(t):
+        end = time.time() + t
+        while time.time() <= end:
+            yield True
+        raise RuntimeError("Redis cluster startup timeout expired")
+
+    def maker(name, nodes=3):
+        if name in clusters:
+            return clusters[name]
+        servers = []
+        for i in range(nodes):
+            port = unused_port()
+            while port + 10000 > 65535:
+                # cluster bus port is port + 10000
+                port = unused_port()
+            node_name = 'cluster-{}-{}'.format(name, i)
+            nodes_file = os.path.join(
+                tempfile.gettempdir(),
+                'aioredis-{}.{}.nodes.conf'.format(node_name, os.getpid()))
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(nodes_file)
+            atexit.register(_remove_file, nodes_file)
+            servers.append(start_server(node_name, [
+                'cluster-enabled yes',
+                'cluster-config-file {}'.format(nodes_file),
+                'cluster-node-timeout 5000',
+                ], port=port))
+        step = 16384 // nodes
+        for i, srv in enumerate(servers):
+            end = 16384 if i == nodes - 1 else (i + 1) * step
+            _execute(srv, 'CLUSTER', 'ADDSLOTS', *range(i * step, end))
+            if i:
+                _execute(servers[0], 'CLUSTER', 'MEET',
+                         '127.0.0.1', srv.tcp_address.port)
+        for srv in servers:
+            for _ in timeout(30):
+                info = _execute(srv, 'CLUSTER', 'INFO')
+                if b'cluster_state:ok' in info:
+                    break
+                time.sleep(.1)
+        cluster = RedisCluster(name, servers)
+        clusters.setdefault(name, cluster)
+        return cluster
+    return maker
+
+
+def _execute(server, *command):
+    # sync command for fixtures (no event loop yet)
+    reader = aioredis.parser.PyReader()
+    with socket.create_connection(server.tcp_address, timeout=5) as sock:
+        sock.sendall(aioredis.util.encode_command(*command))
+        res = reader.gets()
+        while res is False:
+            reader.feed(sock.recv(65536))
+            res = reader.gets()
+    if isinstance(res, aioredis.errors.ReplyError):
+        raise res
+    return res
+
+
+def _remove_file(path):
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(path)
+
+
 @pytest.fixture(scope='session')
 def ssl_proxy(_proc, request, unused_port):
     by_port = {}
@@ -1,18 +1,24 @@
 import pytest
 import asyncio
+import socket
 import sys
 from unittest import mock
 
 from unittest.mock import patch
 
 from aioredis.util import async_task
+from aioredis.stream import STREAM_BUFFER_LIMIT
+from aioredis.parser import PyReader
 from aioredis import (
     ConnectionClosedError,
     ProtocolError,
     RedisConnection,
+    RedisProtocolConnection,
     RedisError,
     ReplyError,
     Channel,
+    BackpressureError,
+    Redis,
     )
 
 
@@ -51,6 +57,30 @@ def test_connect_inject_connection_cls(
     assert isinstance(conn, MyConnection)
 
 
+@pytest.mark.run_loop
+def test_connect_inject_connection_cls_old_signature(
+        request,
+        create_connection,
+        loop,
+        server):
+
+    class OldConnection(RedisConnection):
+        def __init__(self, reader, writer, *, address, encoding=None,
+                     parser=None, loop=None):
+            super().__init__(reader, writer, address=address,
+                             encoding=encoding, parser=parser, loop=loop)
+
+    conn = yield from create_connection(
+        server.tcp_address, loop=loop, connection_cls=OldConnection)
+    assert isinstance(conn, OldConnection)
+    assert (yield from conn.execute('ping')) == b'PONG'
+
+    with pytest.raises(TypeError):
+        yield from create_connection(
+            server.tcp_address, loop=loop, connection_cls=OldConnection,
+            coalesce_writes=True)
+
+
 @pytest.mark.run_loop
 def test_connect_inject_connection_cls_invalid(
         request,
@@ -305,6 +335,96 @@ def test_decoding(create_connection, loop, server):
     assert res == 'значение'
 
 
+@pytest.mark.run_loop
+def test_decoding_in_parser(create_connection, loop, server):
+    conn = yield from create_connection(
+        server.tcp_address, encoding='utf-8', parser=PyReader, loop=loop)
+    assert conn._parser_decodes
+    yield from conn.execute('del', 'key:list')
+    yield from conn.execute('rpush', 'key:list', 'значение', b'\xff')
+
+    res = yield from asyncio.gather(
+        conn.execute('lrange', 'key:list', 0, 0),
+        conn.execute('lrange', 'key:list', 0, 0, encoding=None),
+        conn.execute('lindex', 'key:list', 0, encoding='utf-16'),
+        conn.execute('lindex', 'key:list', 0),
+        loop=loop)
+    assert res == [['значение'], ['значение'.encode('utf-8')],
+                   'значение'.encode('utf-8').decode('utf-16'), 'значение']
+
+    with pytest.raises(UnicodeDecodeError):
+        yield from conn.execute('lrange', 'key:list', 0, -1)
+    res = yield from conn.execute('lrange', 'key:list', 0, -1, encoding=None)
+    assert res == ['значение'.encode('utf-8'), b'\xff']
+    assert (yield from conn.execute('echo', 'still usable')) == 'still usable'
+
+    tr = conn.execute('multi')
+    fut1 = conn.execute('lindex', 'key:list', 0)
+    fut2 = conn.execute('llen', 'key:list')
+    res = yield from conn.execute('exec')
+    assert res == ['значение', 2]
+    assert (yield from tr) == 'OK'
+    assert (yield from fut1) == 'QUEUED'
+    assert (yield from fut2) == 'QUEUED'
+
+    sub = yield from create_connection(
+        server.tcp_address, encoding='utf-8', parser=PyReader, loop=loop)
+    ch, = yield from sub.execute_pubsub('subscribe', 'chan:decode')
+    assert ch == [b'subscribe', b'chan:decode', 1]
+    yield from conn.execute('publish', 'chan:decode', 'значение')
+    ch = sub.pubsub_channels['chan:decode']
+    assert (yield from ch.get()) == 'значение'.encode('utf-8')
+
+
+@pytest.mark.run_loop
+def test_execute_converter(create_connection, loop, server):
+    conn = yield from create_connection(
+        server.tcp_address, encoding='utf-8', loop=loop)
+    yield from conn.execute('set', 'key:conv', '1')
+
+    fut = conn.execute('get', 'key:conv', converter=int)
+    assert isinstance(fut, asyncio.Future)
+    assert (yield from fut) == 1
+    with pytest.raises(ValueError):
+        yield from conn.execute('echo', 'foo', converter=int)
+    assert (yield from conn.execute('echo', '2', converter=int)) == 2
+
+    tr = conn.execute('multi')
+    fut1 = conn.execute('get', 'key:conv', converter=int)
+    fut2 = conn.execute('echo', 'foo', converter=int)
+    res = yield from conn.execute('exec')
+    assert (yield from tr) == 'OK'
+    assert (yield from fut1) == 'QUEUED'
+    assert (yield from fut2) == 'QUEUED'
+    assert res[0] == 1
+    assert isinstance(res[1], ValueError)
+
+
+@pytest.mark.run_loop
+@pytest.mark.skipif(not sys.platform.startswith('linux'),
+                    reason="TCP_KEEPIDLE and TCP_USER_TIMEOUT are Linux only")
+def test_tcp_keepalive(create_connection, loop, server):
+    conn = yield from create_connection(
+        server.tcp_address, tcp_keepalive=60, tcp_user_timeout=5, loop=loop)
+    sock = conn._writer.transport.get_extra_info('socket')
+    assert sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE)
+    assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE) == 60
+    assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL) == 20
+    assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT) == 3
+    assert sock.getsockopt(socket.IPPROTO_TCP, 18) == 5000
+
+    conn = yield from create_connection(server.tcp_address, loop=loop)
+    sock = conn._writer.transport.get_extra_info('socket')
+    assert not sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE)
+
+    with pytest.raises(ValueError):
+        yield from create_connection(
+            server.tcp_address, tcp_keepalive=0, loop=loop)
+    with pytest.raises(ValueError):
+        yield from create_connection(
+            server.tcp_address, tcp_user_timeout=-1, loop=loop)
+
+
 @pytest.mark.run_loop
 def test_execute_exceptions(create_connection, loop, server):
     conn = yield from create_connection(
@@ -318,6 +438,39 @@ def test_execute_exceptions(create_connection, loop, server):
     assert len(conn._waiters) == 0
 
 
+@pytest.mark.run_loop
+def test_execute_timeout(create_connection, loop, server):
+    conn = yield from create_connection(
+        server.tcp_address, loop=loop)
+    with pytest.raises(ValueError):
+        conn.execute('PING', timeout=0)
+
+    with pytest.raises(asyncio.TimeoutError):
+        yield from conn.execute('BLPOP', 'list:not:exists', 1, timeout=.1)
+    # late reply is discarded, next replies are not mixed up
+    assert len(conn._waiters) == 1
+    assert (yield from conn.execute('ECHO', 'foo', timeout=5)) == b'foo'
+    assert len(conn._waiters) == 0
+    assert not conn.closed
+
+    # state is tracked for timed out commands too
+    blpop = conn.execute('BLPOP', 'list:not:exists', 1)
+    with pytest.raises(asyncio.TimeoutError):
+        yield from conn.execute('SELECT', 1, timeout=.1)
+    assert conn.db == 0
+    assert (yield from blpop) is None
+    assert (yield from conn.execute('PING')) == b'PONG'
+    assert conn.db == 1
+
+    # connection is broken while timed out reply is pending
+    with pytest.raises(asyncio.TimeoutError):
+        yield from conn.execute('BLPOP', 'list:not:exists', 1, timeout=.1)
+    with pytest.raises(ProtocolError):
+        conn._reader.feed_data(b'not good redis protocol response')
+        yield from conn.execute('PING')
+    assert len(conn._waiters) == 0
+
+
 @pytest.mark.run_loop
 def test_subscribe_unsubscribe(create_connection, loop, server):
     conn = yield from create_connection(
@@ -534,3 +687,570 @@ def test_connection_parser_argument(create_connection, server, loop):
         mock.call().gets(),
         mock.call().gets(),
     ]
+
+
+@pytest.mark.run_loop
+def test_coalesce_writes(create_connection, loop, server):
+    conn = yield from create_connection(
+        server.tcp_address, coalesce_writes=True, loop=loop)
+
+    transport = conn._writer.transport
+    with patch.object(transport, 'write', wraps=transport.write) as write:
+        futs = [conn.execute('echo', i) for i in range(10)]
+        assert len(conn._write_buffer) == 10
+        assert not write.called
+        res = yield from asyncio.gather(*futs, loop=loop)
+        assert res == [str(i).encode('utf-8') for i in range(10)]
+        assert write.call_count == 1
+    assert conn._write_buffer == []
+
+
+@pytest.mark.run_loop
+def test_large_buffer_args(create_connection, loop, server):
+    conn = yield from create_connection(server.tcp_address, loop=loop)
+    value = bytearray(b'x' * 1024 * 1024)
+
+    # large argument is passed to transport as is (not joined)
+    transport = conn._writer.transport
+    with patch.object(transport, 'write', wraps=transport.write) as write:
+        res = yield from conn.execute('set', 'key:large', value)
+        assert res == b'OK'
+        assert [len(args[0]) for args, _ in write.call_args_list] == [
+            len(b'*3\r\n$3\r\nSET\r\n$9\r\nkey:large\r\n$1048576\r\n'),
+            len(value), 2]
+        assert write.call_args_list[1][0][0] is value
+
+    with patch.object(transport, 'write', wraps=transport.write) as write:
+        with conn.cork():
+            fut1 = conn.execute('set', 'key:large', value)
+            fut2 = conn.execute('strlen', 'key:large')
+    assert write.call_count == 3
+    assert write.call_args_list[1][0][0] is value
+    assert (yield from asyncio.gather(fut1, fut2, loop=loop)) == [
+        b'OK', len(value)]
+
+    res = yield from conn.execute('set', 'key:view', memoryview(value)[1:])
+    assert res == b'OK'
+    res = yield from conn.execute('strlen', 'key:large')
+    assert res == 1024 * 1024
+    res = yield from conn.execute('get', 'key:view')
+    assert res == bytes(value[1:])
+
+
+@pytest.mark.run_loop
+def test_cork_flush(create_connection, loop, server):
+    conn = yield from create_connection(server.tcp_address, loop=loop)
+
+    with conn.cork():
+        assert conn.corked
+        fut1 = conn.execute('ping')
+        with conn.cork():
+            fut2 = conn.execute('echo', 'foo')
+        assert len(conn._write_buffer) == 2
+        yield from asyncio.sleep(0, loop=loop)
+        assert not fut1.done()
+    assert not conn.corked
+    assert conn._write_buffer == []
+    res = yield from asyncio.gather(fut1, fut2, loop=loop)
+    assert res == [b'PONG', b'foo']
+
+    with conn.cork():
+        fut = conn.execute('ping')
+        conn.flush()
+        assert conn._write_buffer == []
+        assert (yield from fut) == b'PONG'
+
+
+@pytest.mark.run_loop
+def test_corked_close(create_connection, loop, server):
+    conn = yield from create_connection(
+        server.tcp_address, coalesce_writes=True, loop=loop)
+    other = yield from create_connection(server.tcp_address, loop=loop)
+    yield from other.execute('del', 'key:corked')
+    fut = conn.execute('set', 'key:corked', 'value')
+    conn.close()
+    assert conn._write_buffer == []
+    with pytest.raises(asyncio.CancelledError):
+        yield from fut
+    yield from conn.wait_closed()
+    # buffered command is written before connection is closed
+    assert (yield from other.execute('get', 'key:corked')) == b'value'
+
+    conn = yield from create_connection(server.tcp_address, loop=loop)
+    with conn.cork():
+        fut = conn.execute('set', 'key:corked', 'other')
+        conn.close()
+    with pytest.raises(asyncio.CancelledError):
+        yield from fut
+    yield from conn.wait_closed()
+    assert (yield from other.execute('get', 'key:corked')) == b'other'
+
+
+@pytest.mark.run_loop
+def test_max_inflight(create_connection, loop, server):
+    conn = yield from create_connection(
+        server.tcp_address, max_inflight=2, loop=loop)
+    other = yield from create_connection(server.tcp_address, loop=loop)
+
+    fut1 = conn.execute('BLPOP', 'list:inflight', 0)
+    fut2 = conn.execute('ECHO', 'a')
+    assert conn.inflight == 2
+    # commands wait for capacity and are sent in order
+    fut3 = async_task(conn.execute('ECHO', 'b'), loop=loop)
+    fut4 = async_task(conn.execute('ECHO', 'c'), loop=loop)
+    yield from asyncio.sleep(.01, loop=loop)
+    assert conn.inflight == 2
+    assert not fut3.done()
+
+    yield from other.execute('RPUSH', 'list:inflight', 'x')
+    res = yield from asyncio.gather(fut1, fut2, fut3, fut4, loop=loop)
+    assert res == [[b'list:inflight', b'x'], b'a', b'b', b'c']
+    assert conn.inflight == 0
+
+    # waiting command is cancelled
+    fut1 = conn.execute('BLPOP', 'list:inflight', 0)
+    fut2 = conn.execute('ECHO', 'a')
+    fut3 = async_task(conn.execute('ECHO', 'b'), loop=loop)
+    fut4 = async_task(conn.execute('ECHO', 'c'), loop=loop)
+    yield from asyncio.sleep(.01, loop=loop)
+    fut3.cancel()
+    yield from other.execute('RPUSH', 'list:inflight', 'x')
+    assert (yield from fut4) == b'c'
+    assert fut3.cancelled()
+
+    # waiting command fails when connection is closed
+    fut1 = conn.execute('BLPOP', 'list:inflight', 0)
+    fut2 = conn.execute('ECHO', 'a')
+    fut3 = async_task(conn.execute('ECHO', 'b'), loop=loop)
+    yield from asyncio.sleep(.01, loop=loop)
+    conn.close()
+    with pytest.raises(ConnectionClosedError):
+        yield from fut3
+
+
+@pytest.mark.run_loop
+def test_max_inflight_order(create_connection, loop, server):
+    conn = yield from create_connection(
+        server.tcp_address, max_inflight=1, loop=loop)
+    yield from conn.execute('DEL', 'list:order')
+
+    fut1 = conn.execute('RPUSH', 'list:order', 1)
+    fut2 = conn.execute('RPUSH', 'list:order', 2)
+    assert isinstance(fut2, asyncio.Future)
+    yield from fut1
+    # fut2 is not awaited but is sent first
+    fut3 = conn.execute('RPUSH', 'list:order', 3)
+    assert (yield from asyncio.gather(fut3, fut2, loop=loop)) == [3, 2]
+    assert (yield from conn.execute('LRANGE', 'list:order', 0, -1)) == [
+        b'1', b'2', b'3']
+
+    # timed out waiting command is not sent
+    fut1 = conn.execute('BLPOP', 'list:order:empty', .1)
+    fut2 = conn.execute('RPUSH', 'list:order', 4, timeout=.01)
+    with pytest.raises(asyncio.TimeoutError):
+        yield from fut2
+    assert (yield from fut1) is None
+    assert (yield from conn.execute('LLEN', 'list:order')) == 3
+
+
+@pytest.mark.run_loop
+def test_max_inflight_pipeline(create_connection, loop, server):
+    conn = yield from create_connection(
+        server.tcp_address, max_inflight=1, loop=loop)
+    redis = Redis(conn)
+
+    pipe = redis.pipeline()
+    futs = [pipe.echo(str(i)) for i in range(5)]
+    assert (yield from pipe.execute()) == [
+        str(i).encode('utf-8') for i in range(5)]
+    assert [fut.result() for fut in futs] == [
+        str(i).encode('utf-8') for i in range(5)]
+
+    tr = redis.multi_exec()
+    tr.set('key:inflight', 'value')
+    fut = tr.get('key:inflight')
+    assert (yield from tr.execute()) == [True, b'value']
+    assert (yield from fut) == b'value'
+    assert conn.inflight == 0
+
+
+@pytest.mark.run_loop
+def test_max_inflight_raise(create_connection, loop, server):
+    conn = yield from create_connection(
+        server.tcp_address, max_inflight=1, backpressure='raise', loop=loop)
+
+    fut = conn.execute('ECHO', 'a')
+    with pytest.raises(BackpressureError):
+        conn.execute('ECHO', 'b')
+    assert (yield from fut) == b'a'
+    assert (yield from conn.execute('ECHO', 'b')) == b'b'
+
+
+@pytest.mark.parametrize('connection_cls', [
+    RedisConnection, RedisProtocolConnection,
+], ids=['stream_reader', 'protocol'])
+@pytest.mark.run_loop
+def test_write_buffer_limit(create_connection, loop, server, connection_cls):
+    conn = yield from create_connection(
+        server.tcp_address, write_buffer_limit=1024,
+        connection_cls=connection_cls, loop=loop)
+    assert conn.write_buffer_size == 0
+
+    value = b'x' * 4 * 1024 * 1024
+    futs = [conn.execute('SET', 'key:buffer', value)]
+    # transport can not send whole value at once
+    assert conn.write_buffer_size > 1024
+    futs.append(conn.execute('STRLEN', 'key:buffer'))
+    # command waits for transport buffer to drain
+    assert isinstance(futs[-1], asyncio.Future)
+    assert len(conn._blocked) == 1
+    res = yield from asyncio.gather(*futs, loop=loop)
+    assert res == [b'OK', len(value)]
+    assert conn.write_buffer_size == 0
+
+
+@pytest.mark.run_loop
+def test_write_buffer_limit_corked(create_connection, loop, server):
+    conn = yield from create_connection(
+        server.tcp_address, write_buffer_limit=1024, loop=loop)
+
+    value = b'x' * 2048
+    with conn.cork():
+        futs = [conn.execute('SET', 'key:buffer', value)]
+        assert conn.write_buffer_size > 1024
+        # corked bytes count towards limit
+        futs.append(conn.execute('STRLEN', 'key:buffer'))
+        assert len(conn._blocked) == 1
+        yield from asyncio.sleep(.01, loop=loop)
+        assert len(conn._blocked) == 1
+        assert conn.write_buffer_size == conn._write_buffer_nbytes
+    res = yield from asyncio.gather(*futs, loop=loop)
+    assert res == [b'OK', len(value)]
+    assert conn.write_buffer_size == 0
+
+    with conn.cork():
+        fut = conn.execute('PING')
+        assert conn.write_buffer_size == 14
+    assert (yield from fut) == b'PONG'
+
+
+@pytest.mark.run_loop
+def test_backpressure_args(create_connection, loop, server):
+    with pytest.raises(ValueError):
+        yield from create_connection(
+            server.tcp_address, max_inflight=0, loop=loop)
+    with pytest.raises(ValueError):
+        yield from create_connection(
+            server.tcp_address, write_buffer_limit=-1, loop=loop)
+    with pytest.raises(ValueError):
+        yield from create_connection(
+            server.tcp_address, backpressure='drop', loop=loop)
+
+
+@pytest.mark.run_loop
+def test_protocol_connection(create_connection, loop, server):
+    conn = yield from create_connection(
+        server.tcp_address, connection_cls=RedisProtocolConnection,
+        loop=loop)
+    assert isinstance(conn, RedisProtocolConnection)
+    assert str(conn) == '<RedisProtocolConnection [db:0]>'
+    assert conn.address[1] == server.tcp_address.port
+
+    res = yield from conn.execute('set', 'key:proto', 'value')
+    assert res == b'OK'
+    futs = [conn.execute('get', 'key:proto') for _ in range(100)]
+    res = yield from asyncio.gather(*futs, loop=loop)
+    assert res == [b'value'] * 100
+    yield from conn.select(1)
+    assert conn.db == 1
+
+    big = b'x' * 1024 * 1024
+    yield from conn.execute('set', 'key:proto', big)
+    res = yield from conn.execute('get', 'key:proto')
+    assert res == big
+
+
+@pytest.mark.run_loop
+@pytest.mark.skipif(sys.platform == 'win32',
+                    reason="No unixsocket on Windows")
+def test_protocol_connection_unixsocket(create_connection, loop, server):
+    conn = yield from create_connection(
+        server.unixsocket, connection_cls=RedisProtocolConnection,
+        loop=loop)
+    assert conn.address == server.unixsocket
+    assert (yield from conn.execute('ping')) == b'PONG'
+
+
+@pytest.mark.run_loop
+def test_protocol_connection_pubsub(create_connection, loop, server):
+    sub = yield from create_connection(
+        server.tcp_address, connection_cls=RedisProtocolConnection,
+        loop=loop)
+    pub = yield from create_connection(server.tcp_address, loop=loop)
+
+    res = yield from sub.execute_pubsub('subscribe', 'chan:proto')
+    assert res == [[b'subscribe', b'chan:proto', 1]]
+    ch = sub.pubsub_channels['chan:proto']
+    yield from pub.execute('publish', 'chan:proto', 'Hello')
+    assert (yield from ch.get()) == b'Hello'
+
+
+@pytest.mark.run_loop
+@pytest.redis_version(
+    5, 0, 0, reason='CLIENT ID is available since redis>=5.0.0')
+def test_protocol_connection_close(create_connection, loop, server):
+    conn = yield from create_connection(
+        server.tcp_address, connection_cls=RedisProtocolConnection,
+        loop=loop)
+    reader_task = conn._reader_task
+    conn.close()
+    assert conn.closed
+    yield from conn.wait_closed()
+    assert reader_task.done()
+    with pytest.raises(ConnectionClosedError):
+        conn.execute('ping')
+
+    conn = yield from create_connection(
+        server.tcp_address, connection_cls=RedisProtocolConnection,
+        loop=loop)
+    conn_id = yield from conn.execute('client', 'id')
+    fut = conn.execute('blpop', 'key:proto:empty', 0)
+    other = yield from create_connection(server.tcp_address, loop=loop)
+    yield from other.execute('client', 'kill', 'id', conn_id)
+    with pytest.raises(asyncio.CancelledError):
+        yield from fut
+    yield from conn.wait_closed()
+    assert conn.closed
+
+
+@pytest.mark.run_loop
+def test_protocol_connection_protocol_error(create_connection, loop, server):
+    conn = yield from create_connection(
+        server.tcp_address, connection_cls=RedisProtocolConnection,
+        loop=loop)
+    fut = conn.execute('ping')
+    conn._reader.data_received(b'not good redis protocol response')
+    with pytest.raises(ProtocolError):
+        yield from fut
+    assert conn.closed
+    assert len(conn._waiters) == 0
+
+
+@asyncio.coroutine
+def _read_stream(stream):
+    chunks = []
+    while True:
+        chunk = yield from stream.read()
+        if not chunk:
+            return chunks
+        chunks.append(chunk)
+
+
+@pytest.mark.parametrize('connection_cls', [
+    RedisConnection, RedisProtocolConnection,
+], ids=['stream_reader', 'protocol'])
+@pytest.mark.run_loop
+def test_execute_streaming(create_connection, loop, server, connection_cls):
+    conn = yield from create_connection(
+        server.tcp_address, connection_cls=connection_cls, loop=loop)
+    value = b'0123456789' * 300000
+    yield from conn.execute('set', 'key:stream', value)
+    yield from conn.execute('del', 'key:counter')
+
+    fut1 = conn.execute('incr', 'key:counter')
+    stream = yield from conn.execute_streaming('get', 'key:stream')
+    assert fut1.done()
+    assert stream.size == len(value)
+    fut2 = conn.execute('incr', 'key:counter')
+    assert not fut2.done()
+
+    chunks = yield from _read_stream(stream)
+    assert len(chunks) > 1
+    assert b''.join(chunks) == value
+    assert stream.at_eof()
+    assert conn._stream is None
+    assert (yield from fut1) == 1
+    assert (yield from fut2) == 2
+    assert (yield from stream.read()) == b''
+
+
+@pytest.mark.run_loop
+def test_execute_streaming_replies(create_connection, loop, server):
+    conn = yield from create_connection(server.tcp_address, loop=loop)
+    yield from conn.execute('del', 'key:stream', 'key:list')
+    yield from conn.execute('rpush', 'key:list', 1)
+
+    stream = yield from conn.execute_streaming('get', 'key:stream')
+    assert stream is None
+    with pytest.raises(ReplyError):
+        yield from conn.execute_streaming('get', 'key:list')
+    yield from conn.execute('set', 'key:stream', b'')
+    stream = yield from conn.execute_streaming('get', 'key:stream')
+    assert stream.size == 0
+    assert (yield from stream.read()) == b''
+
+    res = yield from conn.execute('echo', 'still usable')
+    assert res == b'still usable'
+
+    with pytest.raises(TypeError):
+        yield from conn.execute_streaming('get', None)
+    with pytest.raises(ValueError):
+        yield from conn.execute_streaming('subscribe', 'chan')
+
+
+@pytest.mark.run_loop
+def test_execute_streaming_invalid_reply(create_connection, loop, server):
+    conn = yield from create_connection(server.tcp_address, loop=loop)
+
+    with pytest.raises(ProtocolError):
+        yield from conn.execute_streaming('ping')
+    yield from conn.wait_closed()
+    assert conn.closed
+
+
+@pytest.mark.parametrize('connection_cls', [
+    RedisConnection, RedisProtocolConnection,
+], ids=['stream_reader', 'protocol'])
+@pytest.mark.run_loop
+def test_execute_streaming_backpressure(create_connection, loop, server,
+                                        connection_cls):
+    conn = yield from create_connection(
+        server.tcp_address, connection_cls=connection_cls, loop=loop)
+    value = b'x' * (STREAM_BUFFER_LIMIT * 8)
+    yield from conn.execute('set', 'key:stream', value)
+
+    stream = yield from conn.execute_streaming('get', 'key:stream')
+    yield from asyncio.sleep(.1, loop=loop)
+    assert stream._paused
+    assert stream._buffered < STREAM_BUFFER_LIMIT + 256 * 1024
+
+    chunks = yield from _read_stream(stream)
+    assert b''.join(chunks) == value
+
+
+@pytest.mark.run_loop
+def test_execute_streaming_close(create_connection, loop, server):
+    conn = yield from create_connection(server.tcp_address, loop=loop)
+    value = b'x' * (STREAM_BUFFER_LIMIT * 4)
+    yield from conn.execute('set', 'key:stream', value)
+
+    stream = yield from conn.execute_streaming('get', 'key:stream')
+    first = yield from stream.read()
+    assert first
+    fut = conn.execute('echo', 'next')
+    stream.close()
+    assert (yield from fut) == b'next'
+    assert (yield from stream.read()) == b''
+
+    # streams are executed one after another
+    stream1 = yield from conn.execute_streaming('get', 'key:stream')
+    task = async_task(conn.execute_streaming('get', 'key:stream'), loop=loop)
+    yield from asyncio.sleep(.01, loop=loop)
+    assert not task.done()
+    chunks = yield from _read_stream(stream1)
+    assert len(b''.join(chunks)) == len(value)
+    stream2 = yield from task
+    assert stream2 is not stream1
+    chunks = yield from _read_stream(stream2)
+    assert len(b''.join(chunks)) == len(value)
+
+
+@pytest.mark.run_loop
+def test_execute_streaming_conn_closed(create_connection, loop, server):
+    conn = yield from create_connection(server.tcp_address, loop=loop)
+    value = b'x' * (STREAM_BUFFER_LIMIT * 4)
+    yield from conn.execute('set', 'key:stream', value)
+
+    stream = yield from conn.execute_streaming('get', 'key:stream')
+    assert (yield from stream.read())
+    conn.close()
+    with pytest.raises(ConnectionClosedError):
+        yield from _read_stream(stream)
+    with pytest.raises(ConnectionClosedError):
+        yield from conn.execute_streaming('get', 'key:stream')
+
+
+@pytest.mark.run_loop
+@pytest.redis_version(6, 0, 0, reason="RESP3 is available since redis 6.0")
+def test_resp3_connection(create_connection, loop, server):
+    conn = yield from create_connection(
+        server.tcp_address, protocol=3, db=1, loop=loop)
+    assert conn.protocol == 3
+    assert conn.db == 1
+    assert isinstance(conn._parser, PyReader)
+
+    yield from conn.execute('del', 'key:hash', 'key:set')
+    yield from conn.execute('hset', 'key:hash', 'field', 'value')
+    res = yield from conn.execute('hgetall', 'key:hash')
+    assert res == {b'field': b'value'}
+    res = yield from conn.execute('hgetall', 'key:hash', encoding='utf-8')
+    assert res == {'field': 'value'}
+    yield from conn.execute('set', 'key:float', 1)
+    res = yield from conn.execute('incrbyfloat', 'key:float', 0.5)
+    assert res == b'1.5'
+    res = yield from conn.execute('get', 'key:none')
+    assert res is None
+
+    with pytest.raises(ValueError):
+        yield from create_connection(
+            server.tcp_address, protocol=4, loop=loop)
+
+
+@pytest.mark.run_loop
+@pytest.redis_version(6, 0, 0, reason="RESP3 is available since redis 6.0")
+def test_resp3_execute_streaming_push(create_connection, loop, server):
+    conn = yield from create_connection(
+        server.tcp_address, protocol=3, loop=loop)
+    value = b'0123456789' * 300000
+    yield from conn.execute('set', 'key:stream', value)
+    pushed = []
+    conn._process_push = pushed.append
+
+    task = async_task(conn.execute_streaming('get', 'key:stream'), loop=loop)
+    yield from asyncio.sleep(0, loop=loop)
+    assert conn._stream is not None
+    # push message (split in parts) received before reply
+    conn._feed_data(b'>2\r\n$10\r\ninval')
+    conn._feed_data(b'idate\r\n*1\r\n$10\r\nkey:stream\r\n')
+    assert pushed == [[b'invalidate', [b'key:stream']]]
+    stream = yield from task
+    assert b''.join((yield from _read_stream(stream))) == value
+    assert not conn.closed
+    assert (yield from conn.execute('echo', 'still usable')) == b'still usable'
+
+
+@pytest.mark.run_loop
+@pytest.redis_version(6, 0, 0, reason="RESP3 is available since redis 6.0")
+def test_resp3_pubsub(create_connection, loop, server):
+    sub = yield from create_connection(
+        server.tcp_address, protocol=3, loop=loop)
+    pub = yield from create_connection(server.tcp_address, loop=loop)
+
+    res = yield from sub.execute_pubsub('subscribe', 'chan:1')
+    assert res == [[b'subscribe', b'chan:1', 1]]
+    assert sub.in_pubsub == 1
+    ch = sub.pubsub_channels['chan:1']
+
+    # regular commands keep working on the same connection
+    fut = sub.execute('echo', 'hello')
+    yield from pub.execute('publish', 'chan:1', 'message 1')
+    res = yield from asyncio.gather(
+        fut, sub.execute('incr', 'key:resp3'),
+        sub.execute_pubsub('psubscribe', 'chan:*'), loop=loop)
+    assert res[0] == b'hello'
+    assert res[2] == [[b'psubscribe', b'chan:*', 2]]
+    assert sub.in_pubsub == 2
+    assert (yield from ch.get()) == b'message 1'
+
+    yield from pub.execute('publish', 'chan:1', 'message 2')
+    assert (yield from ch.get()) == b'message 2'
+    pch = sub.pubsub_patterns['chan:*']
+    assert (yield from pch.get()) == (b'chan:1', b'message 2')
+
+    res = yield from sub.execute_pubsub('unsubscribe', 'chan:1')
+    assert res == [[b'unsubscribe', b'chan:1', 1]]
+    res = yield from sub.execute_pubsub('punsubscribe', 'chan:*')
+    assert res == [[b'punsubscribe', b'chan:*', 0]]
+    assert not sub.in_pubsub
+    assert not ch.is_active
+    assert (yield from sub.execute('echo', 'bye')) == b'bye'
@@ -1,6 +1,13 @@
+import array
 import pytest
 
-from aioredis.util import encode_command
+from aioredis.util import (
+    encode_command,
+    encode_command_buffers,
+    ZERO_COPY_SIZE,
+    _command_prefixes,
+    _COMMAND_PREFIXES_SIZE,
+    )
 
 
 def test_encode_bytes():
@@ -53,3 +60,105 @@ def test_encode_errors():
         encode_command(list())
     with pytest.raises(TypeError):
         encode_command(None)
+
+
+def test_encode_memoryview():
+    res = encode_command(memoryview(b'Hello'))
+    assert res == b'*1\r\n$5\r\nHello\r\n'
+
+    res = encode_command(memoryview(b'Hello world')[6:])
+    assert res == b'*1\r\n$5\r\nworld\r\n'
+
+    res = encode_command(memoryview(array.array('H', [1, 2])))
+    assert res == (b'*1\r\n$4\r\n' +
+                   array.array('H', [1, 2]).tobytes() + b'\r\n')
+
+    # strided (non-contiguous) view
+    res = encode_command(memoryview(b'Hello world')[::2])
+    assert res == b'*1\r\n$6\r\nHlowrd\r\n'
+
+
+def test_encode_buffers_strided_memoryview():
+    data = bytes(range(256)) * (ZERO_COPY_SIZE // 128)
+    view = memoryview(data)[::2]
+    assert not view.contiguous
+    res = encode_command_buffers(b'SET', b'key', view)
+    assert b''.join(res) == encode_command(b'SET', b'key', data[::2])
+
+
+def test_encode_buffers():
+    res = encode_command_buffers(b'SET', 'key', 1)
+    assert res == [b'*3\r\n$3\r\nSET\r\n$3\r\nkey\r\n$1\r\n1\r\n']
+
+    assert encode_command_buffers() == [b'*0\r\n']
+
+
+@pytest.mark.parametrize('value', [
+    b'x' * ZERO_COPY_SIZE,
+    bytearray(b'x' * ZERO_COPY_SIZE),
+    memoryview(b'x' * ZERO_COPY_SIZE),
+], ids=['bytes', 'bytearray', 'memoryview'])
+def test_encode_buffers_zero_copy(value):
+    res = encode_command_buffers(b'SET', b'key', value, b'EX', 10)
+    assert len(res) == 3
+    assert res[1] is value or res[1].obj is value.obj
+    assert b''.join(res) == encode_command(b'SET', b'key', value, b'EX', 10)
+
+    res = encode_command_buffers(b'MSET', b'k1', value, b'k2', value)
+    assert len(res) == 5
+    assert b''.join(res) == encode_command(b'MSET', b'k1', value,
+                                           b'k2', value)
+
+
+def test_encode_buffers_errors():
+    with pytest.raises(TypeError):
+        encode_command_buffers(dict())
+    with pytest.raises(TypeError):
+        encode_command_buffers(None)
+
+
+def test_encode_command_prefix_cache():
+    _command_prefixes.clear()
+    assert encode_command('GET', 'key') == b'*2\r\n$3\r\nGET\r\n$3\r\nkey\r\n'
+    assert _command_prefixes == {'GET': b'$3\r\nGET\r\n'}
+    assert encode_command('GET', 'key') == b'*2\r\n$3\r\nGET\r\n$3\r\nkey\r\n'
+    assert encode_command(b'GET', b'k') == b'*2\r\n$3\r\nGET\r\n$1\r\nk\r\n'
+    assert encode_command_buffers('GET') == [b'*1\r\n$3\r\nGET\r\n']
+    assert len(_command_prefixes) == 2
+
+    # variable arity commands use single entry
+    for i in range(1, _COMMAND_PREFIXES_SIZE + 10):
+        assert encode_command('MGET', *['k'] * i) == (
+            '*{}\r\n$4\r\nMGET\r\n'.format(i + 1).encode('utf-8') +
+            b'$1\r\nk\r\n' * i)
+    assert len(_command_prefixes) == 3
+
+    # numbers are never cached (1 == 1.0)
+    assert encode_command(1, 2) == b'*2\r\n$1\r\n1\r\n$1\r\n2\r\n'
+    assert encode_command(1.0, 2) == b'*2\r\n$3\r\n1.0\r\n$1\r\n2\r\n'
+    assert encode_command(bytearray(b'GET'), 'k') == (
+        b'*2\r\n$3\r\nGET\r\n$1\r\nk\r\n')
+    assert len(_command_prefixes) == 3
+    _command_prefixes.clear()
+
+
+def test_encode_command_prefix_cache_size():
+    _command_prefixes.clear()
+    for i in range(_COMMAND_PREFIXES_SIZE + 10):
+        encode_command('CMD{}'.format(i))
+    assert len(_command_prefixes) == _COMMAND_PREFIXES_SIZE
+    res = encode_command('CMD{}'.format(_COMMAND_PREFIXES_SIZE + 5))
+    assert res == ('*1\r\n$7\r\nCMD{}\r\n'.format(_COMMAND_PREFIXES_SIZE + 5)
+                   .encode('utf-8'))
+    _command_prefixes.clear()
+
+
+@pytest.mark.parametrize('size', [0, 1, 1023, 1024, 100000])
+def test_encode_lengths(size):
+    res = encode_command(b'x' * size)
+    header = '*1\r\n${}\r\n'.format(size).encode('utf-8')
+    assert res == header + b'x' * size + b'\r\n'
+
+    res = encode_command(*([b'x'] * size)) if size else encode_command()
+    header = '*{}\r\n'.format(size).encode('utf-8')
+    assert res == header + b'$1\r\nx\r\n' * size
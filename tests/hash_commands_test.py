@@ -392,6 +392,24 @@ def test_hscan(redis):
         yield from redis.hscan(None)
 
 
+@pytest.mark.run_loop
+@pytest.redis_version(6, 0, 0, reason="RESP3 is available since redis 6.0")
+def test_hgetall_resp3(create_redis, loop, server):
+    redis = yield from create_redis(
+        server.tcp_address, protocol=3, encoding='utf-8', loop=loop)
+    yield from redis.delete('key:hgetall')
+    yield from redis.hmset('key:hgetall', 'foo', 'bar', 'baz', 'bad')
+
+    res = yield from redis.hgetall('key:hgetall')
+    assert res == {'foo': 'bar', 'baz': 'bad'}
+    tr = redis.multi_exec()
+    tr.hgetall('key:hgetall')
+    res = yield from tr.execute()
+    assert res == [{'foo': 'bar', 'baz': 'bad'}]
+    res = yield from redis.config_get('maxmemory')
+    assert res == {'maxmemory': '0'}
+
+
 @pytest.mark.run_loop
 def test_hgetall_enc(create_redis, loop, server):
     redis = yield from create_redis(
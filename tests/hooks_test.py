@@ -0,0 +1,184 @@
+import asyncio
+import pytest
+
+from aioredis import ReplyError, ConnectionClosedError
+from aioredis.hooks import CommandHook
+from aioredis.parser import PyReader
+
+
+class RecordingHook(CommandHook):
+
+    def __init__(self):
+        self.events = []
+        self.received = 0
+        self.reply_sizes = []
+
+    def on_send(self, conn, command, nargs, nbytes, timestamp):
+        self.events.append(('send', command, nargs, nbytes))
+        return timestamp
+
+    def on_reply(self, conn, command, context, timestamp, nbytes):
+        assert timestamp >= context
+        self.events.append(('reply', command))
+        self.reply_sizes.append(nbytes)
+
+    def on_error(self, conn, command, error, context, timestamp):
+        assert timestamp >= context
+        self.events.append(('error', command, type(error)))
+
+    def on_receive(self, conn, nbytes, timestamp):
+        self.received += nbytes
+
+
+@pytest.mark.run_loop
+def test_connection_hooks(create_connection, loop, server):
+    hook = RecordingHook()
+    conn = yield from create_connection(
+        server.tcp_address, hooks=[hook], loop=loop)
+    assert conn.hooks == (hook,)
+
+    yield from conn.execute('SET', 'key:hooks', 'value')
+    yield from conn.execute('GET', 'key:hooks')
+    with pytest.raises(ReplyError):
+        yield from conn.execute('INCR', 'key:hooks')
+    assert hook.events == [
+        ('send', 'SET', 2, 39),
+        ('reply', 'SET'),
+        ('send', 'GET', 1, 28),
+        ('reply', 'GET'),
+        ('send', 'INCR', 1, 29),
+        ('error', 'INCR', ReplyError),
+        ]
+    # +OK\r\n $5\r\nvalue\r\n -ERR ...\r\n
+    assert hook.received > 5 + 11
+
+    del hook.events[:]
+    yield from conn.execute_pubsub('subscribe', 'chan:1', 'chan:2')
+    assert hook.events == [
+        ('send', 'SUBSCRIBE', 2, 43),
+        ('send', 'SUBSCRIBE', 2, 0),
+        ('reply', 'SUBSCRIBE'),
+        ('reply', 'SUBSCRIBE'),
+        ]
+
+
+@pytest.mark.run_loop
+def test_hooks_reply_size(create_connection, loop, server):
+    hook = RecordingHook()
+    conn = yield from create_connection(
+        server.tcp_address, hooks=[hook], parser=PyReader, loop=loop)
+
+    yield from conn.execute('SET', 'key:hooks', 'value')
+    yield from conn.execute('GET', 'key:hooks')
+    yield from conn.execute('DEL', 'key:list')
+    yield from conn.execute('RPUSH', 'key:list', 'a', 'bc')
+    fut1 = conn.execute('LRANGE', 'key:list', 0, -1)
+    fut2 = conn.execute('ECHO', 'foo')
+    yield from asyncio.gather(fut1, fut2, loop=loop)
+    # +OK\r\n / $5\r\nvalue\r\n / :0\r\n / :2\r\n /
+    # *2\r\n$1\r\na\r\n$2\r\nbc\r\n / $3\r\nfoo\r\n
+    assert hook.reply_sizes == [5, 11, 4, 4, 19, 9]
+
+
+@pytest.mark.run_loop
+def test_hooks_streaming(create_connection, loop, server):
+    hook = RecordingHook()
+    conn = yield from create_connection(
+        server.tcp_address, hooks=[hook], loop=loop)
+    yield from conn.execute('SET', 'key:stream', b'0123456789' * 1000)
+    yield from conn.execute('DEL', 'key:list')
+    yield from conn.execute('RPUSH', 'key:list', 1)
+    del hook.events[:]
+
+    stream = yield from conn.execute_streaming('GET', 'key:stream')
+    assert hook.events[0] == ('send', 'GET', 1, 30)
+    yield from stream.read()
+    assert hook.events[-1] == ('reply', 'GET')
+    # $10000\r\n...\r\n
+    assert hook.reply_sizes[-1] == 10010
+
+    with pytest.raises(ReplyError):
+        yield from conn.execute_streaming('GET', 'key:list')
+    assert hook.events[-1] == ('error', 'GET', ReplyError)
+
+
+@pytest.mark.run_loop
+def test_hooks_close(create_connection, loop, server):
+    hook = RecordingHook()
+    conn = yield from create_connection(
+        server.tcp_address, hooks=[hook], loop=loop)
+
+    fut = conn.execute('BLPOP', 'list:hooks', 0)
+    conn.close()
+    yield from conn.wait_closed()
+    assert fut.cancelled()
+    assert hook.events == [
+        ('send', 'BLPOP', 2, 39),
+        ('error', 'BLPOP', ConnectionClosedError),
+        ]
+
+
+@pytest.mark.run_loop
+def test_add_remove_hook(create_connection, loop, server):
+    conn = yield from create_connection(server.tcp_address, loop=loop)
+    hook = RecordingHook()
+
+    fut = conn.execute('PING')
+    conn.add_hook(hook)
+    yield from conn.execute('ECHO', 'foo')
+    assert (yield from fut) == b'PONG'
+    assert hook.events == [('send', 'ECHO', 1, 23), ('reply', 'ECHO')]
+
+    # hook is still called for commands sent before it was removed
+    fut = conn.execute('PING')
+    conn.remove_hook(hook)
+    assert conn.hooks == ()
+    yield from fut
+    yield from conn.execute('PING')
+    assert hook.events[2:] == [('send', 'PING', 0, 14)]
+
+    with pytest.raises(ValueError):
+        conn.remove_hook(hook)
+
+
+@pytest.mark.run_loop
+def test_failing_hook(create_connection, loop, server):
+
+    class FailingHook(CommandHook):
+        def on_send(self, *args):
+            raise RuntimeError("fail")
+
+        def on_reply(self, *args):
+            raise RuntimeError("fail")
+
+    hook = RecordingHook()
+    conn = yield from create_connection(
+        server.tcp_address, hooks=[FailingHook(), hook], loop=loop)
+    assert (yield from conn.execute('ECHO', 'foo')) == b'foo'
+    assert hook.events == [('send', 'ECHO', 1, 23), ('reply', 'ECHO')]
+
+
+@pytest.mark.run_loop
+def test_pool_hooks(create_pool, loop, server):
+    hook = RecordingHook()
+    pool = yield from create_pool(
+        server.tcp_address, minsize=2, hooks=[hook], loop=loop)
+    assert pool.hooks == (hook,)
+
+    yield from asyncio.gather(
+        *[pool.execute('PING') for _ in range(4)], loop=loop)
+    assert hook.events.count(('reply', 'PING')) == 4
+
+    other = RecordingHook()
+    pool.add_hook(other)
+    assert pool.hooks == (hook, other)
+    with (yield from pool) as conn:
+        assert conn.hooks == (hook, other)
+        yield from conn.execute('PING')
+    assert other.events == [('send', 'PING', 0, 14), ('reply', 'PING')]
+
+    pool.remove_hook(hook)
+    with (yield from pool) as conn:
+        assert conn.hooks == (other,)
+    with pytest.raises(ValueError):
+        pool.remove_hook(hook)
@@ -0,0 +1,179 @@
+import asyncio
+import pytest
+
+from aioredis import ReplyError
+from aioredis.metrics import Histogram, Metrics
+
+
+def test_histogram():
+    hist = Histogram([1, 2, 5])
+    assert hist.buckets == (1, 2, 5)
+    for val in (0, 1, 1.5, 3, 10, 20):
+        hist.observe(val)
+    assert hist.count == 6
+    assert hist.sum == 35.5
+    assert hist.snapshot() == {
+        'buckets': {1: 2, 2: 3, 5: 4, float('inf'): 6},
+        'count': 6,
+        'sum': 35.5,
+        }
+
+    other = Histogram([1, 2, 5])
+    other.observe(4)
+    hist.update(other)
+    assert hist.snapshot()['buckets'][5] == 5
+    assert hist.count == 7
+
+    with pytest.raises(ValueError):
+        hist.update(Histogram([1, 2]))
+    with pytest.raises(ValueError):
+        Histogram([])
+    with pytest.raises(ValueError):
+        Histogram([2, 1])
+    with pytest.raises(ValueError):
+        Metrics(latency_buckets=[1, 1])
+
+
+def test_histogram_quantile():
+    hist = Histogram([1, 2, 5])
+    assert hist.quantile(.5) is None
+    for val in (0, 1, 1.5, 3, 10):
+        hist.observe(val)
+    assert hist.quantile(0) == 1
+    assert hist.quantile(.4) == 1
+    assert hist.quantile(.5) == 2
+    assert hist.quantile(.8) == 5
+    assert hist.quantile(.99) == float('inf')
+    with pytest.raises(ValueError):
+        hist.quantile(2)
+
+    prev = Histogram([1, 2, 5])
+    prev.update(hist)
+    assert hist.quantile(.5, since=prev) is None
+    hist.observe(1.5)
+    assert hist.quantile(.99, since=prev) == 2
+    # reset histogram is considered as a whole
+    assert Histogram([1, 2, 5]).quantile(.5, since=prev) is None
+    with pytest.raises(ValueError):
+        hist.quantile(.5, since=Histogram([1, 2]))
+
+
+@pytest.mark.run_loop
+def test_connection_metrics(create_connection, loop, server):
+    metrics = Metrics()
+    conn = yield from create_connection(
+        server.tcp_address, metrics=metrics, loop=loop)
+    assert conn.metrics is metrics
+
+    yield from conn.execute('SET', 'key', 'value')
+    res = yield from asyncio.gather(
+        *[conn.execute(b'GET', 'key') for _ in range(10)], loop=loop)
+    assert res == [b'value'] * 10
+    assert (yield from conn.execute('GET', 'key')) == b'value'
+    with pytest.raises(ReplyError):
+        yield from conn.execute('INCR', 'key')
+
+    snap = metrics.snapshot()
+    assert set(snap['commands']) == {'SET', 'GET', 'INCR'}
+    get = snap['commands']['GET']
+    assert get['latency']['count'] == 11
+    assert get['latency']['buckets'][float('inf')] == 11
+    assert get['latency']['sum'] > 0
+    assert get['errors'] == 0
+    assert snap['commands']['INCR']['errors'] == 1
+    # *3 $3 SET $3 key $5 value / *2 $3 GET $3 key / *2 $4 INCR $3 key
+    assert snap['bytes_sent'] == 33 + 22 * 11 + 23
+    assert snap['bytes_received'] > 0
+    assert snap['inflight'] == 0
+    assert snap['inflight_depth']['count'] == 13
+    assert snap['inflight_depth']['buckets'][8] == 11
+    assert snap['inflight_depth']['buckets'][16] == 13
+    latency = metrics.latency()
+    assert latency.count == 13
+    assert latency.quantile(1) < float('inf')
+
+    metrics.reset()
+    snap = metrics.snapshot()
+    assert snap['commands'] == {}
+    assert snap['bytes_sent'] == 0
+
+
+@pytest.mark.run_loop
+def test_connection_metrics_close(create_connection, loop, server):
+    metrics = Metrics()
+    conn = yield from create_connection(
+        server.tcp_address, metrics=metrics, loop=loop)
+
+    fut = conn.execute('BLPOP', 'list:metrics', 0)
+    assert metrics.inflight == 1
+    conn.close()
+    yield from conn.wait_closed()
+    assert fut.cancelled()
+    assert metrics.inflight == 0
+    blpop = metrics.snapshot()['commands']['BLPOP']
+    assert blpop['errors'] == 1
+    assert blpop['latency']['count'] == 0
+
+
+@pytest.mark.run_loop
+def test_connection_metrics_connection_error(create_connection, loop,
+                                             server):
+    metrics = Metrics()
+    conn = yield from create_connection(
+        server.tcp_address, metrics=metrics, loop=loop)
+
+    fut = conn.execute('BLPOP', 'list:metrics', 0)
+    conn._do_close(ConnectionResetError("Connection reset"))
+    with pytest.raises(ConnectionResetError):
+        yield from fut
+    assert metrics.inflight == 0
+    blpop = metrics.snapshot()['commands']['BLPOP']
+    assert blpop['errors'] == 1
+    assert blpop['latency']['count'] == 0
+
+
+@pytest.mark.run_loop
+def test_connection_metrics_timeout(create_connection, loop, server):
+    metrics = Metrics()
+    conn = yield from create_connection(
+        server.tcp_address, metrics=metrics, loop=loop)
+
+    with pytest.raises(asyncio.TimeoutError):
+        yield from conn.execute('BLPOP', 'list:metrics', .1, timeout=.01)
+    # wait for late reply
+    assert (yield from conn.execute('PING')) == b'PONG'
+    snap = metrics.snapshot()
+    assert snap['commands']['BLPOP']['errors'] == 1
+    assert snap['commands']['BLPOP']['latency']['count'] == 1
+    assert snap['commands']['PING']['errors'] == 0
+    assert snap['inflight'] == 0
+
+
+@pytest.mark.run_loop
+def test_pubsub_metrics(create_connection, loop, server):
+    metrics = Metrics()
+    conn = yield from create_connection(
+        server.tcp_address, metrics=metrics, loop=loop)
+
+    yield from conn.execute_pubsub('subscribe', 'chan:1', 'chan:2')
+    yield from conn.execute_pubsub('unsubscribe', 'chan:1')
+    snap = metrics.snapshot()
+    assert snap['commands']['SUBSCRIBE']['latency']['count'] == 2
+    assert snap['commands']['UNSUBSCRIBE']['latency']['count'] == 1
+    assert snap['inflight'] == 0
+
+
+@pytest.mark.run_loop
+def test_pool_metrics(create_redis, loop, server):
+    metrics = Metrics()
+    redis = yield from create_redis(
+        server.tcp_address, metrics=metrics, loop=loop)
+    assert redis.connection.metrics is metrics
+
+    yield from asyncio.gather(
+        *[redis.incr('counter:metrics') for _ in range(10)], loop=loop)
+    yield from redis.delete('counter:metrics')
+    snap = metrics.snapshot()
+    assert snap['commands']['INCR']['latency']['count'] == 10
+    assert snap['commands']['DEL']['latency']['count'] == 1
+    assert snap['inflight'] == 0
@@ -4,14 +4,23 @@ import async_timeout
 
 from unittest.mock import patch
 
+import aioredis
 from aioredis import (
     RedisPool,
     ReplyError,
     PoolClosedError,
     ConnectionClosedError,
-    ConnectionsPool
+    ConnectionsPool,
+    RedisProtocolConnection,
+    BackpressureError,
+    )
+from aioredis.metrics import Metrics
+from aioredis.util import async_task, create_future
+from aioredis.selectors import (
+    connection_load,
+    least_loaded,
+    power_of_two,
     )
-from aioredis.util import async_task
 
 
 def _assert_defaults(pool):
@@ -202,16 +211,53 @@ def test_release_pending(create_pool, loop, server):
 
     with pytest.logs('aioredis', 'WARNING') as cm:
         with (yield from pool) as conn:
-            try:
-                yield from asyncio.wait_for(
-                    conn.execute(
-                        b'blpop',
-                        b'somekey:not:exists',
-                        b'0'),
-                    0.1,
-                    loop=loop)
-            except asyncio.TimeoutError:
-                pass
+            fut = conn.execute(b'blpop', b'somekey:not:exists', b'0')
+    assert pool.size == 0
+    assert pool.freesize == 0
+    assert cm.output == [
+        'WARNING:aioredis:Connection <RedisConnection [db:0]>'
+        ' has pending commands, closing it.'
+    ]
+    assert fut.cancelled()
+
+
+@pytest.mark.run_loop
+def test_release_timed_out(create_pool, loop, server):
+    pool = yield from create_pool(
+        server.tcp_address,
+        minsize=1, maxsize=1, loop=loop)
+
+    with (yield from pool) as conn:
+        with pytest.raises(asyncio.TimeoutError):
+            yield from asyncio.wait_for(
+                conn.execute(b'blpop', b'somekey:not:exists', b'1'),
+                0.1, loop=loop)
+        with pytest.raises(asyncio.TimeoutError):
+            yield from conn.execute(b'blpop', b'somekey:not:exists', b'1',
+                                    timeout=0.1)
+    # connection is reused once timed out replies are received
+    assert pool.size == 1
+    assert pool.freesize == 0
+    with (yield from pool) as conn2:
+        assert conn2 is conn
+        assert (yield from conn2.execute('ping')) == b'PONG'
+    assert pool.freesize == 1
+
+
+@pytest.mark.run_loop
+def test_release_timed_out_not_drained(create_pool, loop, server):
+    pool = yield from create_pool(
+        server.tcp_address,
+        minsize=1, loop=loop)
+
+    with patch('aioredis.pool.DRAIN_TIMEOUT', 0.1):
+        with pytest.logs('aioredis', 'WARNING') as cm:
+            with (yield from pool) as conn:
+                with pytest.raises(asyncio.TimeoutError):
+                    yield from conn.execute(
+                        b'blpop', b'somekey:not:exists', b'0', timeout=0.1)
+            assert pool.size == 1
+            yield from asyncio.sleep(0.2, loop=loop)
     assert pool.size == 0
     assert pool.freesize == 0
     assert cm.output == [
@@ -220,6 +266,29 @@ def test_release_pending(create_pool, loop, server):
     ]
 
 
+@pytest.mark.run_loop
+def test_pool_max_inflight(create_pool, create_connection, loop, server):
+    pool = yield from create_pool(
+        server.tcp_address, minsize=2, max_inflight=1,
+        backpressure='raise', loop=loop)
+    other = yield from create_connection(server.tcp_address, loop=loop)
+    assert pool.inflight == 0
+    assert pool.write_buffer_size == 0
+
+    fut1 = pool.execute('BLPOP', 'list:pool', 0)
+    # saturated connection is skipped
+    fut2 = pool.execute('ECHO', 'a')
+    assert pool.inflight == 2
+    with pytest.raises(BackpressureError):
+        pool.execute('ECHO', 'b')
+    assert (yield from fut2) == b'a'
+    assert pool.inflight == 1
+
+    yield from other.execute('RPUSH', 'list:pool', 'x')
+    assert (yield from fut1) == [b'list:pool', b'x']
+    assert pool.inflight == 0
+
+
 @pytest.mark.run_loop
 def test_release_bad_connection(create_pool, create_redis, loop, server):
     pool = yield from create_pool(
@@ -521,3 +590,479 @@ def test_pool_get_connection_with_pipelining(create_pool, server, loop):
     assert res == [[b"subscribe", b"channel:2", 2]]
     res = yield from fut5
     assert res == b'next'
+
+
+@pytest.mark.run_loop
+def test_pool_protocol_connection_cls(create_pool, loop, server):
+    pool = yield from create_pool(
+        server.tcp_address, minsize=2,
+        connection_cls=RedisProtocolConnection,
+        loop=loop)
+    res = yield from asyncio.gather(*[pool.execute('echo', i)
+                                      for i in range(10)], loop=loop)
+    assert res == [str(i).encode('utf-8') for i in range(10)]
+    with (yield from pool) as conn:
+        assert isinstance(conn, RedisProtocolConnection)
+
+
+@pytest.mark.run_loop
+def test_pool_execute_streaming(create_pool, loop, server):
+    pool = yield from create_pool(
+        server.tcp_address, minsize=1, maxsize=2, loop=loop)
+    value = b'x' * 1024 * 1024
+    yield from pool.execute('set', 'key:stream', value)
+
+    stream = yield from pool.execute_streaming('get', 'key:stream')
+    assert pool.size == 1
+    assert pool.freesize == 0
+    res = yield from pool.execute('echo', 'value')
+    assert res == b'value'
+    assert pool.size == 2
+
+    chunks = []
+    chunk = yield from stream.read()
+    while chunk:
+        chunks.append(chunk)
+        chunk = yield from stream.read()
+    assert b''.join(chunks) == value
+    yield from asyncio.sleep(0, loop=loop)
+    assert pool.freesize == 2
+
+    stream = yield from pool.execute_streaming('get', 'key:none')
+    assert stream is None
+    assert pool.freesize == 2
+
+    stream = yield from pool.execute_streaming('get', 'key:stream')
+    stream.close()
+    yield from asyncio.sleep(.01, loop=loop)
+    assert pool.freesize == 2
+    assert (yield from pool.execute('strlen', 'key:stream')) == len(value)
+
+
+@pytest.mark.run_loop
+@pytest.redis_version(6, 0, 0, reason="RESP3 is available since redis 6.0")
+def test_pool_resp3_shared_pubsub(create_pool, loop, server):
+    pool = yield from create_pool(
+        server.tcp_address, minsize=1, maxsize=1, protocol=3, loop=loop)
+
+    res = yield from pool.execute_pubsub('subscribe', 'chan:1')
+    assert res == [[b'subscribe', b'chan:1', 1]]
+    assert pool.in_pubsub == 1
+    assert pool.size == 1
+    assert pool.freesize == 1
+
+    res = yield from pool.execute('publish', 'chan:1', 'hello')
+    assert res == 1
+    ch = pool.pubsub_channels['chan:1']
+    assert (yield from ch.get()) == b'hello'
+
+    with (yield from pool) as conn:
+        assert conn.in_pubsub
+        assert (yield from conn.execute('ping')) == b'PONG'
+    assert pool.freesize == 1
+    assert not conn.closed
+
+
+@pytest.mark.run_loop
+def test_health_check(create_pool, create_connection, loop, server):
+    with pytest.raises(ValueError):
+        yield from create_pool(server.tcp_address,
+                               health_check_interval=0, loop=loop)
+
+    pool = yield from create_pool(
+        server.tcp_address, minsize=2, health_check_interval=.05, loop=loop)
+    conns = list(pool._pool)
+    yield from asyncio.sleep(.2, loop=loop)
+    # healthy connections are kept
+    assert list(pool._pool) == conns
+    assert not any(conn.closed for conn in conns)
+
+    other = yield from create_connection(server.tcp_address, loop=loop)
+    with patch('aioredis.pool.HEALTH_CHECK_TIMEOUT', .05):
+        yield from other.execute('CLIENT', 'PAUSE', 300)
+        yield from asyncio.sleep(.2, loop=loop)
+        # connections not replying to PING are replaced
+        assert all(conn.closed for conn in conns)
+        assert not pool._connections() & set(conns)
+    # wait for pause to end
+    yield from asyncio.sleep(.2, loop=loop)
+    assert (yield from pool.execute('PING')) == b'PONG'
+    assert pool.size == 2
+    assert not pool._connections() & set(conns)
+
+    pool.close()
+    yield from pool.wait_closed()
+    assert pool._health_checker is None
+
+
+@pytest.mark.run_loop
+def test_health_check_acquire(create_pool, loop, server):
+    pool = yield from create_pool(
+        server.tcp_address, minsize=1, maxsize=2,
+        health_check_interval=100, loop=loop)
+    checked, = pool._pool
+    checked._last_read = 0
+    ping = create_future(loop=loop)
+
+    @asyncio.coroutine
+    def slow_ping(conn):
+        yield from ping
+
+    with patch.object(pool, '_ping', slow_ping):
+        task = async_task(pool._check_idle(), loop=loop)
+        yield from asyncio.sleep(0, loop=loop)
+        # connection being checked is not handed out
+        assert pool.freesize == 0 and pool.size == 1
+        with (yield from pool) as conn:
+            assert conn is not checked
+            ping.set_exception(asyncio.TimeoutError())
+            yield from task
+            assert checked.closed
+            assert not conn.closed
+            assert (yield from conn.execute('PING')) == b'PONG'
+    assert pool.size == 1
+
+
+@pytest.mark.run_loop
+def test_health_check_one_at_a_time(create_pool, loop, server):
+    pool = yield from create_pool(
+        server.tcp_address, minsize=2, health_check_interval=100, loop=loop)
+    for conn in pool._pool:
+        conn._last_read = 0
+    ping = create_future(loop=loop)
+    checked = []
+
+    @asyncio.coroutine
+    def slow_ping(conn):
+        checked.append(conn)
+        yield from ping
+
+    with patch.object(pool, '_ping', slow_ping):
+        task = async_task(pool._check_idle(), loop=loop)
+        yield from asyncio.sleep(0, loop=loop)
+        # other idle connection is still free
+        assert pool.freesize == 1 and pool.size == 2
+        assert len(checked) == 1
+        with (yield from pool) as conn:
+            assert conn is not checked[0]
+        ping.set_result(None)
+        yield from task
+    assert len(checked) == 2
+    assert pool.freesize == 2
+
+
+@pytest.mark.run_loop
+def test_selector(create_pool, loop, server):
+    pool = yield from create_pool(
+        server.tcp_address, minsize=3, selector=least_loaded, loop=loop)
+    yield from pool.execute('del', 'list:selector')
+    blpop = pool.execute('blpop', 'list:selector', 0)
+    busy = [conn for conn in pool._pool if conn._waiters]
+    assert len(busy) == 1
+    busy = busy[0]
+    for _ in range(10):
+        conn, address = pool.get_connection('get')
+        assert conn is not busy
+        assert address == conn.address
+    for _ in range(10):
+        assert (yield from pool.execute('ping')) == b'PONG'
+
+    pool._selector = power_of_two
+    for _ in range(20):
+        conn, _ = pool.get_connection('get')
+        assert conn is not busy
+
+    yield from pool.execute('rpush', 'list:selector', 'a')
+    assert (yield from blpop) == [b'list:selector', b'a']
+    assert connection_load(busy) == (False, 0, 0)
+
+    selected = []
+
+    def selector(conns):
+        selected.append(list(conns))
+        return conns[-1]
+    pool._selector = selector
+    assert (yield from pool.execute('ping')) == b'PONG'
+    assert selected == [list(pool._pool)]
+    # pub/sub connection is not selected
+    yield from pool.execute_pubsub('subscribe', 'chan:selector')
+    del selected[:]
+    yield from pool.execute('ping')
+    assert len(selected[0]) == 2
+
+
+@pytest.mark.run_loop
+def test_autoscale_options(create_pool, loop, server):
+    for opt in ('idle_timeout', 'max_lifetime',
+                'scale_up_inflight', 'scale_up_latency'):
+        with pytest.raises(ValueError):
+            yield from create_pool(server.tcp_address, loop=loop, **{opt: 0})
+    with pytest.raises(ValueError):
+        yield from create_pool(server.tcp_address, scale_up_latency=1,
+                               loop=loop)
+
+    pool = yield from create_pool(server.tcp_address, idle_timeout=1,
+                                  loop=loop)
+    assert pool._autoscaler is not None
+    pool.close()
+    yield from pool.wait_closed()
+    assert pool._autoscaler is None
+
+
+@pytest.mark.run_loop
+def test_autoscale_idle_timeout(create_pool, loop, server):
+    with patch('aioredis.pool.AUTOSCALE_INTERVAL', .02):
+        pool = yield from create_pool(
+            server.tcp_address, minsize=1, maxsize=5,
+            idle_timeout=.1, loop=loop)
+        conns = []
+        for _ in range(3):
+            conns.append((yield from pool.acquire()))
+        for conn in conns:
+            pool.release(conn)
+        assert pool.size == 3
+        yield from pool.execute('ping')
+        yield from asyncio.sleep(.3, loop=loop)
+    # idle connections are closed down to minsize
+    assert pool.size == 1
+    assert pool.freesize == 1
+    assert sum(conn.closed for conn in conns) == 2
+
+
+@pytest.mark.run_loop
+def test_autoscale_max_lifetime(create_pool, loop, server):
+    with patch('aioredis.pool.AUTOSCALE_INTERVAL', .02):
+        pool = yield from create_pool(
+            server.tcp_address, minsize=2, max_lifetime=.1, loop=loop)
+        conns = list(pool._pool)
+        used = yield from pool.acquire()
+        yield from asyncio.sleep(.3, loop=loop)
+        # connection in use is kept until released
+        assert not used.closed
+        pool.release(used)
+        assert used.closed
+        yield from asyncio.sleep(.05, loop=loop)
+    assert all(conn.closed for conn in conns)
+    assert pool.freesize == 2
+    assert not set(pool._pool) & set(conns)
+
+
+@pytest.mark.run_loop
+def test_autoscale_inflight(create_pool, create_connection, loop, server):
+    with patch('aioredis.pool.AUTOSCALE_INTERVAL', .02):
+        pool = yield from create_pool(
+            server.tcp_address, minsize=1, maxsize=3,
+            scale_up_inflight=1, loop=loop)
+        yield from pool.execute('del', 'list:autoscale')
+        blpop = pool.execute('blpop', 'list:autoscale', 0)
+        yield from asyncio.sleep(.1, loop=loop)
+    # one connection added; average inflight is below threshold then
+    assert pool.size == 2
+    other = yield from create_connection(server.tcp_address, loop=loop)
+    yield from other.execute('rpush', 'list:autoscale', 'a')
+    assert (yield from blpop) == [b'list:autoscale', b'a']
+
+
+@pytest.mark.run_loop
+def test_autoscale_latency(create_pool, loop, server):
+    metrics = Metrics()
+    with patch('aioredis.pool.AUTOSCALE_INTERVAL', .02):
+        pool = yield from create_pool(
+            server.tcp_address, minsize=1, maxsize=3, metrics=metrics,
+            scale_up_latency=.01, loop=loop)
+        yield from pool.execute('debug', 'sleep', .05)
+        yield from asyncio.sleep(.1, loop=loop)
+    # only latency since last check is considered
+    assert pool.size == 2
+
+
+@pytest.mark.run_loop
+def test_concurrent_fill(create_pool, loop, server):
+    active = []
+    max_active = 0
+    created = []
+
+    @asyncio.coroutine
+    def create_connection(*args, **kw):
+        nonlocal max_active
+        active.append(1)
+        max_active = max(max_active, len(active))
+        try:
+            yield from asyncio.sleep(.01, loop=loop)
+            conn = yield from aioredis.create_connection(*args, **kw)
+            created.append(conn)
+            return conn
+        finally:
+            active.pop()
+
+    with patch('aioredis.pool.create_connection', create_connection):
+        pool = yield from create_pool(
+            server.tcp_address, minsize=10, maxsize=10,
+            create_connection_concurrency=3, loop=loop)
+    assert pool.freesize == 10
+    assert set(pool._pool) == set(created)
+    assert max_active == 3
+
+
+@pytest.mark.run_loop
+def test_concurrent_fill_error(create_pool, loop, server):
+    calls = 0
+    created = []
+
+    @asyncio.coroutine
+    def create_connection(*args, **kw):
+        nonlocal calls
+        calls += 1
+        if calls == 3:
+            raise ConnectionRefusedError()
+        conn = yield from aioredis.create_connection(*args, **kw)
+        created.append(conn)
+        return conn
+
+    with patch('aioredis.pool.create_connection', create_connection):
+        with pytest.raises(ConnectionRefusedError):
+            yield from create_pool(server.tcp_address, minsize=5,
+                                   loop=loop)
+    assert len(created) == 4
+    # connections created before failure are not leaked
+    assert all(conn.closed for conn in created)
+
+
+@pytest.mark.run_loop
+def test_acquire_fifo(create_pool, loop, server):
+    pool = yield from create_pool(server.tcp_address, minsize=1, maxsize=1,
+                                  loop=loop)
+    conn = yield from pool.acquire()
+    order = []
+
+    @asyncio.coroutine
+    def waiter(i):
+        with (yield from pool) as c:
+            assert c is conn
+            order.append(i)
+
+    tasks = [async_task(waiter(i), loop=loop) for i in range(5)]
+    yield from asyncio.sleep(.01, loop=loop)
+    assert len(pool._waiters) == 5
+    # cancelled waiter does not get connection
+    tasks[1].cancel()
+    pool.release(conn)
+    yield from asyncio.gather(*tasks, loop=loop, return_exceptions=True)
+    assert order == [0, 2, 3, 4]
+    assert pool.freesize == 1
+    assert not pool._waiters
+
+
+@pytest.mark.run_loop
+def test_acquire_handoff_cancelled(create_pool, loop, server):
+    pool = yield from create_pool(server.tcp_address, minsize=1, maxsize=1,
+                                  loop=loop)
+    conn = yield from pool.acquire()
+    first = async_task(pool.acquire(), loop=loop)
+    second = async_task(pool.acquire(), loop=loop)
+    yield from asyncio.sleep(.01, loop=loop)
+    # connection is handed to first waiter which is cancelled meanwhile
+    pool.release(conn)
+    first.cancel()
+    assert (yield from second) is conn
+    assert first.cancelled()
+    pool.release(conn)
+    assert pool.freesize == 1
+
+
+@pytest.mark.run_loop
+def test_acquire_cancelled_after_close(create_pool, loop, server):
+    pool = yield from create_pool(server.tcp_address, minsize=1, maxsize=1,
+                                  loop=loop)
+    yield from pool.acquire()
+    waiter = async_task(pool.acquire(), loop=loop)
+    yield from asyncio.sleep(.01, loop=loop)
+    # waiter is failed by close() and cancelled meanwhile
+    pool.close()
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        yield from waiter
+
+
+@pytest.mark.run_loop
+def test_acquire_closed_connection_released(create_pool, loop, server):
+    pool = yield from create_pool(server.tcp_address, minsize=1, maxsize=1,
+                                  loop=loop)
+    conn = yield from pool.acquire()
+    waiter = async_task(pool.acquire(), loop=loop)
+    yield from asyncio.sleep(.01, loop=loop)
+    conn.close()
+    pool.release(conn)
+    # waiter creates new connection
+    new_conn = yield from waiter
+    assert new_conn is not conn
+    assert not new_conn.closed
+    pool.release(new_conn)
+
+
+@pytest.mark.run_loop
+def test_close_fails_waiters(create_pool, loop, server):
+    pool = yield from create_pool(server.tcp_address, minsize=1, maxsize=1,
+                                  loop=loop)
+    conn = yield from pool.acquire()
+    waiter = async_task(pool.acquire(), loop=loop)
+    yield from asyncio.sleep(.01, loop=loop)
+    pool.close()
+    with pytest.raises(PoolClosedError):
+        yield from waiter
+    pool.release(conn)
+    yield from pool.wait_closed()
+
+
+@pytest.mark.run_loop
+def test_blocking_pool(create_pool, create_connection, loop, server):
+    metrics = Metrics()
+    blocking_metrics = Metrics()
+    pool = yield from create_pool(
+        server.tcp_address, minsize=1, maxsize=1, metrics=metrics,
+        blocking_maxsize=2, blocking_metrics=blocking_metrics, loop=loop)
+    assert pool.blocking_pool.maxsize == 2
+    yield from pool.execute('del', 'list:blocking')
+    blpop = [async_task(pool.execute('blpop', 'list:blocking', 0),
+                        loop=loop)
+             for _ in range(3)]
+    yield from asyncio.sleep(.01, loop=loop)
+    assert pool.blocking_pool.size == 2
+    # shared connection is not blocked
+    with async_timeout.timeout(1, loop=loop):
+        assert (yield from pool.execute('ping')) == b'PONG'
+    assert pool.size == 1
+
+    other = yield from create_connection(server.tcp_address, loop=loop)
+    yield from other.execute('rpush', 'list:blocking', 'a', 'b', 'c')
+    res = yield from asyncio.gather(*blpop, loop=loop)
+    assert sorted(res) == [[b'list:blocking', b'a'],
+                           [b'list:blocking', b'b'],
+                           [b'list:blocking', b'c']]
+    assert set(metrics.snapshot()['commands']) == {'DEL', 'PING'}
+    stats = blocking_metrics.snapshot()['commands']['BLPOP']
+    assert stats['latency']['count'] == 3
+
+    pool.close()
+    yield from pool.wait_closed()
+    assert pool.blocking_pool.closed
+
+
+@pytest.mark.run_loop
+def test_blocking_pool_cancel(create_pool, loop, server):
+    pool = yield from create_pool(server.tcp_address, blocking_maxsize=1,
+                                  loop=loop)
+    yield from pool.select(1)
+    fut = async_task(pool.execute(b'XREAD', b'BLOCK', 0, b'STREAMS',
+                                  'stream:blocking', '$'), loop=loop)
+    yield from asyncio.sleep(.01, loop=loop)
+    conn, = pool.blocking_pool._used
+    assert conn.db == 1
+    fut.cancel()
+    yield from asyncio.sleep(0, loop=loop)
+    # connection with pending blocking command is not reused
+    assert conn.closed
+    assert pool.blocking_pool.size == 0
+    with async_timeout.timeout(1, loop=loop):
+        res = yield from pool.execute('brpop', 'list:blocking', 0.01)
+    assert res is None
@@ -1,7 +1,7 @@
 import pytest
 
 from aioredis.errors import ProtocolError, ReplyError
-from aioredis.parser import PyReader
+from aioredis.parser import PyReader, PushMessage
 
 
 @pytest.fixture
@@ -135,6 +135,27 @@ def test_bulk_string_with_invalid_encoding():
         reader.gets()
 
 
+def test_set_encoding(reader):
+    snowman = b"\xe2\x98\x83"
+    reader.set_encoding('utf-8')
+    reader.feed(b"$3\r\n" + snowman + b"\r\n")
+    assert reader.gets() == snowman.decode('utf-8')
+    reader.feed(b"$1\r\n\xff\r\n")
+    assert reader.gets() == b'\xff'
+
+    reader.set_encoding('utf-8', 'strict')
+    reader.feed(b"*2\r\n$1\r\n\xff\r\n$3\r\n" + snowman + b"\r\n")
+    with pytest.raises(UnicodeDecodeError):
+        reader.gets()
+    reader.feed(b"$1\r\n\xff\r\n")
+    with pytest.raises(UnicodeDecodeError):
+        reader.gets()
+
+    reader.set_encoding(None)
+    reader.feed(b"+" + snowman + b"\r\n")
+    assert reader.gets() == snowman
+
+
 def test_bulk_string_wait_buffer(reader):
     reader.feed(b'$5\r\nH')
     assert not reader.gets()
@@ -232,3 +253,120 @@ def test_maxbuf(reader):
     assert defaultmaxbuf == reader.getmaxbuf()
     with pytest.raises(ValueError):
         reader.setmaxbuf(-4)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 4096])
+def test_large_multi_bulk_chunked(reader, chunk_size):
+    count = 10000
+    data = '*{}\r\n'.format(count).encode('utf-8') + b''.join(
+        '*2\r\n${}\r\n{}\r\n:{}\r\n'.format(len(str(i)), i, i)
+        .encode('utf-8') for i in range(count))
+    data += b'+ok\r\n'
+    res = False
+    for i in range(0, len(data), chunk_size):
+        reader.feed(data[i:i + chunk_size])
+        if res is False:
+            res = reader.gets()
+    assert res == [[str(i).encode(), i] for i in range(count)]
+    assert reader.gets() == b'ok'
+    assert reader.gets() is False
+
+
+def test_buffer_compaction(reader):
+    value = b'x' * 1024
+    for _ in range(200):
+        reader.feed(b'$1024\r\n' + value + b'\r\n$10')
+        assert reader.gets() == value
+        reader.feed(b'24\r\n' + value + b'\r\n')
+        assert reader.gets() == value
+    assert reader.gets() is False
+    assert len(reader._parser.buf) < 128 * 1024
+
+
+@pytest.mark.parametrize('data', [
+    b'$-2\r\n', b'*-2\r\n',
+], ids=['bulk', 'multi-bulk'])
+def test_negative_length(reader, data):
+    reader.feed(data)
+    with pytest.raises(ProtocolError):
+        reader.gets()
+
+
+@pytest.mark.parametrize('data,expected', [
+    (b'_\r\n', None),
+    (b'#t\r\n', True),
+    (b'#f\r\n', False),
+    (b',1.5\r\n', 1.5),
+    (b',-10\r\n', -10.0),
+    (b',inf\r\n', float('inf')),
+    (b',-inf\r\n', float('-inf')),
+    (b'(3492890328409238509324850943850943825024385\r\n',
+     3492890328409238509324850943850943825024385),
+    (b'=15\r\ntxt:Some string\r\n', b'Some string'),
+    (b'%2\r\n+first\r\n:1\r\n+second\r\n:2\r\n',
+     {b'first': 1, b'second': 2}),
+    (b'%0\r\n', {}),
+    (b'~3\r\n+a\r\n:1\r\n#f\r\n', [b'a', 1, False]),
+    (b'~0\r\n', []),
+    (b'*2\r\n%1\r\n+a\r\n~1\r\n:1\r\n_\r\n', [{b'a': [1]}, None]),
+    (b'%1\r\n*2\r\n:1\r\n:2\r\n+v\r\n', {(1, 2): b'v'}),
+], ids=['null', 'true', 'false', 'double', 'negative double',
+        'inf', '-inf', 'big number', 'verbatim string', 'map', 'empty map',
+        'set', 'empty set', 'nested', 'map with aggregate keys'])
+def test_resp3_types(reader, data, expected):
+    reader.feed(data)
+    assert reader.gets() == expected
+    assert reader.gets() is False
+
+
+def test_resp3_nan(reader):
+    reader.feed(b',nan\r\n')
+    res = reader.gets()
+    assert res != res
+
+
+def test_resp3_blob_error(reader):
+    reader.feed(b'!21\r\nSYNTAX invalid syntax\r\n')
+    error = reader.gets()
+    assert isinstance(error, ReplyError)
+    assert error.args == ('SYNTAX invalid syntax',)
+
+
+def test_resp3_push(reader):
+    reader.feed(b'>3\r\n$7\r\nmessage\r\n$4\r\nchan\r\n$5\r\nhello\r\n'
+                b'*1\r\n:1\r\n')
+    res = reader.gets()
+    assert isinstance(res, PushMessage)
+    assert res == [b'message', b'chan', b'hello']
+    res = reader.gets()
+    assert not isinstance(res, PushMessage)
+    assert res == [1]
+
+
+def test_resp3_attributes(reader):
+    reader.feed(b'|1\r\n+key-popularity\r\n%1\r\n$1\r\na\r\n,0.19\r\n'
+                b'*2\r\n:2039123\r\n:9543892\r\n')
+    assert reader.gets() == [2039123, 9543892]
+    reader.feed(b'*2\r\n|1\r\n+ttl\r\n:3600\r\n:1\r\n:2\r\n')
+    assert reader.gets() == [1, 2]
+    reader.feed(b'|0\r\n+ok\r\n')
+    assert reader.gets() == b'ok'
+
+
+def test_resp3_chunked(reader):
+    data = (b'%2\r\n$1\r\na\r\n~2\r\n,1.5\r\n#t\r\n'
+            b'=8\r\ntxt:abcd\r\n>2\r\n+x\r\n_\r\n')
+    for i in range(len(data)):
+        reader.feed(data[i:i+1])
+        res = reader.gets()
+    assert res == {b'a': [1.5, True], b'abcd': [b'x', None]}
+    assert isinstance(res[b'abcd'], PushMessage)
+
+
+@pytest.mark.parametrize('data', [
+    b'#x\r\n', b',1.x\r\n', b'(1.0\r\n', b'%-1\r\n', b'~-2\r\n',
+], ids=['boolean', 'double', 'big number', 'map length', 'set length'])
+def test_resp3_protocol_error(reader, data):
+    reader.feed(data)
+    with pytest.raises(ProtocolError):
+        reader.gets()
@@ -0,0 +1,124 @@
+import asyncio
+import pytest
+
+import aioredis
+from aioredis import ReplicaPool, create_replica_pool
+from aioredis.replica import READONLY_COMMANDS
+
+
+@pytest.fixture
+def create_replicas(_closable, loop):
+
+    @asyncio.coroutine
+    def f(*args, **kw):
+        kw.setdefault('loop', loop)
+        pool = yield from create_replica_pool(*args, **kw)
+        _closable(pool)
+        return pool
+    return f
+
+
+@pytest.fixture
+def replica_server(start_server):
+    # independent server (not replicating) to tell where command was sent
+    return start_server('replica')
+
+
+@asyncio.coroutine
+def setup_keys(server, replica_server, create_connection, loop):
+    for srv in (server, replica_server):
+        conn = yield from create_connection(srv.tcp_address, loop=loop)
+        yield from conn.execute('set', 'key:replica', srv.name)
+
+
+@pytest.mark.run_loop
+def test_routing(create_replicas, create_connection, loop,
+                 server, replica_server):
+    yield from setup_keys(server, replica_server, create_connection, loop)
+    pool = yield from create_replicas(server.tcp_address,
+                                      [replica_server.tcp_address])
+    assert isinstance(pool, ReplicaPool)
+    replica, = pool.replicas
+    assert replica.freesize == 1
+    assert 'GET' in READONLY_COMMANDS and b'GET' in READONLY_COMMANDS
+
+    assert (yield from pool.execute('get', 'key:replica')) == b'replica'
+    assert (yield from pool.execute(b'GET', 'key:replica')) == b'replica'
+    # per-call overrides
+    assert (yield from pool.execute(
+        'get', 'key:replica', replica=False)) == b'A'
+    assert (yield from pool.execute(
+        'dbsize', replica=True)) == (yield from replica.execute('dbsize'))
+    # writes go to primary
+    yield from pool.execute('set', 'key:replica:2', 'value')
+    assert (yield from pool.execute('exists', 'key:replica:2')) == 0
+    assert (yield from pool.execute(
+        'exists', 'key:replica:2', replica=False)) == 1
+
+
+@pytest.mark.run_loop
+def test_read_your_writes(create_replicas, create_connection, loop,
+                          server, replica_server):
+    yield from setup_keys(server, replica_server, create_connection, loop)
+    with pytest.raises(ValueError):
+        yield from create_replicas(server.tcp_address,
+                                   [replica_server.tcp_address],
+                                   read_your_writes_window=0)
+    pool = yield from create_replicas(server.tcp_address,
+                                      [replica_server.tcp_address],
+                                      read_your_writes_window=.1)
+    assert (yield from pool.execute('get', 'key:replica')) == b'replica'
+    yield from pool.execute('set', 'key:replica:2', 'value')
+    assert (yield from pool.execute('get', 'key:replica')) == b'A'
+    yield from asyncio.sleep(.1, loop=loop)
+    assert (yield from pool.execute('get', 'key:replica')) == b'replica'
+
+    # connections acquired from primary are considered as writes
+    with (yield from pool) as conn:
+        yield from conn.execute('get', 'key:replica')
+    assert (yield from pool.execute('get', 'key:replica')) == b'A'
+
+
+@pytest.mark.run_loop
+def test_reads_do_not_extend_window(create_replicas, create_connection, loop,
+                                    server, replica_server):
+    yield from setup_keys(server, replica_server, create_connection, loop)
+    pool = yield from create_replicas(server.tcp_address,
+                                      [replica_server.tcp_address],
+                                      read_your_writes_window=.2)
+    yield from pool.execute('set', 'key:replica:2', 'value')
+    # reads within window go to primary and do not move the window
+    for _ in range(3):
+        assert (yield from pool.execute('get', 'key:replica')) == b'A'
+        assert (yield from pool.execute(
+            'get', 'key:replica', replica=False)) == b'A'
+        yield from asyncio.sleep(.05, loop=loop)
+    yield from asyncio.sleep(.1, loop=loop)
+    assert (yield from pool.execute('get', 'key:replica')) == b'replica'
+
+    conn = yield from pool.acquire()
+    yield from conn.execute('get', 'key:replica')
+    pool.release(conn)
+    assert (yield from pool.execute('get', 'key:replica')) == b'replica'
+
+
+@pytest.mark.run_loop
+def test_redis_on_replica_pool(create_replicas, create_connection, loop,
+                               server, replica_server):
+    yield from setup_keys(server, replica_server, create_connection, loop)
+    pool = yield from create_replicas(server.tcp_address,
+                                      [replica_server.tcp_address],
+                                      minsize=2, db=1)
+    redis = aioredis.Redis(pool)
+    assert (yield from redis.get('key:replica')) is None
+    yield from redis.select(0)
+    assert pool.replicas[0].db == 0
+    assert (yield from redis.get('key:replica')) == b'replica'
+
+    tr = redis.multi_exec()
+    tr.get('key:replica')
+    assert (yield from tr.execute()) == [b'A']
+
+    redis.close()
+    yield from redis.wait_closed()
+    assert pool.replicas[0].closed
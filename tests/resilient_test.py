@@ -0,0 +1,161 @@
+import asyncio
+import pytest
+
+import aioredis
+from aioredis import (
+    ResilientConnection,
+    ConnectionClosedError,
+    create_resilient_connection,
+    )
+
+
+@pytest.fixture
+def create_resilient(_closable, loop):
+
+    @asyncio.coroutine
+    def f(*args, **kw):
+        kw.setdefault('loop', loop)
+        kw.setdefault('min_backoff', .01)
+        conn = yield from create_resilient_connection(*args, **kw)
+        _closable(conn)
+        return conn
+    return f
+
+
+@asyncio.coroutine
+def kill(conn, create_connection, server, loop, password=None):
+    """Kills underlying connection from server side."""
+    sock = conn._conn._writer.transport.get_extra_info('socket')
+    addr = '{}:{}'.format(*sock.getsockname())
+    other = yield from create_connection(
+        server.tcp_address, password=password, loop=loop)
+    assert (yield from other.execute('CLIENT', 'KILL', addr)) == b'OK'
+    for _ in range(100):
+        if not conn.connected:
+            break
+        yield from asyncio.sleep(.01, loop=loop)
+    assert not conn.connected
+
+
+@asyncio.coroutine
+def wait_connected(conn, loop):
+    for _ in range(100):
+        if conn.connected:
+            return
+        yield from asyncio.sleep(.01, loop=loop)
+    assert conn.connected
+
+
+@pytest.mark.run_loop
+def test_reconnect(create_resilient, create_connection, server, loop):
+    conn = yield from create_resilient(server.tcp_address, db=1)
+    assert isinstance(conn, ResilientConnection)
+    assert conn.db == 1
+    yield from conn.execute('SET', 'key:resilient', 'value')
+    yield from conn.select(2)
+
+    yield from kill(conn, create_connection, server, loop)
+    # command is sent once connection is restored
+    fut = conn.execute('GET', 'key:resilient')
+    assert (yield from fut) is None
+    assert conn.connected
+    assert conn.db == 2
+    yield from conn.select(1)
+    assert (yield from conn.execute('GET', 'key:resilient')) == b'value'
+
+
+@pytest.mark.run_loop
+def test_reconnect_auth(create_resilient, create_connection,
+                        start_server, loop):
+    server = start_server('resilient_auth', ['requirepass pass'])
+    conn = yield from create_resilient(server.tcp_address, password='pass')
+    yield from kill(conn, create_connection, server, loop, password='pass')
+    yield from wait_connected(conn, loop)
+    assert (yield from conn.execute('PING')) == b'PONG'
+
+
+@pytest.mark.run_loop
+def test_resubscribe(create_resilient, create_connection, server, loop):
+    conn = yield from create_resilient(server.tcp_address)
+    ch, = yield from conn.execute_pubsub('SUBSCRIBE', 'chan:resilient')
+    pch, = yield from conn.execute_pubsub('PSUBSCRIBE', 'chan:resilient:*')
+    assert conn.pubsub_channels['chan:resilient'] is not None
+    ch = conn.pubsub_channels['chan:resilient']
+    pch = conn.pubsub_patterns['chan:resilient:*']
+
+    pub = yield from create_connection(server.tcp_address, loop=loop)
+    yield from kill(conn, create_connection, server, loop)
+    assert ch.is_active and pch.is_active
+    assert conn.in_pubsub == 2
+    yield from wait_connected(conn, loop)
+
+    yield from pub.execute('PUBLISH', 'chan:resilient', 'msg')
+    yield from pub.execute('PUBLISH', 'chan:resilient:1', 'pmsg')
+    assert (yield from ch.get()) == b'msg'
+    assert (yield from pch.get()) == (b'chan:resilient:1', b'pmsg')
+    assert conn.pubsub_channels['chan:resilient'] is ch
+
+    yield from conn.execute_pubsub('UNSUBSCRIBE', 'chan:resilient')
+    assert not ch.is_active
+    assert 'chan:resilient' not in conn.pubsub_channels
+
+
+@pytest.mark.run_loop
+def test_retry_idempotent(create_resilient, create_connection,
+                          server, loop):
+    conn = yield from create_resilient(server.tcp_address,
+                                       retry_idempotent=True)
+    yield from conn.execute('DEL', 'list:resilient')
+    read = conn.execute('BRPOPLPUSH', 'list:resilient', 'other', 0)
+    get = conn.execute('LRANGE', 'list:resilient', 0, -1)
+    yield from asyncio.sleep(.01, loop=loop)
+
+    yield from kill(conn, create_connection, server, loop)
+    # not idempotent command is not retried
+    with pytest.raises(asyncio.CancelledError):
+        yield from read
+    yield from conn.execute('RPUSH', 'list:resilient', 'a')
+    # idempotent command is sent again before the next one
+    assert (yield from get) == []
+
+
+@pytest.mark.run_loop
+def test_close(create_resilient, create_connection, server, loop):
+    conn = yield from create_resilient(server.tcp_address, min_backoff=1)
+    ch, = yield from conn.execute_pubsub('SUBSCRIBE', 'chan:resilient')
+    ch = conn.pubsub_channels['chan:resilient']
+    yield from kill(conn, create_connection, server, loop)
+    fut = conn.execute('PING')
+
+    conn.close()
+    yield from conn.wait_closed()
+    assert conn.closed
+    assert not ch.is_active
+    with pytest.raises(ConnectionClosedError):
+        yield from fut
+    with pytest.raises(ConnectionClosedError):
+        conn.execute('PING')
+
+
+@pytest.mark.run_loop
+def test_max_attempts(create_resilient, create_connection, loop, server):
+    conn = yield from create_resilient(server.tcp_address, max_attempts=2)
+    conn._connect = lambda **kw: create_connection(('localhost', 0), **kw)
+    yield from kill(conn, create_connection, server, loop)
+    fut = conn.execute('PING')
+    with pytest.raises(ConnectionClosedError):
+        yield from fut
+    yield from conn.wait_closed()
+    assert conn.closed
+
+
+@pytest.mark.run_loop
+def test_create_redis_reconnect(_closable, create_connection, server, loop):
+    redis = yield from aioredis.create_redis(
+        server.tcp_address, reconnect=True, loop=loop)
+    _closable(redis)
+    assert isinstance(redis.connection, ResilientConnection)
+    redis.connection._min_backoff = .01
+    yield from redis.set('key:resilient', 'value')
+    yield from kill(redis.connection, create_connection, server, loop)
+    assert (yield from redis.get('key:resilient')) == b'value'
@@ -3,6 +3,7 @@ import pytest
 import sys
 
 from aioredis import RedisError, ReplyError, PoolClosedError
+from aioredis.metrics import Metrics
 from aioredis.sentinel.commands import RedisSentinel
 
 pytestmark = pytest.redis_version(2, 8, 12, reason="Sentinel v2 required")
@@ -39,6 +40,19 @@ def test_ping(redis_sentinel):
     assert b'PONG' == (yield from redis_sentinel.ping())
 
 
+@pytest.mark.run_loop
+def test_metrics(sentinel, create_sentinel, loop):
+    metrics = Metrics()
+    client = yield from create_sentinel([sentinel.tcp_address],
+                                        metrics=metrics, loop=loop)
+    assert client._pool.metrics is metrics
+    redis = client.master_for('master-no-fail')
+    assert (yield from redis.ping()) == b'PONG'
+    snap = metrics.snapshot()
+    assert snap['commands']['PING']['latency']['count'] == 1
+    assert snap['inflight'] == 0
+
+
 @pytest.mark.run_loop
 def test_master_info(redis_sentinel, sentinel):
     info = yield from redis_sentinel.master('master-no-fail')
@@ -0,0 +1,227 @@
+import asyncio
+import pytest
+
+import aioredis
+from aioredis import ShardedPool, create_sharded_pool
+from aioredis.sharding import HashRing
+
+
+def test_hash_ring():
+    nodes = ['node{}'.format(i) for i in range(4)]
+    ring = HashRing(nodes)
+    assert ring.nodes == tuple(nodes)
+    keys = ['key:{}'.format(i) for i in range(10000)]
+    before = {key: ring.get(key) for key in keys}
+    for node in nodes:
+        share = list(before.values()).count(node) / len(keys)
+        assert .15 < share < .35, (node, share)
+
+    ring.add('node4')
+    after = {key: ring.get(key) for key in keys}
+    moved = [key for key in keys if before[key] != after[key]]
+    # only keys of new node are remapped (about 1/N of them)
+    assert .1 < len(moved) / len(keys) < .3
+    assert all(after[key] == 'node4' for key in moved)
+    ring.remove('node4')
+    assert {key: ring.get(key) for key in keys} == before
+
+    # hashtag
+    assert ring.get('{user:1}:a') == ring.get('{user:1}:b')
+    assert ring.get(b'{user:1}:a') == ring.get('user:1')
+    assert ring.get(1) == ring.get('1') == ring.get(b'1')
+
+    with pytest.raises(ValueError):
+        ring.add('node0')
+    with pytest.raises(ValueError):
+        HashRing().get('key')
+
+
+@pytest.fixture
+def create_sharded(_closable, loop):
+
+    @asyncio.coroutine
+    def f(*args, **kw):
+        kw.setdefault('loop', loop)
+        pool = yield from create_sharded_pool(*args, **kw)
+        _closable(pool)
+        return pool
+    return f
+
+
+@pytest.fixture
+def shard_servers(server, start_server):
+    return [server, start_server('shard2'), start_server('shard3')]
+
+
+@pytest.mark.run_loop
+def test_routing(create_sharded, create_connection, loop, shard_servers):
+    pool = yield from create_sharded(
+        [srv.tcp_address for srv in shard_servers])
+    assert isinstance(pool, ShardedPool)
+    assert len(pool.pools) == 3
+    redis = aioredis.Redis(pool)
+    yield from redis.flushdb()
+    assert (yield from redis.dbsize()) == 0
+
+    keys = ['key:sharded:{}'.format(i) for i in range(30)]
+    for key in keys:
+        yield from redis.set(key, key)
+    conns = {}
+    for srv in shard_servers:
+        conn = yield from create_connection(srv.tcp_address, loop=loop)
+        conns['{}:{}'.format(*srv.tcp_address)] = conn
+    # every key is stored on its node only
+    for key in keys:
+        for name, conn in conns.items():
+            exists = yield from conn.execute('exists', key)
+            assert exists == (name == pool.ring.get(key))
+    for conn in conns.values():
+        assert (yield from conn.execute('dbsize'))
+    assert (yield from redis.dbsize()) == 30
+    assert sorted((yield from redis.keys('key:sharded:*'))) == sorted(
+        key.encode('utf-8') for key in keys)
+
+    # multi-key commands are split by node and merged in order
+    res = yield from redis.mget(keys[5], 'key:sharded:none', *keys[:5],
+                                encoding='utf-8')
+    assert res == [keys[5], None] + keys[:5]
+    assert (yield from redis.exists(*keys[:10])) == 10
+    assert (yield from redis.mset('key:sharded:a', 1, 'key:sharded:b', 2,
+                                  'key:sharded:c', 3)) is True
+    assert (yield from redis.mget(
+        'key:sharded:a', 'key:sharded:b', 'key:sharded:c')) == [
+            b'1', b'2', b'3']
+    assert (yield from redis.delete(*keys)) == 30
+    assert (yield from redis.ping()) == b'PONG'
+
+    # hashtag keys are on the same node
+    yield from redis.rpush('{list}:a', 1)
+    yield from redis.rpoplpush('{list}:a', '{list}:b')
+    assert (yield from redis.lrange('{list}:b', 0, -1)) == [b'1']
+    yield from redis.delete('{list}:b')
+
+    # EVAL is routed by its first key
+    assert (yield from redis.eval(
+        'return redis.call("set", KEYS[1], ARGV[1])',
+        keys=['key:sharded:eval'], args=['value'])) == b'OK'
+    assert (yield from pool.get_pool('key:sharded:eval').execute(
+        'get', 'key:sharded:eval')) == b'value'
+
+    # script is loaded to all nodes and exists only if it is on all nodes
+    sha = yield from redis.script_load('return 1')
+    assert (yield from redis.script_exists(sha, 'ffff' * 10)) == [1, 0]
+    yield from conns[pool.ring.nodes[0]].execute('script', 'flush')
+    assert (yield from redis.script_exists(sha)) == [0]
+    assert (yield from redis.script_flush()) is True
+
+    with pytest.raises(ValueError):
+        pool.execute('time')
+    # transactions need node picked explicitly (see test_acquire)
+    tr = redis.multi_exec()
+    fut = tr.get('key:sharded:eval')
+    with pytest.raises(ValueError):
+        yield from tr.execute()
+    fut.cancel()
+
+
+@pytest.mark.run_loop
+def test_acquire(create_sharded, shard_servers):
+    pool = yield from create_sharded(
+        [srv.tcp_address for srv in shard_servers])
+    node_pool = pool.get_pool('key:sharded')
+    conn = yield from pool.acquire('set', ('key:sharded', 'value'))
+    assert conn in node_pool._used
+    yield from conn.execute('set', 'key:sharded', 'value')
+    pool.release(conn)
+    assert conn in node_pool._pool
+
+    tr = aioredis.Redis(node_pool).multi_exec()
+    tr.get('key:sharded')
+    assert (yield from tr.execute()) == [b'value']
+
+
+@pytest.mark.run_loop
+def test_pubsub(create_sharded, shard_servers, loop):
+    pool = yield from create_sharded(
+        [srv.tcp_address for srv in shard_servers])
+    redis = aioredis.Redis(pool)
+    channels = ['chan:sharded:{}'.format(i) for i in range(5)]
+    res = yield from redis.subscribe(*channels)
+    assert [ch.name for ch in res] == [ch.encode('utf-8') for ch in channels]
+    assert pool.in_pubsub == 5
+    assert set(pool.pubsub_channels) == {ch.name for ch in res}
+    assert pool.pubsub_channels['chan:sharded:1'] is res[1]
+
+    for ch in channels:
+        assert (yield from redis.publish(ch, ch)) == 1
+    for ch in res:
+        assert (yield from ch.get()) == ch.name
+
+    yield from redis.unsubscribe(*channels)
+    assert pool.in_pubsub == 0
+
+    with pytest.raises(TypeError):
+        pool.execute_pubsub('unsubscribe')
+
+
+@pytest.mark.run_loop
+def test_add_remove_node(create_sharded, shard_servers):
+    first, second, third = shard_servers
+    pool = yield from create_sharded([first.tcp_address,
+                                      second.tcp_address])
+    keys = ['key:sharded:{}'.format(i) for i in range(100)]
+    before = {key: pool.ring.get(key) for key in keys}
+    yield from pool.add_node(third.tcp_address)
+    third_name = '{}:{}'.format(*third.tcp_address)
+    assert pool.pools[third_name].freesize == 1
+    moved = [key for key in keys if pool.ring.get(key) != before[key]]
+    assert 0 < len(moved) < 60
+    assert all(pool.ring.get(key) == third_name for key in moved)
+
+    third_pool = pool.pools[third_name]
+    yield from pool.remove_node(third.tcp_address)
+    assert third_pool.closed
+    assert {key: pool.ring.get(key) for key in keys} == before
+
+
+@pytest.redis_version(5, 0, 0, reason="Streams are available since v5.0")
+@pytest.mark.run_loop
+def test_key_routing(create_sharded, shard_servers):
+    pool = yield from create_sharded(
+        [srv.tcp_address for srv in shard_servers])
+    redis = aioredis.Redis(pool)
+    keys = ['key:sharded:routing:{}'.format(i) for i in range(10)]
+    yield from redis.delete(*keys)
+    for key in keys:
+        # commands which first argument is not a key
+        yield from redis.set(key, 'value')
+        assert (yield from redis.object_encoding(key)) is not None
+        assert (yield from pool.execute('object', 'refcount', key)) == 1
+        assert (yield from pool.execute('memory', 'usage', key)) > 0
+        assert (yield from redis.bitop_and(
+            '{%s}:dest' % key, key, '{%s}:src' % key)) == 5
+        assert (yield from pool.get_pool(key).execute(
+            'get', '{%s}:dest' % key)) == b'\x00' * 5
+        yield from redis.delete('{%s}:dest' % key)
+        yield from redis.delete(key)
+
+        yield from pool.execute('xadd', key, '*', 'field', 'value')
+        res = yield from pool.execute(
+            'xread', 'count', 1, 'streams', key, 0)
+        assert res[0][0] == key.encode('utf-8')
+        yield from pool.execute('xgroup', 'create', key, 'group', 0)
+        res = yield from pool.execute(
+            'xreadgroup', 'group', 'group', 'consumer',
+            'count', 1, 'streams', key, '>')
+        assert res[0][0] == key.encode('utf-8')
+        res = yield from pool.execute('xinfo', 'groups', key)
+        assert len(res) == 1
+        yield from redis.delete(key)
+
+    # SCAN cursor is specific to node
+    with pytest.raises(ValueError):
+        pool.execute('scan', 0)
+    with pytest.raises(ValueError):
+        yield from redis.scan()
+    with pytest.raises(ValueError):
+        pool.execute('randomkey')
@@ -667,3 +667,22 @@ def test_zscan(redis):
 
     with pytest.raises(TypeError):
         yield from redis.zscan(None)
+
+
+@pytest.mark.run_loop
+@pytest.redis_version(6, 0, 0, reason="RESP3 is available since redis 6.0")
+def test_resp3_withscores(create_redis, loop, server):
+    redis = yield from create_redis(
+        server.tcp_address, protocol=3, loop=loop)
+    key = b'key:resp3'
+    yield from redis.delete(key)
+    yield from redis.zadd(key, 1, b'one', 2.5, b'two')
+
+    res = yield from redis.zrange(key, 0, -1, withscores=True)
+    assert res == [b'one', 1, b'two', 2.5]
+    res = yield from redis.zrevrangebyscore(key, withscores=True)
+    assert res == [b'two', 2.5, b'one', 1]
+    res = yield from redis.zscore(key, b'two')
+    assert res == 2.5
+    res = yield from redis.zincrby(key, 1, b'one')
+    assert res == 2
@@ -1,4 +1,6 @@
 import asyncio
+import mmap
+import os
 import pytest
 
 from aioredis import ReplyError
@@ -233,6 +235,81 @@ def test_get(redis):
         yield from redis.get(None)
 
 
+@pytest.mark.run_loop
+def test_get_stream(redis):
+    value = b'x' * 1024 * 1024 + b'end'
+    yield from add(redis, 'my-key', value)
+    stream = yield from redis.get_stream('my-key')
+    assert stream.size == len(value)
+    chunks = []
+    chunk = yield from stream.read()
+    while chunk:
+        chunks.append(chunk)
+        chunk = yield from stream.read()
+    assert b''.join(chunks) == value
+
+    stream = yield from redis.get_stream('bad-key')
+    assert stream is None
+    ret = yield from redis.get('my-key')
+    assert ret == value
+
+    with pytest.raises(TypeError):
+        yield from redis.get_stream(None)
+
+
+@pytest.mark.run_loop
+def test_get_into(redis, tmpdir):
+    value = b'0123456789' * 200000
+    yield from add(redis, 'my-key', value)
+
+    buf = bytearray(len(value) + 10)
+    ret = yield from redis.get_into('my-key', buf)
+    assert ret == len(value)
+    assert buf[:ret] == value
+    assert buf[ret:] == bytearray(10)
+
+    path = tmpdir.join('value.bin')
+    with path.open('wb') as f:
+        ret = yield from redis.get_into('my-key', f)
+    assert ret == len(value)
+    assert path.read_binary() == value
+
+    fd = os.open(str(path), os.O_WRONLY | os.O_TRUNC)
+    try:
+        ret = yield from redis.get_into('my-key', fd)
+    finally:
+        os.close(fd)
+    assert ret == len(value)
+    assert path.read_binary() == value
+
+    with path.open('r+b') as f:
+        with mmap.mmap(f.fileno(), 0) as mm:
+            mm[:] = b'x' * len(value)
+            ret = yield from redis.get_into('my-key', mm)
+            assert ret == len(value)
+            assert mm[:] == value
+
+    ret = yield from redis.get_into('bad-key', buf)
+    assert ret is None
+
+
+@pytest.mark.run_loop
+def test_get_into_errors(redis):
+    yield from add(redis, 'my-key', b'x' * 100000)
+
+    with pytest.raises(ValueError):
+        yield from redis.get_into('my-key', bytearray(100))
+    with pytest.raises(TypeError):
+        yield from redis.get_into('my-key', b'readonly')
+    with pytest.raises(TypeError):
+        yield from redis.get_into('my-key', None)
+    with pytest.raises(TypeError):
+        yield from redis.get_into(None, bytearray(100))
+
+    ret = yield from redis.get('my-key')
+    assert ret == b'x' * 100000
+
+
 @pytest.mark.run_loop
 def test_getbit(redis):
     key, value = b'key:getbit', 10